@@ -0,0 +1,85 @@
+import asyncio
+import collections
+import functools
+import logging
+import typing
+
+MAILBOX_SIZE = 64
+
+actor_logger = logging.getLogger('mafia.actor')
+
+
+class ActorStopped(Exception):
+    pass
+
+
+class Actor:
+    # Runs the calls sent to it one at a time, in the order they came, in a task of its own.
+    # The mailbox is bounded: while it is full the senders wait, so only the callers of a busy actor are slowed down.
+    # The calls are plain functions and the actor is the only one to run them, so its state needs no locks.
+    def __init__(self, name: str, mailbox_size: int = MAILBOX_SIZE):
+        self.name = name
+        self.mailbox: asyncio.Queue[tuple[typing.Callable[[], typing.Any], asyncio.Future | None]] = \
+            asyncio.Queue(mailbox_size)
+        # Tells that found the mailbox full, they take its free places before the waiting calls.
+        self.backlog: collections.deque[tuple[typing.Callable[[], typing.Any], None]] = collections.deque()
+        self.task: asyncio.Task | None = None
+        self.stopped = False
+
+    def ensure_running(self):
+        if self.stopped:
+            raise ActorStopped(f'{self.name} is stopped')
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def call(self, function: typing.Callable, *args) -> typing.Any:
+        self.ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        await self.mailbox.put((functools.partial(function, *args), future))
+        if self.stopped:
+            # Stopped while waiting for room, nobody is left to run the call.
+            raise ActorStopped(f'{self.name} is stopped')
+        return await future
+
+    def tell(self, function: typing.Callable, *args):
+        # For timers, nobody waits for the result and a stopped actor drops the call. A tell doesn't wait for room
+        # either: it goes to the backlog, and past mailbox_size tells there it is dropped.
+        if self.stopped:
+            return
+        self.ensure_running()
+        message = (functools.partial(function, *args), None)
+        if not self.backlog and not self.mailbox.full():
+            self.mailbox.put_nowait(message)
+        elif len(self.backlog) < self.mailbox.maxsize:
+            self.backlog.append(message)
+        else:
+            actor_logger.error("dropped actor=%s function=%s", self.name, getattr(function, '__name__', function))
+
+    def stop(self):
+        self.stopped = True
+        if self.task is not None:
+            self.task.cancel()
+        self.backlog.clear()
+        while not self.mailbox.empty():
+            _, future = self.mailbox.get_nowait()
+            if future is not None and not future.done():
+                future.set_exception(ActorStopped(f'{self.name} is stopped'))
+
+    async def run(self):
+        while True:
+            function, future = await self.mailbox.get()
+            if self.backlog:
+                self.mailbox.put_nowait(self.backlog.popleft())
+            if future is not None and future.done():
+                # The caller went away.
+                continue
+            try:
+                result = function()
+            except Exception as e:
+                if future is None:
+                    actor_logger.exception("failed actor=%s", self.name)
+                else:
+                    future.set_exception(e)
+            else:
+                if future is not None:
+                    future.set_result(result)
@@ -0,0 +1,121 @@
+import argparse
+import time
+
+import numpy as np
+
+BATCH_SIZE = 100000
+
+
+def choose_others(rng: np.random.Generator, alive: np.ndarray) -> np.ndarray:
+    # Every seat picks a uniformly random alive seat other than its own, like the Auto bot does from a phase event.
+    games_cnt, players_cnt = alive.shape
+    others_cnt = alive.sum(axis=1, keepdims=True) - alive
+    ranks = np.cumsum(alive, axis=1) - 1
+    choices = (rng.random((games_cnt, players_cnt)) * np.maximum(others_cnt, 1)).astype(np.int64)
+    # Skipping the voter's own rank turns a choice among the others into a rank among all alive seats.
+    choices += alive & (choices >= ranks)
+    alive_seats = np.argsort(~alive, axis=1, kind='stable')
+    return np.take_along_axis(alive_seats, np.minimum(choices, players_cnt - 1), axis=1)
+
+
+def resolve_votes(rng: np.random.Generator, voters: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    # The most voted seat of every game, ties are broken uniformly at random as in Rules.
+    games_cnt, players_cnt = voters.shape
+    games = np.broadcast_to(np.arange(games_cnt)[:, None] * players_cnt, voters.shape)
+    votes_cnt = np.bincount((games + candidates)[voters], minlength=games_cnt * players_cnt)
+    votes_cnt = votes_cnt.reshape(games_cnt, players_cnt) + rng.random((games_cnt, players_cnt)) * 0.5
+    return votes_cnt.argmax(axis=1)
+
+
+def simulate_batch(rng: np.random.Generator, games_cnt: int, players_cnt: int,
+                   mafias_cnt: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Returns whether mafia won, the number of phases played and whether the detective published, for every game.
+    # Roles are dealt as in Rules.assign_roles: the detective, then the mafias, then the villagers.
+    seats_mafia = np.zeros(players_cnt, dtype=bool)
+    seats_mafia[1:mafias_cnt + 1] = True
+    roles = rng.random((games_cnt, players_cnt)).argsort(axis=1)
+    mafia, detective = seats_mafia[roles], roles == 0
+    alive = np.ones((games_cnt, players_cnt), dtype=bool)
+    checked = np.zeros(games_cnt, dtype=bool)
+    mafia_won = np.zeros(games_cnt, dtype=bool)
+    phases_cnt = np.zeros(games_cnt, dtype=np.int32)
+    published = np.zeros(games_cnt, dtype=bool)
+
+    # Only the games still running are kept in the arrays, the finished ones are written out by their index.
+    running = np.arange(games_cnt)
+    phase = 1
+    while len(running):
+        games = np.arange(len(running))
+        candidates = choose_others(rng, alive)
+        if phase % 2:
+            # The alive detective checks its own random pick and publishes the finds half of the time, as in
+            # simulate.py. The Auto bot votes at random anyway, so the finds don't change the votes.
+            detective_seats = detective.argmax(axis=1)
+            detective_alive = alive[games, detective_seats]
+            checked |= detective_alive & mafia[games, candidates[games, detective_seats]]
+            published[running[detective_alive & checked & (rng.random(len(running)) < 0.5)]] = True
+        voters = alive & mafia if phase % 2 else alive
+        killed = resolve_votes(rng, voters, candidates)
+        alive[games, killed] = False
+
+        alive_mafias_cnt = (alive & mafia).sum(axis=1)
+        won = 2 * alive_mafias_cnt >= alive.sum(axis=1)
+        finished = won | (alive_mafias_cnt == 0)
+        mafia_won[running[finished]] = won[finished] & (alive_mafias_cnt[finished] > 0)
+        phases_cnt[running[finished]] = phase
+
+        running, alive, mafia = running[~finished], alive[~finished], mafia[~finished]
+        detective, checked = detective[~finished], checked[~finished]
+        phase += 1
+    return mafia_won, phases_cnt, published
+
+
+def simulate_games(games_cnt: int, players_cnt: int, mafias_cnt: int | None = None,
+                   seed: int = 0) -> tuple[float, float, float]:
+    # Mafia's win rate, the mean number of phases and the share of games where the detective published, by default
+    # for the split Rules.assign_roles uses. They agree with simulate.py for the same number of players.
+    if mafias_cnt is None:
+        mafias_cnt = players_cnt // 4
+    rng = np.random.default_rng(seed)
+    mafia_wins_cnt = phases_cnt = published_cnt = 0
+    for start in range(0, games_cnt, BATCH_SIZE):
+        mafia_won, phases, published = simulate_batch(rng, min(BATCH_SIZE, games_cnt - start), players_cnt,
+                                                      mafias_cnt)
+        mafia_wins_cnt += int(mafia_won.sum())
+        phases_cnt += int(phases.sum())
+        published_cnt += int(published.sum())
+    return mafia_wins_cnt / games_cnt, phases_cnt / games_cnt, published_cnt / games_cnt
+
+
+def report(games_cnt: int, players_cnts: list[int], seed: int):
+    # Splits where mafia is at least half of the table end after the first night, they are not shown.
+    max_mafias_cnt = (max(players_cnts) - 1) // 2
+    print(f"Mafia win rate over {games_cnt} games per cell, * marks the current split (players // 4)")
+    print(f"{'players':>8}", *(f"{f'{mafias_cnt} mafia':>9}" for mafias_cnt in range(1, max_mafias_cnt + 1)))
+    started = time.perf_counter()
+    simulated_cnt = 0
+    for players_cnt in players_cnts:
+        cells = []
+        for mafias_cnt in range(1, max_mafias_cnt + 1):
+            if 2 * mafias_cnt >= players_cnt:
+                cells.append(f"{'':>9}")
+                continue
+            mafia_win_rate, _, _ = simulate_games(games_cnt, players_cnt, mafias_cnt, seed)
+            simulated_cnt += games_cnt
+            mark = '*' if mafias_cnt == players_cnt // 4 else ' '
+            cells.append(f"{mafia_win_rate:>8.1%}{mark}")
+        print(f"{players_cnt:>8}", *cells)
+    elapsed = time.perf_counter() - started
+    print(f"Games: {simulated_cnt} in {elapsed:.2f}s, {simulated_cnt / elapsed:.0f} games/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates bot games in batches with NumPy "
+                                                 "and prints mafia's win rate for every role split.")
+    parser.add_argument("--games", type=int, default=100000, help="games per player count and role split")
+    parser.add_argument("--min-players", type=int, default=4)
+    parser.add_argument("--max-players", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report(args.games, list(range(args.min_players, args.max_players + 1)), args.seed)
@@ -0,0 +1,71 @@
+import random
+import time
+
+from codes import CODE_ALPHABET, CODE_LENGTH, CodeAllocator
+
+# One of 36 shards owns 36 ** 4 codes, small enough to be filled up here.
+SHARDS_CNT = 36
+CHURN_CNT = 200000
+
+
+class RetryAllocator:
+    # What CreateGame did before, with the missing check for a live code: draw again until the code is free.
+    def __init__(self, shard: int = 0, shards_cnt: int = 1):
+        self.first_chars = CODE_ALPHABET[shard::shards_cnt]
+        self.live: set[str] = set()
+        self.draws_cnt = 0
+
+    def allocate(self) -> str:
+        while True:
+            self.draws_cnt += 1
+            code = random.choice(self.first_chars) + ''.join(random.choices(CODE_ALPHABET, k=CODE_LENGTH - 1))
+            if code not in self.live:
+                self.live.add(code)
+                return code
+
+    def free(self, code: str):
+        self.live.remove(code)
+
+
+def churn(allocator, occupancy: float) -> tuple[float, list[str]]:
+    # Fills the shard up to the occupancy, then every game torn down is replaced by a new one.
+    codes_cnt = len(CODE_ALPHABET) ** (CODE_LENGTH - 1)
+    live = [allocator.allocate() for _ in range(int(codes_cnt * occupancy))]
+    if isinstance(allocator, RetryAllocator):
+        allocator.draws_cnt = 0
+    started = time.perf_counter()
+    for _ in range(CHURN_CNT):
+        i = random.randrange(len(live))
+        allocator.free(live[i])
+        live[i] = allocator.allocate()
+    return (time.perf_counter() - started) / CHURN_CNT, live
+
+
+def main():
+    print(f"{CHURN_CNT} frees and allocations in a shard of {len(CODE_ALPHABET) ** (CODE_LENGTH - 1)} codes")
+    print(f"{'occupancy':>10} {'retry, ns':>10} {'draws/code':>11} {'allocator, ns':>14}")
+    for occupancy in (0.5, 0.9, 0.99):
+        retry = RetryAllocator(0, SHARDS_CNT)
+        retry_elapsed, _ = churn(retry, occupancy)
+
+        allocator = CodeAllocator(0, SHARDS_CNT)
+        elapsed, live = churn(allocator, occupancy)
+        assert len(set(live)) == len(live)
+        assert all(allocator.decode(code) is not None for code in live)
+        assert allocator.get_free_cnt() == len(CODE_ALPHABET) ** (CODE_LENGTH - 1) - len(live)
+
+        draws = retry.draws_cnt / CHURN_CNT
+        print(f"{occupancy:>10.1%} {retry_elapsed * 1e9:>10.0f} {draws:>11.1f} {elapsed * 1e9:>14.0f}")
+
+    # The whole shard handed out once: every code comes exactly once, then nothing is left.
+    allocator = CodeAllocator(0, SHARDS_CNT)
+    codes_cnt = allocator.get_free_cnt()
+    assert len({allocator.allocate() for _ in range(codes_cnt)}) == codes_cnt
+    try:
+        allocator.allocate()
+    except Exception:
+        print(f"all {codes_cnt} codes allocated once, then exhausted")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import loadgen
+import mafia_pb2
+from actors import Actor
+from server import Game
+
+CALLS_CNT = 100000
+SENDERS_CNT = 1000
+SENDER_CALLS_CNT = 50
+
+
+def make_game() -> tuple[Game, int, int]:
+    game = Game(6, seed=6)
+    for player_id in range(1, 7):
+        game.add_player(player_id)
+    detective_id = game.players_ids[game.roles.index(mafia_pb2.ROLE_DETECTIVE)]
+    villager_id = game.players_ids[game.roles.index(mafia_pb2.ROLE_VILLAGER)]
+    return game, detective_id, villager_id
+
+
+async def per_call() -> tuple[float, float]:
+    # A check of a villager changes nothing, so it can be repeated.
+    game, detective_id, villager_id = make_game()
+    started = time.perf_counter()
+    for _ in range(CALLS_CNT):
+        game.check(detective_id, villager_id)
+    inline = (time.perf_counter() - started) / CALLS_CNT
+
+    actor = Actor('bench')
+    started = time.perf_counter()
+    for _ in range(CALLS_CNT):
+        await actor.call(game.check, detective_id, villager_id)
+    actor.stop()
+    return inline, (time.perf_counter() - started) / CALLS_CNT
+
+
+async def flood(mailbox_size: int) -> tuple[int, bool, list[float], float]:
+    # Every sender sends its calls one after another to one busy game, while a quiet game is called alongside.
+    busy, quiet = Actor('busy', mailbox_size), Actor('quiet', mailbox_size)
+    sender_to_calls: dict[int, list[int]] = {sender: [] for sender in range(SENDERS_CNT)}
+    peak_size = 0
+
+    def handle(sender: int, i: int):
+        nonlocal peak_size
+        peak_size = max(peak_size, busy.mailbox.qsize())
+        sender_to_calls[sender].append(i)
+
+    async def send(sender: int):
+        for i in range(SENDER_CALLS_CNT):
+            await busy.call(handle, sender, i)
+
+    async def call_quiet() -> list[float]:
+        latencies = []
+        while not senders.done():
+            started = time.perf_counter()
+            await quiet.call(int)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.001)
+        return latencies
+
+    started = time.perf_counter()
+    senders = asyncio.gather(*(send(sender) for sender in range(SENDERS_CNT)))
+    latencies = await call_quiet()
+    await senders
+    elapsed = time.perf_counter() - started
+    busy.stop()
+    quiet.stop()
+    in_order = all(calls == list(range(SENDER_CALLS_CNT)) for calls in sender_to_calls.values())
+    return peak_size, in_order, latencies, SENDERS_CNT * SENDER_CALLS_CNT / elapsed
+
+
+def main():
+    inline, actor = asyncio.run(per_call())
+    print(f"{'Game.check':<24} {'us/call':>8}")
+    print(f"{'inline':<24} {inline * 1e6:>8.2f}")
+    print(f"{'through the actor':<24} {actor * 1e6:>8.2f}")
+    print()
+
+    print(f"{SENDERS_CNT} senders x {SENDER_CALLS_CNT} calls to one game, a quiet game called every 1 ms")
+    print(f"{'mailbox':>8} {'peak queued':>12} {'in order':>9} {'calls/s':>9} {'quiet p50, ms':>14} "
+          f"{'quiet p99, ms':>14}")
+    # A mailbox of 0 is unbounded.
+    for mailbox_size in (0, 64):
+        peak_size, in_order, latencies, throughput = asyncio.run(flood(mailbox_size))
+        print(f"{mailbox_size or 'inf':>8} {peak_size:>12} {str(in_order):>9} {throughput:>9.0f} "
+              f"{loadgen.percentile(latencies, 0.5) * 1000:>14.2f} {loadgen.percentile(latencies, 0.99) * 1000:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import timeit
+
+import mafia_pb2
+
+from server import Game
+
+
+class ScanGame(Game):
+    def get_alive_players_ids(self) -> set[int]:
+        return set([player_id for player_id in self.players_ids if self.is_alive(player_id)])
+
+    def get_alive_mafias_ids(self) -> set[int]:
+        return set([player_id for player_id in self.players_ids if
+                    self.is_alive(player_id) and self.is_mafia(player_id)])
+
+    def get_alive_detective_id(self) -> int | None:
+        for player_id in self.players_ids:
+            if self.is_alive(player_id) and self.is_detective(player_id):
+                return player_id
+        return None
+
+    def get_winner(self) -> mafia_pb2.Role:
+        players = self.get_alive_players_ids()
+        mafias = self.get_alive_mafias_ids()
+        if not mafias:
+            return mafia_pb2.ROLE_VILLAGER
+        if 2 * len(mafias) >= len(players):
+            return mafia_pb2.ROLE_MAFIA
+        return None
+
+
+def make_game(game_cls: type[Game], players_cnt: int) -> Game:
+    game = game_cls(players_cnt)
+    for player_id in range(1, players_cnt + 1):
+        game.add_player(player_id)
+    return game
+
+
+def phase(game: Game):
+    # What every GameProcess stream asks for once per phase.
+    for _ in range(game.required_players_cnt):
+        game.get_alive_players_ids()
+        game.get_alive_mafias_ids()
+        game.get_alive_detective_id()
+        game.get_winner()
+
+
+def main():
+    print(f"{'players':>8} {'scan, ms':>12} {'indexed, ms':>12} {'speedup':>8}")
+    for players_cnt in (10, 100, 1000, 2000):
+        number = max(1, 1000 // players_cnt)
+        results = []
+        for game_cls in (ScanGame, Game):
+            game = make_game(game_cls, players_cnt)
+            results.append(min(timeit.repeat(lambda: phase(game), number=number, repeat=3)) / number * 1000)
+        scan, indexed = results
+        print(f"{players_cnt:>8} {scan:>12.3f} {indexed:>12.3f} {scan / indexed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import atexit
+import logging
+import os
+import time
+
+import loadgen
+from benchmarks.soak import LocalStub
+from logs import setup_logging
+from server import EService
+
+CALLS_CNT = 100000
+GAMES_CNT = 1000
+PLAYERS_CNT = 6
+OLD_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] [%(funcName)s():%(lineno)s] %(message)s"
+
+
+def setup_old_logging(level: str, stream):
+    # The configuration server.py had before: a synchronous handler and the caller looked up for every record.
+    logging._srcfile = os.path.normcase(logging.addLevelName.__code__.co_filename)
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = True
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(OLD_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def old_call(game_id: int, name: str, player_id: int, candidate_id: int):
+    logging.info(f"{game_id}: {name}({player_id}) V {candidate_id}")
+
+
+def new_call(logger: logging.Logger, game_id: int, player_id: int, candidate_id: int):
+    logger.info("vote_day game=%s player=%s candidate=%s", game_id, player_id, candidate_id)
+
+
+def per_call(call, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(CALLS_CNT):
+        call(*args)
+    return (time.perf_counter() - started) / CALLS_CNT
+
+
+def stop(listener):
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+
+def configure(new: bool, level: str, stream):
+    if new:
+        return setup_logging(level, stream)
+    return setup_old_logging(level, stream)
+
+
+def measure_calls(stream):
+    logger = logging.getLogger('mafia.service')
+    print(f"{'one VoteDay log line':<36} {'INFO, us':>9} {'WARNING, us':>12}")
+    for new in (False, True):
+        row = []
+        for level in ('INFO', 'WARNING'):
+            listener = configure(new, level, stream)
+            if new:
+                row.append(per_call(new_call, logger, 1, 2, 3))
+                stop(listener)
+            else:
+                row.append(per_call(old_call, 1, 'bot1', 2, 3))
+        name = 'lazy args, queue handler' if new else 'f-string, sync handler, caller'
+        print(f"{name:<36} {row[0] * 1e6:>9.2f} {row[1] * 1e6:>12.2f}")
+
+
+def measure_games(stream):
+    # Handlers are called in-process, so the figure is the server's own cost of an RPC.
+    print(f"\n{GAMES_CNT} games x {PLAYERS_CNT} players, in-process handlers")
+    print(f"{'logging':<36} {'level':<8} {'RPC/s':>9}")
+    for new in (False, True, False, True):
+        for level in ('INFO', 'WARNING'):
+            listener = configure(new, level, stream)
+            stats = asyncio.run(loadgen.play_games([LocalStub(EService(phase_delay=0, token_ttl=0))], GAMES_CNT,
+                                                   PLAYERS_CNT, concurrency=200))
+            if listener is not None:
+                stop(listener)
+            rpcs_cnt = sum(len(latencies) for latencies in stats.rpc_latencies.values())
+            name = 'queue handler, no caller' if new else 'sync handler, caller'
+            print(f"{name:<36} {level:<8} {rpcs_cnt / stats.elapsed:>9.0f}")
+
+
+def main():
+    with open(os.devnull, 'w') as stream:
+        measure_calls(stream)
+        measure_games(stream)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import grpc
+
+import loadgen
+import mafia_pb2_grpc
+from metrics import Metrics, MetricsInterceptor
+from server import EService
+
+CALLS_CNT = 200000
+GAMES_CNT = 300
+PLAYERS_CNT = 6
+
+
+def per_call(function, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(CALLS_CNT):
+        function(*args)
+    return (time.perf_counter() - started) / CALLS_CNT
+
+
+async def per_await(behavior) -> float:
+    started = time.perf_counter()
+    for _ in range(CALLS_CNT):
+        await behavior(None, None)
+    return (time.perf_counter() - started) / CALLS_CNT
+
+
+async def handler(request, context):
+    return request
+
+
+def measure_recording():
+    metrics = Metrics()
+    interceptor = MetricsInterceptor(metrics)
+    print(f"{'recording':<28} {'ns/call':>8}")
+    print(f"{'Counter.inc':<28} {per_call(metrics.stream_messages.inc, 'GameProcess') * 1e9:>8.0f}")
+    print(f"{'Histogram.observe':<28} {per_call(metrics.rpc_duration.observe, 0.0003, 'VoteDay') * 1e9:>8.0f}")
+    bare = asyncio.run(per_await(handler))
+    wrapped = asyncio.run(per_await(interceptor.unary('VoteDay', handler)))
+    print(f"{'intercepted unary RPC':<28} {(wrapped - bare) * 1e9:>8.0f}")
+
+
+async def play(with_metrics: bool) -> loadgen.Stats:
+    metrics = Metrics() if with_metrics else None
+    server = grpc.aio.server(interceptors=[MetricsInterceptor(metrics)] if with_metrics else [])
+    mafia_pb2_grpc.add_MafiaServicer_to_server(EService(phase_delay=0, metrics=metrics), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+    try:
+        return await loadgen.run(f'127.0.0.1:{port}', GAMES_CNT, PLAYERS_CNT, GAMES_CNT)
+    finally:
+        await server.stop(None)
+
+
+def measure_games():
+    print(f"\n{GAMES_CNT} games x {PLAYERS_CNT} players, in-process server")
+    print(f"{'metrics':<8} {'games/s':>8} {'p50 VoteDay, ms':>16} {'p99 VoteDay, ms':>16}")
+    for with_metrics in (False, True, False, True):
+        stats = asyncio.run(play(with_metrics))
+        latencies = stats.rpc_latencies['VoteDay']
+        print(f"{'on' if with_metrics else 'off':<8} {stats.games_cnt / stats.elapsed:>8.1f} "
+              f"{loadgen.percentile(latencies, 0.5) * 1000:>16.2f} {loadgen.percentile(latencies, 0.99) * 1000:>16.2f}")
+
+
+if __name__ == '__main__':
+    measure_recording()
+    measure_games()
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import mafia_pb2
+from benchmarks.soak import Context
+from persistence import Journal
+from server import EService, Game
+
+PLAYERS_CNT = 10
+GAMES_CNT = 2000
+FLUSH_EVERY = 1000
+
+
+def make_days(journal: Journal | None) -> list[Game]:
+    games = []
+    for i in range(GAMES_CNT):
+        game = Game(PLAYERS_CNT, seed=i, journal=journal)
+        for player_id in range(i * PLAYERS_CNT, (i + 1) * PLAYERS_CNT):
+            game.add_player(player_id)
+        game.start_day(2)
+        games.append(game)
+    return games
+
+
+def vote(games: list[Game], journal: Journal | None = None, flush_every: int = 0) -> float:
+    # Every player votes for the next seat, so the day ends with the last vote.
+    started = time.perf_counter()
+    votes_cnt = 0
+    for game in games:
+        players_ids = game.get_players_ids()
+        for seat, player_id in enumerate(players_ids):
+            game.add_day_vote(player_id, players_ids[(seat + 1) % len(players_ids)])
+            votes_cnt += 1
+            if flush_every and votes_cnt % flush_every == 0:
+                flush(journal)
+    if journal is not None:
+        flush(journal)
+    return (time.perf_counter() - started) / votes_cnt
+
+
+def flush(journal: Journal):
+    # What Journal.flush does in its worker thread.
+    journal.write(journal.file, b''.join(journal.buffer))
+    journal.buffer = []
+
+
+def measure_votes(directory: str):
+    journal = Journal(os.path.join(directory, 'votes'))
+    list(journal.load())
+
+    print(f"{GAMES_CNT} days x {PLAYERS_CNT} voters")
+    print(f"{'journal':<28} {'us/vote':>8}")
+    print(f"{'none':<28} {vote(make_days(None)) * 1e6:>8.2f}")
+    print(f"{f'fsync every {FLUSH_EVERY} records':<28} {vote(make_days(journal), journal, FLUSH_EVERY) * 1e6:>8.2f}")
+    flush(journal)
+    # Unbatched fsync is slow enough for a twentieth of the games.
+    games = make_days(journal)[:GAMES_CNT // 20]
+    flush(journal)
+    print(f"{'fsync every record':<28} {vote(games, journal, 1) * 1e6:>8.2f}")
+    journal.close()
+
+
+async def make_service(games_cnt: int, journal: Journal) -> EService:
+    # Every game is left in the middle of its first day: night done, half of the day votes in.
+    service = EService(phase_delay=0, journal=journal)
+    context = Context()
+    for _ in range(games_cnt):
+        tokens = [(await service.Connect(mafia_pb2.ConnectRequest(name=f'bot{i}'), context)).token
+                  for i in range(PLAYERS_CNT)]
+        response = await service.CreateGame(mafia_pb2.CreateGameRequest(
+            token=tokens[0], required_players_cnt=PLAYERS_CNT, fast_mode=True), context)
+        for token in tokens[1:]:
+            await service.JoinGame(mafia_pb2.JoinGameRequest(token=token, code=response.code), context)
+
+        game = service.code_to_game[response.code]
+        players_ids = game.get_players_ids()
+        villagers_ids = [player_id for player_id in players_ids if not game.is_mafia(player_id)]
+        detective_id = game.get_alive_detective_id()
+        game.start_night(1)
+        for mafia_id in list(game.get_alive_mafias_ids()):
+            game.add_night_vote(mafia_id, villagers_ids[-1])
+        game.check(detective_id, villagers_ids[0])
+        game.publish(detective_id, False)
+        game.start_day(2)
+        for player_id in list(game.get_alive_players_ids())[:PLAYERS_CNT // 2]:
+            game.add_day_vote(player_id, villagers_ids[0])
+    return service
+
+
+def directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def recover(directory: str) -> tuple[float, EService]:
+    journal = Journal(directory)
+    service = EService(phase_delay=0, journal=journal)
+    started = time.perf_counter()
+    service.recover(journal.load())
+    elapsed = time.perf_counter() - started
+    journal.close()
+    return elapsed, service
+
+
+async def measure_recovery(directory: str, games_cnt: int):
+    directory = os.path.join(directory, 'recovery')
+    journal = Journal(directory)
+    list(journal.load())
+    service = await make_service(games_cnt, journal)
+    records_cnt = journal.records_cnt
+    await journal.flush()
+
+    print(f"\nrecovery of {games_cnt} games x {PLAYERS_CNT} players, {records_cnt} records")
+    print(f"{'from':<10} {'size, MB':>9} {'recovery, s':>12} {'games':>7}")
+    elapsed, recovered = recover(directory)
+    print(f"{'journal':<10} {directory_size(directory) / 2 ** 20:>9.1f} {elapsed:>12.2f} "
+          f"{len(recovered.game_id_to_game):>7}")
+
+    await journal.compact(service.get_records())
+    journal.close()
+    elapsed, recovered = recover(directory)
+    print(f"{'snapshot':<10} {directory_size(directory) / 2 ** 20:>9.1f} {elapsed:>12.2f} "
+          f"{len(recovered.game_id_to_game):>7}")
+
+
+def main():
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        measure_votes(directory)
+        asyncio.run(measure_recovery(directory, 10000))
+
+
+if __name__ == '__main__':
+    main()
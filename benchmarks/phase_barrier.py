@@ -0,0 +1,137 @@
+import asyncio
+import random
+import time
+
+from server import PhaseBarrier
+
+STREAMS_CNT = 12000
+PHASES_CNT = 6
+# A game not over by then has a stream that slept through the end of its phase.
+TIMEOUT = 60
+
+
+class BarrierGame:
+    # The game side of the phases as in Game: every stream starts the phase, a night ends with the kill and the
+    # check, a day with the kill.
+    def __init__(self):
+        self.phase = 0
+        self.barrier = PhaseBarrier()
+        self.pending_steps: set[str] = set()
+        # Streams woken while their phase goes on, only to wait again.
+        self.spurious_wakes_cnt = 0
+        # Streams let through before their phase ended.
+        self.early_wakes_cnt = 0
+
+    def start(self, phase: int):
+        if phase <= self.phase:
+            return
+        self.phase = phase
+        self.pending_steps = {'kill', 'check'} if phase % 2 else {'kill'}
+
+    def end_step(self, phase: int, step: str):
+        if phase != self.phase:
+            return
+        self.pending_steps.discard(step)
+        if not self.pending_steps:
+            self.barrier.end(phase)
+
+    def is_ended(self, phase: int) -> bool:
+        return self.barrier.ended_phase >= phase
+
+    async def wait(self, phase: int):
+        await self.barrier.wait(phase)
+
+
+class EventGame(BarrierGame):
+    # What the streams shared before the barrier: the first stream to start a phase clears the events,
+    # every stream waits on them whatever phase it is in.
+    def __init__(self):
+        super().__init__()
+        self.ended_phase = 0
+        self.event_killed = asyncio.Event()
+        self.event_checked = asyncio.Event()
+
+    def start(self, phase: int):
+        if phase <= self.phase:
+            return
+        super().start(phase)
+        self.event_killed.clear()
+        if phase % 2:
+            self.event_checked.clear()
+
+    def end_step(self, phase: int, step: str):
+        if phase != self.phase:
+            return
+        (self.event_killed if step == 'kill' else self.event_checked).set()
+        self.pending_steps.discard(step)
+        if not self.pending_steps:
+            self.ended_phase = phase
+
+    def is_ended(self, phase: int) -> bool:
+        return self.ended_phase >= phase
+
+    async def wait(self, phase: int):
+        suspended = not self.event_killed.is_set()
+        await self.event_killed.wait()
+        if phase % 2 and not self.event_checked.is_set():
+            # Woken by the kill only to wait for the check.
+            self.spurious_wakes_cnt += suspended
+            await self.event_checked.wait()
+
+
+async def play_game(game: BarrierGame, rng: random.Random, players_cnt: int, max_delay: float):
+    loop = asyncio.get_running_loop()
+    voted_cnts = [0] * (PHASES_CNT + 1)
+
+    def vote(phase: int):
+        # The last vote kills, the kill ends its step a bit later.
+        voted_cnts[phase] += 1
+        if voted_cnts[phase] == players_cnt:
+            loop.call_later(rng.random() * max_delay, game.end_step, phase, 'kill')
+
+    async def stream(seat: int):
+        for phase in range(1, PHASES_CNT + 1):
+            game.start(phase)
+            # The players vote whenever they like. The detective of the first seat publishes on its own,
+            # about as often before the kill as after it.
+            loop.call_later(rng.random() * max_delay, vote, phase)
+            if seat == 0 and phase % 2:
+                loop.call_later(rng.random() * 3 * max_delay, game.end_step, phase, 'check')
+            # The stream itself is slow to get to waiting.
+            await asyncio.sleep(rng.random() * max_delay)
+            await game.wait(phase)
+            if not game.is_ended(phase):
+                game.early_wakes_cnt += 1
+
+    await asyncio.gather(*(stream(seat) for seat in range(players_cnt)))
+
+
+async def run(game_cls: type[BarrierGame], players_cnt: int,
+              max_delay: float) -> tuple[list[BarrierGame], int, float]:
+    rng = random.Random(1)
+    games = [game_cls() for _ in range(STREAMS_CNT // players_cnt)]
+    # CPU time only, the delays and a stuck game's timeout are spent idle.
+    started = time.process_time()
+    results = await asyncio.gather(*(asyncio.wait_for(play_game(game, rng, players_cnt, max_delay), TIMEOUT)
+                                     for game in games), return_exceptions=True)
+    elapsed = time.process_time() - started
+    return games, sum(isinstance(result, asyncio.TimeoutError) for result in results), elapsed
+
+
+def main():
+    print(f"{STREAMS_CNT} streams in games of each size at once, {PHASES_CNT} phases per game")
+    print(f"{'waiting on':<12} {'players':>8} {'delays, ms':>10} {'stuck games':>12} {'early wakes':>12} "
+          f"{'spurious wakes/phase':>21} {'CPU us/phase':>13}")
+    for players_cnt, max_delay in ((6, 2), (6, 0), (100, 2), (100, 0)):
+        for game_cls in (EventGame, BarrierGame):
+            games, stuck_cnt, elapsed = asyncio.run(run(game_cls, players_cnt, max_delay))
+            name = 'events' if game_cls is EventGame else 'barrier'
+            phases_cnt = len(games) * PHASES_CNT
+            print(f"{name:<12} {players_cnt:>8} {max_delay * 1000:>10.0f} {stuck_cnt:>12} "
+                  f"{sum(game.early_wakes_cnt for game in games):>12} "
+                  f"{sum(game.spurious_wakes_cnt for game in games) / phases_cnt:>21.2f} "
+                  f"{elapsed / phases_cnt * 1e6:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
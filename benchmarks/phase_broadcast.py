@@ -0,0 +1,96 @@
+import timeit
+
+import mafia_pb2
+
+from server import Game, PhaseBroadcaster
+
+
+def night(game: Game, player_id_to_player: dict[int, mafia_pb2.Player], player_id: int):
+    is_alive = game.is_alive(player_id)
+    return mafia_pb2.GameProcessResponse(
+        night=mafia_pb2.GameProcessResponse.StartNight(
+            is_alive=is_alive,
+            role=game.get_role(player_id),
+            players=[player_id_to_player[id] for id in game.get_alive_players_ids() - {player_id}],
+            mafias=[player_id_to_player[id] for id in game.get_alive_mafias_ids() - {
+                player_id}] if game.is_mafia(player_id) or not is_alive else []
+        )
+    )
+
+
+def day(game: Game, player_id_to_player: dict[int, mafia_pb2.Player], player_id: int):
+    detective_id = game.get_alive_detective_id()
+    return mafia_pb2.GameProcessResponse(
+        day=mafia_pb2.GameProcessResponse.StartDay(
+            is_alive=game.is_alive(player_id),
+            players=[player_id_to_player[id] for id in game.get_alive_players_ids() - {player_id}],
+            mafias=[player_id_to_player[id] for id in
+                    game.get_alive_mafias_ids()] if game.checked_decision and detective_id else [],
+            detective=player_id_to_player[detective_id] if detective_id else None
+        )
+    )
+
+
+def per_stream_transition(game: Game, player_id_to_player: dict[int, mafia_pb2.Player]):
+    for player_id in player_id_to_player:
+        night(game, player_id_to_player, player_id).SerializeToString()
+    for player_id in player_id_to_player:
+        day(game, player_id_to_player, player_id).SerializeToString()
+
+
+def broadcast_transition(game: Game, player_id_to_player: dict[int, mafia_pb2.Player]):
+    # A fresh broadcaster per transition, as if the game state has just changed.
+    broadcaster = PhaseBroadcaster(game, player_id_to_player)
+    for phase in (1, 2):
+        broadcaster.publish(phase)
+        for player_id in player_id_to_player:
+            broadcaster.render(broadcaster.events[-1], player_id).SerializeToString()
+
+
+def normalized(response: mafia_pb2.GameProcessResponse) -> mafia_pb2.GameProcessResponse:
+    # Player lists come out of sets, so only their contents are comparable.
+    response.ClearField("seq")
+    phase = getattr(response, response.WhichOneof("event"))
+    for players in (phase.players, phase.mafias):
+        players.sort(key=lambda player: player.id)
+    return response
+
+
+def make_game(players_cnt: int) -> tuple[Game, dict[int, mafia_pb2.Player]]:
+    game = Game(players_cnt, seed=players_cnt)
+    player_id_to_player = dict()
+    for player_id in range(1, players_cnt + 1):
+        player_id_to_player[player_id] = mafia_pb2.Player(name=f"player{player_id}", id=player_id)
+        game.add_player(player_id)
+
+    # Kill somebody and publish the mafias so that every message branch is filled.
+    for player_id in range(1, players_cnt + 1):
+        game.add_day_vote(player_id, 1 if player_id != 1 else 2)
+    game.checked_decision = True
+    return game, player_id_to_player
+
+
+def main():
+    print(f"{'players':>8} {'per stream, ms':>15} {'broadcast, ms':>15} {'speedup':>8}")
+    for players_cnt in (10, 100, 500):
+        game, player_id_to_player = make_game(players_cnt)
+
+        broadcaster = PhaseBroadcaster(game, player_id_to_player)
+        broadcaster.publish(1)
+        broadcaster.publish(2)
+        night_event, day_event = broadcaster.events
+        for player_id in player_id_to_player:
+            assert normalized(broadcaster.render(night_event, player_id)) == normalized(
+                night(game, player_id_to_player, player_id))
+            assert normalized(broadcaster.render(day_event, player_id)) == normalized(
+                day(game, player_id_to_player, player_id))
+
+        number = max(1, 1000 // players_cnt)
+        results = [min(timeit.repeat(lambda: transition(game, player_id_to_player), number=number, repeat=3))
+                   / number * 1000 for transition in (per_stream_transition, broadcast_transition)]
+        per_stream, broadcast = results
+        print(f"{players_cnt:>8} {per_stream:>15.3f} {broadcast:>15.3f} {per_stream / broadcast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import grpc
+
+import loadgen
+import mafia_pb2
+import mafia_pb2_grpc
+from server import EService
+
+GAMES_CNT = 300
+PLAYERS_CNT = 6
+ACTIONS = ('VoteDay', 'VoteNight', 'Check', 'Publish')
+
+
+async def make_games(stub: mafia_pb2_grpc.MafiaStub, stats: loadgen.Stats, session: bool) -> list[list[loadgen.Bot]]:
+    games = []
+    for _ in range(GAMES_CNT):
+        game = loadgen.BotGame()
+        bots = [loadgen.Bot(f"bot{i}", stub, game, stats, session) for i in range(PLAYERS_CNT)]
+        for bot in bots:
+            await bot.connect_to_server()
+        response = await stub.CreateGame(mafia_pb2.CreateGameRequest(
+            token=bots[0].token, required_players_cnt=PLAYERS_CNT, fast_mode=True))
+        for bot in bots[1:]:
+            await stub.JoinGame(mafia_pb2.JoinGameRequest(token=bot.token, code=response.code))
+        games.append(bots)
+    return games
+
+
+async def play(address: str, session: bool) -> tuple[loadgen.Stats, int]:
+    # Only the play itself is timed, the games are set up beforehand.
+    stats = loadgen.Stats()
+    async with grpc.aio.insecure_channel(address) as channel:
+        stub = mafia_pb2_grpc.MafiaStub(channel)
+        games = await make_games(stub, stats, session)
+        stats.rpc_latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(bot.play_game() for bots in games for bot in bots))
+        stats.elapsed = time.perf_counter() - started
+    actions_cnt = sum(len(stats.rpc_latencies[method]) for method in ACTIONS)
+    # A unary play is a GameProcess call and a call per action, a session is one Play call.
+    rpcs_cnt = GAMES_CNT * PLAYERS_CNT + (0 if session else actions_cnt)
+    return stats, rpcs_cnt
+
+
+async def main():
+    server = grpc.aio.server()
+    mafia_pb2_grpc.add_MafiaServicer_to_server(EService(phase_delay=0), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+
+    print(f"{GAMES_CNT} games x {PLAYERS_CNT} players played at once over a local channel")
+    print(f"{'actions sent over':<20} {'RPCs':>7} {'RPC/s':>8} {'actions/s':>10} {'p50, ms':>8} {'p99, ms':>8}")
+    for session in (False, True, False, True):
+        stats, rpcs_cnt = await play(f'127.0.0.1:{port}', session)
+        latencies = [latency for method in ACTIONS for latency in stats.rpc_latencies[method]]
+        print(f"{'Play stream' if session else 'unary calls':<20} {rpcs_cnt:>7} {rpcs_cnt / stats.elapsed:>8.0f} "
+              f"{len(latencies) / stats.elapsed:>10.0f} {loadgen.percentile(latencies, 0.5) * 1000:>8.2f} "
+              f"{loadgen.percentile(latencies, 0.99) * 1000:>8.2f}")
+    await server.stop(None)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
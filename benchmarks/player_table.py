@@ -0,0 +1,100 @@
+import gc
+import tracemalloc
+
+import mafia_pb2
+
+from server import Game
+
+
+class PlayerInfo:
+    # The per-player object Game used before the seat table.
+    def __init__(self):
+        self.role: mafia_pb2.Role = mafia_pb2.ROLE_UNSPECIFIED
+        self.is_alive = True
+
+
+class DictGame(Game):
+    # Game with the old dict table in place of the seat table, only as much of it as building a game needs.
+    def __init__(self, required_players_cnt: int):
+        super().__init__(required_players_cnt)
+        del self.player_id_to_seat, self.players_ids, self.roles, self.alive
+        self.player_id_to_player_info: dict[int, PlayerInfo] = dict()
+
+    def add_player(self, player_id: int):
+        if player_id in self.player_id_to_player_info:
+            raise Exception(f'{player_id} already joined.')
+        self.seat(player_id)
+        if self.is_full():
+            self.assign_roles()
+
+    def seat(self, player_id: int):
+        self.player_id_to_player_info[player_id] = PlayerInfo()
+        self.alive_players_ids.add(player_id)
+        self.version += 1
+
+    def is_full(self) -> bool:
+        return len(self.player_id_to_player_info) == self.required_players_cnt
+
+    def get_players_ids(self) -> list[int]:
+        return list(self.player_id_to_player_info)
+
+    def set_roles(self, roles):
+        for (id, player_info), role in zip(self.player_id_to_player_info.items(), roles):
+            player_info.role = role
+            if role == mafia_pb2.ROLE_MAFIA:
+                self.alive_mafias_ids.add(id)
+            elif role == mafia_pb2.ROLE_DETECTIVE:
+                self.alive_detective_id = id
+        self.version += 1
+
+
+def dict_table(game: Game) -> dict[int, PlayerInfo]:
+    table = dict()
+    for player_id in game.get_players_ids():
+        table[player_id] = PlayerInfo()
+        table[player_id].role = game.get_role(player_id)
+    return table
+
+
+def seat_table(game: Game) -> tuple:
+    return dict(game.player_id_to_seat), list(game.players_ids), bytearray(game.roles), bytearray(game.alive)
+
+
+def allocated(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def make_game(players_cnt: int, first_id: int, game_cls=Game) -> Game:
+    game = game_cls(players_cnt)
+    for player_id in range(first_id, first_id + players_cnt):
+        game.add_player(player_id)
+    return game
+
+
+def main():
+    print(f"{'players':>8} {'games':>7} {'dict game, B':>13} {'seat game, B':>13} "
+          f"{'dict table, B/player':>21} {'seat table, B/player':>21}")
+    for players_cnt in (4, 10, 100, 1000):
+        games_cnt = max(10, 100000 // players_cnt)
+        dict_game_bytes = allocated(
+            lambda: [make_game(players_cnt, i * players_cnt, DictGame) for i in range(games_cnt)])
+        seat_game_bytes = allocated(lambda: [make_game(players_cnt, i * players_cnt) for i in range(games_cnt)])
+
+        games = [make_game(players_cnt, i * players_cnt) for i in range(games_cnt)]
+        dict_bytes = allocated(lambda: [dict_table(game) for game in games])
+        seat_bytes = allocated(lambda: [seat_table(game) for game in games])
+
+        players_total = players_cnt * games_cnt
+        print(f"{players_cnt:>8} {games_cnt:>7} {dict_game_bytes / games_cnt:>13.0f} "
+              f"{seat_game_bytes / games_cnt:>13.0f} "
+              f"{dict_bytes / players_total:>21.1f} {seat_bytes / players_total:>21.1f}")
+
+
+if __name__ == '__main__':
+    main()
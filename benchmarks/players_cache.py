@@ -0,0 +1,66 @@
+import timeit
+
+import mafia_pb2
+from server import Game, PhaseBroadcaster
+
+
+def make_game(players_cnt: int) -> tuple[Game, dict[int, mafia_pb2.Player]]:
+    game = Game(players_cnt, seed=players_cnt)
+    player_id_to_player = dict()
+    for player_id in range(1, players_cnt + 1):
+        player_id_to_player[player_id] = mafia_pb2.Player(name=f"player{player_id}", id=player_id)
+        game.add_player(player_id)
+    for player_id in game.get_alive_mafias_ids():
+        game.checked_ids.append(player_id)
+    return game, player_id_to_player
+
+
+def list_players(game: Game, player_id_to_player: dict[int, mafia_pb2.Player]) -> bytes:
+    # What ListPlayers built for every call before the cache.
+    return mafia_pb2.ListPlayersResponse(required_players_cnt=game.required_players_cnt,
+                                         players=[player_id_to_player[player_id] for player_id in
+                                                  game.get_players_ids()]).SerializeToString()
+
+
+def check(game: Game, player_id_to_player: dict[int, mafia_pb2.Player]) -> bytes:
+    return mafia_pb2.CheckResponse(mafias=[player_id_to_player[player_id]
+                                           for player_id in game.checked_ids]).SerializeToString()
+
+
+def phase(broadcaster: PhaseBroadcaster):
+    # The next night is built once, then every stream is sent it.
+    broadcaster.publish(broadcaster.events[-1].seq + 2 if broadcaster.events else 1)
+    for player_id in broadcaster.player_id_to_player:
+        broadcaster.render(broadcaster.events[-1], player_id).SerializeToString()
+
+
+def per_call(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+def main():
+    # Responses are serialized as gRPC does it, a cached one is only serialized.
+    print(f"{'players':>8} {'ListPlayers, us':>16} {'cached, us':>11} {'Check, us':>10} {'cached, us':>11} "
+          f"{'phase, ms':>10} {'cached, ms':>11}")
+    for players_cnt in (6, 20, 100, 500):
+        game, player_id_to_player = make_game(players_cnt)
+        broadcaster = PhaseBroadcaster(game, player_id_to_player)
+        assert broadcaster.list_players().SerializeToString() == list_players(game, player_id_to_player)
+        assert broadcaster.checked().SerializeToString() == check(game, player_id_to_player)
+
+        number = max(10, 20000 // players_cnt)
+        rows = [per_call(lambda: list_players(game, player_id_to_player), number) * 1e6,
+                per_call(lambda: broadcaster.list_players().SerializeToString(), number) * 1e6,
+                per_call(lambda: check(game, player_id_to_player), number) * 1e6,
+                per_call(lambda: broadcaster.checked().SerializeToString(), number) * 1e6]
+
+        # A fresh broadcaster for every phase serializes the players again, as before the per-game cache.
+        number = max(1, 1000 // players_cnt)
+        rows.append(per_call(lambda: phase(PhaseBroadcaster(game, player_id_to_player)), number) * 1e3)
+        rows.append(per_call(lambda: phase(broadcaster), number) * 1e3)
+        print(f"{players_cnt:>8} {rows[0]:>16.2f} {rows[1]:>11.2f} {rows[2]:>10.2f} {rows[3]:>11.2f} "
+              f"{rows[4]:>10.3f} {rows[5]:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import loadgen
+import mafia_pb2
+from benchmarks.soak import Context
+from matchmaking import Matchmaker
+from server import EService
+
+PLAYERS_CNT = 6
+# As many of 10k players as fill whole games.
+QUEUED_CNT = 10000 // PLAYERS_CNT * PLAYERS_CNT
+
+
+class ScanMatchmaker(Matchmaker):
+    # One list of everybody waiting, searched for players wanting the same game on every arrival.
+    def __init__(self, form):
+        super().__init__(form)
+        self.waiters: list[tuple[str, object, tuple[int, bool], asyncio.Future]] = []
+
+    def enqueue(self, token: str, item, required_players_cnt: int, fast_mode: bool) -> asyncio.Future:
+        key = (required_players_cnt, fast_mode)
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((token, item, key, future))
+        self.token_to_waiter[token] = (key, future)
+        matched = [waiter for waiter in self.waiters if waiter[2] == key]
+        if len(matched) == required_players_cnt:
+            self.waiters = [waiter for waiter in self.waiters if waiter[2] != key]
+            for token, *_ in matched:
+                del self.token_to_waiter[token]
+            game = self.form(required_players_cnt, fast_mode, [item for _, item, _, _ in matched])
+            for *_, future in matched:
+                future.set_result(game)
+        return future
+
+    def leave(self, token: str):
+        del self.token_to_waiter[token]
+        self.waiters = [waiter for waiter in self.waiters if waiter[0] != token]
+
+
+async def connect(service: EService, players_cnt: int) -> list[str]:
+    return [(await service.Connect(mafia_pb2.ConnectRequest(name='bot'), Context())).token
+            for _ in range(players_cnt)]
+
+
+async def quick_match(service: EService, token: str, required_players_cnt: int) -> float:
+    started = time.perf_counter()
+    await service.QuickMatch(mafia_pb2.QuickMatchRequest(token=token, required_players_cnt=required_players_cnt,
+                                                         fast_mode=True), Context())
+    return time.perf_counter() - started
+
+
+async def run(matchmaker_cls: type[Matchmaker], backlog_cnt: int) -> tuple[float, list[float]]:
+    # The backlog waits for a game too big to ever fill, the measured players arrive all at once.
+    service = EService(phase_delay=0)
+    service.matchmaker = matchmaker_cls(service.form_game)
+    backlog = [asyncio.create_task(service.QuickMatch(mafia_pb2.QuickMatchRequest(
+        token=token, required_players_cnt=10 ** 6), Context())) for token in await connect(service, backlog_cnt)]
+    tokens = await connect(service, QUEUED_CNT)
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(quick_match(service, token, PLAYERS_CNT) for token in tokens))
+    elapsed = time.perf_counter() - started
+    assert service.get_stats()['live_games'] == QUEUED_CNT // PLAYERS_CNT
+
+    for task in backlog:
+        task.cancel()
+    await asyncio.gather(*backlog, return_exceptions=True)
+    assert service.get_stats()['queued_players'] == 0
+    return elapsed, latencies
+
+
+def main():
+    print(f"{QUEUED_CNT} players asking for {PLAYERS_CNT}-player games at once, in-process handlers")
+    print(f"{'matchmaker':<12} {'backlog':>8} {'players/s':>10} {'games/s':>8} "
+          f"{'p50 match, ms':>14} {'p99 match, ms':>14}")
+    for backlog_cnt in (0, QUEUED_CNT):
+        for matchmaker_cls in (ScanMatchmaker, Matchmaker):
+            elapsed, latencies = asyncio.run(run(matchmaker_cls, backlog_cnt))
+            name = 'scan' if matchmaker_cls is ScanMatchmaker else 'queues'
+            print(f"{name:<12} {backlog_cnt:>8} {QUEUED_CNT / elapsed:>10.0f} "
+                  f"{QUEUED_CNT // PLAYERS_CNT / elapsed:>8.0f} {loadgen.percentile(latencies, 0.5) * 1000:>14.1f} "
+                  f"{loadgen.percentile(latencies, 0.99) * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import mafia_pb2
+from benchmarks.soak import Context
+from server import EService
+
+CALLS_CNT = 200000
+GAMES_CNT = 1000
+PLAYERS_CNT = 6
+
+
+async def make_service() -> tuple[EService, list[str]]:
+    service = EService(phase_delay=0)
+    tokens = []
+    for _ in range(GAMES_CNT):
+        seats = [(await service.Connect(mafia_pb2.ConnectRequest(name='bot'), Context())).token
+                 for _ in range(PLAYERS_CNT)]
+        response = await service.CreateGame(mafia_pb2.CreateGameRequest(
+            token=seats[0], required_players_cnt=PLAYERS_CNT), Context())
+        for token in seats[1:]:
+            await service.JoinGame(mafia_pb2.JoinGameRequest(token=token, code=response.code), Context())
+        tokens.extend(seats)
+    return service, tokens
+
+
+class Lookup:
+    # The maps find_game walked before sessions, filled from the same service.
+    def __init__(self, service: EService):
+        self.token_to_player = {token: session.player for token, session in service.token_to_session.items()}
+        self.player_id_to_game_id = {session.player.id: session.game.id
+                                     for session in service.token_to_session.values() if session.game}
+        self.game_id_to_game = dict(service.game_id_to_game)
+
+    def find_game(self, token: str, context, method: str):
+        if token not in self.token_to_player:
+            return None
+        player = self.token_to_player[token]
+        if player.id not in self.player_id_to_game_id:
+            return None
+        game_id = self.player_id_to_game_id[player.id]
+        if game_id not in self.game_id_to_game:
+            return None
+        return player, self.game_id_to_game[game_id]
+
+
+def per_lookup(find_game, tokens: list[str]) -> float:
+    context = Context()
+    started = time.perf_counter()
+    for i in range(CALLS_CNT):
+        find_game(tokens[i % len(tokens)], context, 'GetRole')
+    return (time.perf_counter() - started) / CALLS_CNT
+
+
+async def per_rpc(service: EService, tokens: list[str]) -> float:
+    requests = [mafia_pb2.GetRoleRequest(token=token) for token in tokens]
+    context = Context()
+    started = time.perf_counter()
+    for i in range(CALLS_CNT):
+        await service.GetRole(requests[i % len(requests)], context)
+    return (time.perf_counter() - started) / CALLS_CNT
+
+
+def main():
+    service, tokens = asyncio.run(make_service())
+    print(f"{GAMES_CNT} games x {PLAYERS_CNT} players, {CALLS_CNT} calls")
+    print(f"{'dispatch':<36} {'ns/call':>8}")
+    print(f"{'token -> player -> game id -> game':<36} {per_lookup(Lookup(service).find_game, tokens) * 1e9:>8.0f}")
+    print(f"{'token -> session':<36} {per_lookup(service.find_game, tokens) * 1e9:>8.0f}")
+    print(f"{'whole in-process GetRole':<36} {asyncio.run(per_rpc(service, tokens)) * 1e9:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+
+import grpc
+
+import loadgen
+
+PLAYERS_CNT = 6
+GAMES_CNT = 200
+PROCESSES_CNT = 4
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure(workers_cnt: int) -> loadgen.Stats:
+    port = free_port()
+    env = dict(os.environ, HOST='127.0.0.1', PORT=str(port), WORKERS=str(workers_cnt), PHASE_DELAY='0')
+    # A session of its own, so the workers are stopped together with the router.
+    server = subprocess.Popen([sys.executable, 'server.py'], env=env, stderr=subprocess.DEVNULL,
+                              start_new_session=True)
+    try:
+        with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+            grpc.channel_ready_future(channel).result(timeout=30)
+        return loadgen.run_processes(f'127.0.0.1:{port}', GAMES_CNT, PROCESSES_CNT, PLAYERS_CNT, GAMES_CNT)
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    print(f"cores: {os.cpu_count()}, {PROCESSES_CNT} loadgen processes, {GAMES_CNT} games x {PLAYERS_CNT} players")
+    print(f"{'workers':>8} {'games/s':>10} {'p50 rpc, ms':>12} {'p99 rpc, ms':>12}")
+    for workers_cnt in (1, 2, 4):
+        stats = measure(workers_cnt)
+        latencies = [latency for method_latencies in stats.rpc_latencies.values() for latency in method_latencies]
+        print(f"{workers_cnt:>8} {stats.games_cnt / stats.elapsed:>10.1f} "
+              f"{loadgen.percentile(latencies, 0.5) * 1000:>12.2f} {loadgen.percentile(latencies, 0.99) * 1000:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import math
+import time
+
+import grpc
+
+import loadgen
+import mafia_pb2
+import mafia_pb2_grpc
+from benchmarks.play_stream import GAMES_CNT, PLAYERS_CNT, make_games
+from server import EService
+from streams import SendQueue
+
+BAD_CNT = 8
+# Actions every bad client sends without reading a single result.
+SPAM_CNT = 6000
+ACTIONS = ('VoteDay', 'VoteNight', 'Check', 'Publish')
+
+
+class TrackingService(EService):
+    # Keeps every stream queue to see what they hold. Unbounded queues are what Play had before.
+    def __init__(self, bounded: bool):
+        super().__init__(phase_delay=0)
+        self.bounded = bounded
+        self.queues: list[SendQueue] = []
+
+    def open_queue(self, method: str) -> SendQueue:
+        queue = super().open_queue(method)
+        if not self.bounded:
+            queue.size = math.inf
+        self.queues.append(queue)
+        return queue
+
+
+async def spam(stub: mafia_pb2_grpc.MafiaStub, token: str) -> grpc.aio.StreamStreamCall:
+    async def requests():
+        yield mafia_pb2.PlayRequest(start=mafia_pb2.GameProcessRequest(token=token))
+        for _ in range(SPAM_CNT):
+            yield mafia_pb2.PlayRequest(action=mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(player_id=-1)))
+    return stub.Play(requests())
+
+
+async def start_bad_clients(stub: mafia_pb2_grpc.MafiaStub) -> list[grpc.aio.StreamStreamCall]:
+    # Seats in games that never start, so the only thing their streams send is the rejected actions.
+    tokens = [(await stub.Connect(mafia_pb2.ConnectRequest(name='bad'))).token for _ in range(BAD_CNT)]
+    for i in range(0, BAD_CNT, 4):
+        code = (await stub.CreateGame(mafia_pb2.CreateGameRequest(token=tokens[i], required_players_cnt=5))).code
+        for token in tokens[i + 1:i + 4]:
+            await stub.JoinGame(mafia_pb2.JoinGameRequest(token=token, code=code))
+    return [await spam(stub, token) for token in tokens]
+
+
+async def run(bounded: bool) -> list[float]:
+    service = TrackingService(bounded)
+    server = grpc.aio.server()
+    mafia_pb2_grpc.add_MafiaServicer_to_server(service, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+
+    stats = loadgen.Stats()
+    # The bad clients are on a bad link: no window growth beyond the default 64 KB.
+    async with grpc.aio.insecure_channel(f'127.0.0.1:{port}') as channel, \
+            grpc.aio.insecure_channel(f'127.0.0.1:{port}', options=[('grpc.http2.bdp_probe', 0)]) as bad_channel:
+        stub = mafia_pb2_grpc.MafiaStub(channel)
+        games = await make_games(stub, stats, session=True)
+        stats.rpc_latencies.clear()
+        calls = await start_bad_clients(mafia_pb2_grpc.MafiaStub(bad_channel))
+
+        queued_cnt = 0
+
+        async def sample():
+            nonlocal queued_cnt
+            while True:
+                queued_cnt = max(queued_cnt, sum(len(queue.messages) for queue in service.queues))
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.create_task(sample())
+        started = time.perf_counter()
+        await asyncio.gather(*(bot.play_game() for bots in games for bot in bots))
+        elapsed = time.perf_counter() - started
+        # For whatever the bad clients still have to send.
+        await asyncio.sleep(2)
+        sampler.cancel()
+        dropped_cnt = sum(queue.overflowed for queue in service.queues)
+        for call in calls:
+            call.cancel()
+    await server.stop(None)
+
+    latencies = [latency for method in ACTIONS for latency in stats.rpc_latencies[method]]
+    return [GAMES_CNT / elapsed, loadgen.percentile(latencies, 0.5) * 1000, loadgen.percentile(latencies, 0.99) * 1000,
+            loadgen.percentile(stats.event_latencies, 0.99) * 1000, queued_cnt, dropped_cnt]
+
+
+def main():
+    # Every dropped stream is a warning and every write pending when a bad client goes away an asyncio error.
+    logging.disable(logging.ERROR)
+    print(f"{GAMES_CNT} {PLAYERS_CNT}-player games over Play next to {BAD_CNT} clients sending {SPAM_CNT} actions each "
+          f"without reading the results")
+    print(f"{'stream queues':<14} {'games/s':>8} {'p50 action, ms':>15} {'p99 action, ms':>15} {'p99 event, ms':>14} "
+          f"{'max queued':>11} {'dropped':>8}")
+    for bounded in (False, True):
+        row = asyncio.run(run(bounded))
+        print(f"{'bounded' if bounded else 'unbounded':<14} {row[0]:>8.1f} {row[1]:>15.2f} {row[2]:>15.2f} "
+              f"{row[3]:>14.2f} {row[4]:>11} {row[5]:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import gc
+import inspect
+import os
+
+import loadgen
+from server import EService
+
+
+class Context:
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+
+async def pump(stream):
+    # Like gRPC, runs a server stream ahead of its reader instead of resuming it only on demand.
+    queue = asyncio.Queue()
+
+    async def produce():
+        async for response in stream:
+            await queue.put(response)
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    while (response := await queue.get()) is not None:
+        yield response
+    await producer
+
+
+class LocalStub:
+    # Calls EService handlers directly, so the soak measures the server state and not gRPC.
+    def __init__(self, service: EService):
+        self.service = service
+
+    def __getattr__(self, method: str):
+        handler = getattr(self.service, method)
+
+        def call(request):
+            result = handler(request, Context())
+            return pump(result) if inspect.isasyncgen(result) else result
+        return call
+
+
+def rss_mb() -> float:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+async def soak(games_cnt: int, checkpoints_cnt: int, players_cnt: int):
+    service = EService(phase_delay=0, token_ttl=0)
+    stub = LocalStub(service)
+
+    print(f"{'games':>8} {'rss, MB':>8} {'objects':>9} {'live games':>11} {'live tokens':>12} "
+          f"{'reclaimed games':>16} {'reclaimed tokens':>17}")
+    played_cnt = 0
+    for _ in range(checkpoints_cnt):
+        await loadgen.play_games([stub], games_cnt // checkpoints_cnt, players_cnt, concurrency=200)
+        played_cnt += games_cnt // checkpoints_cnt
+        await service.sweep()
+        gc.collect()
+
+        stats = service.get_stats()
+        print(f"{played_cnt:>8} {rss_mb():>8.1f} {len(gc.get_objects()):>9} {stats['live_games']:>11} "
+              f"{stats['live_tokens']:>12} {stats.get('reclaimed_finished_games', 0):>16} "
+              f"{stats.get('reclaimed_tokens', 0):>17}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays many games in-process and reports memory after each batch.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--players", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(soak(args.games, args.checkpoints, args.players))
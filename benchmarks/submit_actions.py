@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import grpc
+
+import mafia_pb2
+import mafia_pb2_grpc
+from server import EService
+
+GAMES_CNT = 200
+PLAYERS_CNT = 10
+
+
+async def make_games(stub: mafia_pb2_grpc.MafiaStub) -> list[list[tuple[str, int]]]:
+    # Every game as its seats' tokens and the id of the player each of them votes for.
+    games = []
+    for _ in range(GAMES_CNT):
+        tokens = [(await stub.Connect(mafia_pb2.ConnectRequest(name=f'bot{i}'))).token for i in range(PLAYERS_CNT)]
+        response = await stub.CreateGame(mafia_pb2.CreateGameRequest(
+            token=tokens[0], required_players_cnt=PLAYERS_CNT, fast_mode=True))
+        for token in tokens[1:]:
+            await stub.JoinGame(mafia_pb2.JoinGameRequest(token=token, code=response.code))
+        players = (await stub.ListPlayers(mafia_pb2.ListPlayersRequest(token=tokens[0]))).players
+        games.append([(token, players[(seat + 1) % PLAYERS_CNT].id) for seat, token in enumerate(tokens)])
+    return games
+
+
+async def vote_unary(stub: mafia_pb2_grpc.MafiaStub, games: list[list[tuple[str, int]]]) -> int:
+    for seats in games:
+        await asyncio.gather(*(stub.VoteDay(mafia_pb2.VoteDayRequest(token=token, player_id=candidate_id))
+                               for token, candidate_id in seats))
+    return len(games) * PLAYERS_CNT
+
+
+async def vote_batched(stub: mafia_pb2_grpc.MafiaStub, games: list[list[tuple[str, int]]], games_per_batch: int) -> int:
+    for start in range(0, len(games), games_per_batch):
+        response = await stub.SubmitActions(mafia_pb2.SubmitActionsRequest(actions=[
+            mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(token=token, player_id=candidate_id))
+            for seats in games[start:start + games_per_batch] for token, candidate_id in seats]))
+        assert all(result.code == grpc.StatusCode.OK.value[0] for result in response.results), response
+    return (len(games) + games_per_batch - 1) // games_per_batch
+
+
+async def main():
+    server = grpc.aio.server()
+    mafia_pb2_grpc.add_MafiaServicer_to_server(EService(phase_delay=0), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+
+    print(f"one day of {GAMES_CNT} games x {PLAYERS_CNT} voters over a local channel")
+    print(f"{'votes sent as':<32} {'RPCs':>6} {'votes/s':>9} {'us/vote':>8}")
+    async with grpc.aio.insecure_channel(f'127.0.0.1:{port}') as channel:
+        stub = mafia_pb2_grpc.MafiaStub(channel)
+        cases = [("VoteDay per seat", lambda games: vote_unary(stub, games))]
+        for games_per_batch in (1, 10, GAMES_CNT):
+            cases.append((f"SubmitActions, {games_per_batch} games/batch",
+                          lambda games, games_per_batch=games_per_batch: vote_batched(stub, games, games_per_batch)))
+        for name, vote in cases:
+            games = await make_games(stub)
+            started = time.perf_counter()
+            rpcs_cnt = await vote(games)
+            elapsed = time.perf_counter() - started
+            votes_cnt = GAMES_CNT * PLAYERS_CNT
+            print(f"{name:<32} {rpcs_cnt:>6} {votes_cnt / elapsed:>9.0f} {elapsed / votes_cnt * 1e6:>8.1f}")
+    await server.stop(None)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
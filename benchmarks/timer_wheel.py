@@ -0,0 +1,92 @@
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from timers import TimerWheel
+
+GAMES_CNT = 100000
+VOTE_TIMEOUT = 60
+# The deadlines to fire are spread over this long.
+SPREAD = 1.0
+
+
+def noop(*args):
+    pass
+
+
+class LoopTimers:
+    # A loop.call_later per game, as a deadline would be without the wheel.
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+    def add(self, delay: float, callback, *args) -> asyncio.TimerHandle:
+        return self.loop.call_later(delay, callback, *args)
+
+    def cancel(self, handle: asyncio.TimerHandle):
+        handle.cancel()
+
+
+def arm(timers, games_cnt: int) -> tuple[float, float, list]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    handles = [timers.add(VOTE_TIMEOUT, noop, game_id, 'abstain') for game_id in range(games_cnt)]
+    elapsed = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, memory, handles
+
+
+def rearm(timers, handles: list) -> float:
+    # Every game starts its next phase: the old deadline goes, a new one comes.
+    started = time.perf_counter()
+    for i, handle in enumerate(handles):
+        timers.cancel(handle)
+        handles[i] = timers.add(VOTE_TIMEOUT, noop, i, 'abstain')
+    return time.perf_counter() - started
+
+
+async def fire(timers_cls, games_cnt: int) -> tuple[float, float]:
+    # Deadlines due within SPREAD, the loop runs until all of them fired. Returns CPU and wall time.
+    fired = []
+    timers = timers_cls()
+    runner = None
+    if isinstance(timers, TimerWheel):
+        runner = asyncio.create_task(timers.run_forever())
+    for game_id in range(games_cnt):
+        timers.add(SPREAD * game_id / games_cnt, fired.append, game_id)
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    while len(fired) < games_cnt:
+        await asyncio.sleep(0.01)
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    if runner is not None:
+        runner.cancel()
+    return cpu, elapsed
+
+
+async def run(timers_cls, games_cnt: int) -> list[float]:
+    timers = timers_cls()
+    arm_elapsed, memory, handles = arm(timers, games_cnt)
+    rearm_elapsed = rearm(timers, handles)
+    for handle in handles:
+        timers.cancel(handle)
+    del handles
+    fire_cpu, fire_elapsed = await fire(timers_cls, games_cnt)
+    return [arm_elapsed / games_cnt * 1e6, rearm_elapsed / games_cnt * 1e6, memory / games_cnt,
+            fire_cpu * 1000, fire_elapsed * 1000]
+
+
+def main():
+    print(f"{GAMES_CNT} games with a {VOTE_TIMEOUT}s vote deadline each, "
+          f"firing {GAMES_CNT} deadlines spread over {SPREAD:.0f}s")
+    print(f"{'timers':<12} {'arm, us':>8} {'re-arm, us':>11} {'bytes/timer':>12} {'fire CPU, ms':>13} "
+          f"{'fire wall, ms':>14}")
+    for name, timers_cls in (('call_later', LoopTimers), ('wheel', TimerWheel)):
+        row = asyncio.run(run(timers_cls, GAMES_CNT))
+        print(f"{name:<12} {row[0]:>8.2f} {row[1]:>11.2f} {row[2]:>12.0f} {row[3]:>13.0f} {row[4]:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import time
+
+import mafia_pb2
+
+import balance
+import simulate
+
+SCALAR_GAMES_CNT = 20000
+VECTORIZED_GAMES_CNT = 200000
+
+
+def main():
+    print(f"{'players':>8} {'scalar, games/s':>16} {'numpy, games/s':>15} {'speedup':>8} "
+          f"{'scalar mafia':>13} {'numpy mafia':>12} {'scalar published':>17} {'numpy published':>16}")
+    for players_cnt in (4, 6, 10, 16, 32):
+        stats = simulate.simulate_games(SCALAR_GAMES_CNT, players_cnt)
+        scalar = stats.games_cnt / stats.elapsed
+
+        started = time.perf_counter()
+        mafia_win_rate, _, published_rate = balance.simulate_games(VECTORIZED_GAMES_CNT, players_cnt)
+        vectorized = VECTORIZED_GAMES_CNT / (time.perf_counter() - started)
+
+        print(f"{players_cnt:>8} {scalar:>16.0f} {vectorized:>15.0f} {vectorized / scalar:>7.1f}x "
+              f"{stats.winners[mafia_pb2.ROLE_MAFIA] / stats.games_cnt:>13.1%} {mafia_win_rate:>12.1%} "
+              f"{stats.published_cnt / stats.games_cnt:>17.1%} {published_rate:>16.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import random
+import time
+
+from server import Game
+
+
+class CountGame(Game):
+    def add_vote(self, player_id: int, candidate_id: int, voters_ids: set[int], **event):
+        if player_id not in voters_ids:
+            raise Exception(f'{player_id} is not voter.')
+
+        if player_id in self.votes:
+            raise Exception(f'{player_id} already voted.')
+
+        alive_players_ids = self.get_alive_players_ids()
+        if candidate_id not in alive_players_ids:
+            raise Exception(f'{candidate_id} is not alive candidate.')
+
+        self.votes[player_id] = candidate_id
+        if len(self.votes) == len(voters_ids):
+            votes = list(self.votes.values())
+            self.leaders_ids = [max(alive_players_ids, key=votes.count)]
+            self.choose_and_kill_player()
+            self.votes = dict()
+
+
+def day(game_cls: type[Game], voters_cnt: int, seed: int) -> tuple[float, float]:
+    game = game_cls(voters_cnt, seed=seed)
+    for player_id in range(1, voters_cnt + 1):
+        game.add_player(player_id)
+
+    rnd = random.Random(seed)
+    votes = [(player_id, rnd.randint(1, voters_cnt)) for player_id in range(1, voters_cnt + 1)]
+    started = time.perf_counter()
+    for player_id, candidate_id in votes[:-1]:
+        game.add_day_vote(player_id, candidate_id)
+    resolution_started = time.perf_counter()
+    game.add_day_vote(*votes[-1])
+    finished = time.perf_counter()
+    return finished - started, finished - resolution_started
+
+
+def main():
+    print(f"{'voters':>8} {'count day, ms':>15} {'count kill, ms':>15} {'tally day, ms':>15} {'tally kill, ms':>15}")
+    for voters_cnt in (10, 100, 1000, 10000):
+        results = []
+        for game_cls in (CountGame, Game):
+            results.extend(min(day(game_cls, voters_cnt, seed) for seed in range(3)))
+        print(f"{voters_cnt:>8}", *(f"{result * 1000:>15.3f}" for result in results))
+
+
+if __name__ == '__main__':
+    main()
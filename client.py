@@ -1,5 +1,7 @@
+import collections
 import logging
 import os
+import queue
 import time
 
 import grpc
@@ -14,6 +16,7 @@ import mafia_pb2_grpc
 
 cf.use_style("solarized")
 MIN_PLAYERS = 4
+RECONNECTS_CNT = 5
 
 
 def print_grpc_error(e: grpc.RpcError):
@@ -34,9 +37,14 @@ def style_role(role: mafia_pb2.Role):
 class Client:
     def __init__(self):
         self.name = None
+        self.host = None
         self.stub = None
         self.token = None
         self.is_auto = False
+        self.requests: queue.Queue[mafia_pb2.PlayRequest | None] | None = None
+        self.pending: collections.deque = collections.deque()
+        # The seq of the last game event, a broken stream is resumed after it.
+        self.last_seq = 0
 
     def start(self):
         tprint("Mafia online")
@@ -61,6 +69,13 @@ class Client:
         menu = TerminalMenu(options)
         return players[menu.show()]
 
+    def choose_option(self, options: list[str]) -> str:
+        if self.is_auto:
+            return random.choice(options)
+
+        menu = TerminalMenu(options)
+        return options[menu.show()]
+
     def set_name(self):
         self.name = input("State your name: ")
         while not self.name:
@@ -78,13 +93,22 @@ class Client:
                 channel = grpc.insecure_channel(address)
                 stub = mafia_pb2_grpc.MafiaStub(channel)
                 response = stub.Connect(mafia_pb2.ConnectRequest(name=self.name))
+                self.host = address.rsplit(":", 1)[0]
                 self.token = response.token
                 self.stub = stub
+                self.move("", response.port)
             except grpc.RpcError as e:
                 print_grpc_error(e)
         print(f"Successfully connected to {address}!")
 
-    def create_game(self):
+    def move(self, token: str, port: int):
+        # A server with several workers tells which one has the player, the calls then go to it directly.
+        if token:
+            self.token = token
+        if port:
+            self.stub = mafia_pb2_grpc.MafiaStub(grpc.insecure_channel(f"{self.host}:{port}"))
+
+    def ask_players_cnt(self) -> int:
         while True:
             required_players_cnt = input("How many players would you like to have? ")
             if not required_players_cnt.isnumeric():
@@ -92,8 +116,10 @@ class Client:
             elif int(required_players_cnt) < MIN_PLAYERS:
                 print(f"At least {cf.red}{MIN_PLAYERS} players is required{cf.reset}!")
             else:
-                required_players_cnt = int(required_players_cnt)
-                break
+                return int(required_players_cnt)
+
+    def create_game(self):
+        required_players_cnt = self.ask_players_cnt()
 
         print()
         while True:
@@ -110,35 +136,53 @@ class Client:
         while True:
             try:
                 code = input("Enter the game code: ")
-                self.stub.JoinGame(mafia_pb2.JoinGameRequest(token=self.token, code=code))
+                response = self.stub.JoinGame(mafia_pb2.JoinGameRequest(token=self.token, code=code))
                 break
             except grpc.RpcError as e:
                 print_grpc_error(e)
+        self.move(response.token, response.port)
         print(f"You have successfully joined the game {code}!")
 
+    def quick_match(self):
+        required_players_cnt = self.ask_players_cnt()
+
+        print()
+        print("Looking for other players...")
+        while True:
+            try:
+                response = self.stub.QuickMatch(
+                    mafia_pb2.QuickMatchRequest(token=self.token, required_players_cnt=required_players_cnt))
+                break
+            except grpc.RpcError as e:
+                print_grpc_error(e)
+        self.move(response.token, response.port)
+        print(f"You have been matched into the game {cf.bold_blue}{response.code}{cf.reset}!")
+
     def create_or_join_game(self):
-        menu = TerminalMenu(["Create game", "Join game"])
+        menu = TerminalMenu(["Create game", "Join game", "Quick match"])
         result = menu.show()
         if result == 0:
             self.create_game()
         elif result == 1:
             self.join_game()
+        elif result == 2:
+            self.quick_match()
 
     def wait_players(self):
         print(f"Wait for others to join...")
         print()
         while True:
+            players = []
             try:
-                response = self.stub.ListPlayers(mafia_pb2.ListPlayersRequest(token=self.token))
-                players = response.players
-                print("\033[F\033[K", end="")
-                print(f"Players({len(players)}/{response.required_players_cnt}):",
-                      *(f"{cf.blue}{player.name}{cf.reset}({player.id})" for player in players))
-                if len(players) == response.required_players_cnt:
-                    break
+                for response in self.stub.WatchLobby(mafia_pb2.WatchLobbyRequest(token=self.token)):
+                    players.extend(response.joined)
+                    print("\033[F\033[K", end="")
+                    print(f"Players({len(players)}/{response.required_players_cnt}):",
+                          *(f"{cf.blue}{player.name}{cf.reset}({player.id})" for player in players))
+                break
             except grpc.RpcError as e:
                 print_grpc_error(e)
-            time.sleep(5)
+                time.sleep(5)
 
     def get_role(self):
         response = self.stub.GetRole(mafia_pb2.GetRoleRequest(token=self.token))
@@ -147,8 +191,8 @@ class Client:
     def vote(self, players: list[mafia_pb2.Player]):
         print("It's time to vote for someone to eliminate!")
         player = self.choose_player(players)
-        self.stub.VoteDay(mafia_pb2.VoteDayRequest(token=self.token, player_id=player.id))
-        print(f"You successfully voted for {player.name}({player.id})")
+        self.send(mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(player_id=player.id)),
+                  lambda result: print(f"You successfully voted for {player.name}({player.id})"))
 
     def day(self, is_alive: bool, players: list[mafia_pb2.Player], mafias: list[mafia_pb2.Player],
             detective: mafia_pb2.Player | None):
@@ -168,27 +212,24 @@ class Client:
     def publish(self, mafias: list[mafia_pb2.Player]):
         if not mafias:
             print(f"You did not find any mafias :(")
-            self.stub.Publish(mafia_pb2.PublishRequest(token=self.token, decision=False))
+            self.send(mafia_pb2.Action(publish=mafia_pb2.PublishRequest(decision=False)))
             return
 
         print(f"You know about mafias:", *[f"{cf.red}{player.name}{cf.reset}({player.id})" for player in mafias])
         print(f"Do you want to publish it?")
-        options = ["yes", "no"]
-        if self.is_auto:
-            result = random.choice(options)
-        else:
-            menu = TerminalMenu(options)
-            result = options[menu.show()]
+        result = self.choose_option(["yes", "no"])
 
-        self.stub.Publish(mafia_pb2.PublishRequest(token=self.token, decision=result == "yes"))
+        self.send(mafia_pb2.Action(publish=mafia_pb2.PublishRequest(decision=result == "yes")))
 
     def check(self, players: list[mafia_pb2.Player]):
         print("It's time to check someone!")
 
         player = self.choose_player(players)
-        response = self.stub.Check(mafia_pb2.CheckRequest(token=self.token, player_id=player.id))
-        print(f"You successfully checked {player.name}({player.id})")
-        self.publish(response.mafias)
+
+        def on_checked(result: mafia_pb2.ActionResult):
+            print(f"You successfully checked {player.name}({player.id})")
+            self.publish(result.check.mafias)
+        self.send(mafia_pb2.Action(check=mafia_pb2.CheckRequest(player_id=player.id)), on_checked)
 
     def kill(self, players: list[mafia_pb2.Player], mafias: list[mafia_pb2.Player]):
         print("It's time to vote for someone to kill!")
@@ -199,8 +240,8 @@ class Client:
             print("You are the only mafia present.")
 
         player = self.choose_player(players)
-        self.stub.VoteNight(mafia_pb2.VoteNightRequest(token=self.token, player_id=player.id))
-        print(f"You have successfully voted for {player.name}({player.id}).")
+        self.send(mafia_pb2.Action(vote_night=mafia_pb2.VoteNightRequest(player_id=player.id)),
+                  lambda result: print(f"You have successfully voted for {player.name}({player.id})."))
 
     def night(self, is_alive: bool, role: mafia_pb2.Role, players: list[mafia_pb2.Player],
               mafias: list[mafia_pb2.Player]):
@@ -217,22 +258,65 @@ class Client:
             case mafia_pb2.ROLE_VILLAGER:
                 print("Waiting for the mafias and detective to take their actions...")
 
+    def send(self, action: mafia_pb2.Action, on_ok=None):
+        # Results come back in the order the actions were sent.
+        self.pending.append(on_ok)
+        self.requests.put(mafia_pb2.PlayRequest(action=action))
+
+    def get_requests(self, requests: queue.Queue[mafia_pb2.PlayRequest | None], last_seq: int):
+        yield mafia_pb2.PlayRequest(start=mafia_pb2.GameProcessRequest(token=self.token, last_seq=last_seq))
+        while (request := requests.get()) is not None:
+            yield request
+
+    def on_result(self, result: mafia_pb2.ActionResult):
+        on_ok = self.pending.popleft()
+        if result.code != grpc.StatusCode.OK.value[0]:
+            print(f"{cf.red}Action failed:{cf.reset} {result.details}")
+        elif on_ok is not None:
+            on_ok(result)
+
     def play_game(self):
         menu = TerminalMenu(["Manual play", "Auto bot"])
         ans = menu.show()
         self.is_auto = ans == 1
 
-        for response in self.stub.GameProcess(mafia_pb2.GameProcessRequest(token=self.token)):
-            match response.WhichOneof("event"):
-                case "day":
-                    self.day(response.day.is_alive, response.day.players, response.day.mafias, response.day.detective)
-                case "night":
-                    self.night(response.night.is_alive, response.night.role, response.night.players,
-                               response.night.mafias)
-                case "end":
-                    print(f"{style_role(response.end.winner)}s are winners!")
-                    break
-            print()
+        reconnects_cnt = 0
+        while True:
+            # Actions without a result may be lost with the stream, the phase they were for is asked for again.
+            last_seq = self.last_seq - 1 if self.pending else self.last_seq
+            self.pending.clear()
+            self.requests = queue.Queue()
+            try:
+                for response in self.stub.Play(self.get_requests(self.requests, last_seq)):
+                    reconnects_cnt = 0
+                    if response.WhichOneof("response") == "result":
+                        self.on_result(response.result)
+                        continue
+
+                    event = response.event
+                    self.last_seq = event.seq
+                    match event.WhichOneof("event"):
+                        case "day":
+                            self.day(event.day.is_alive, event.day.players, event.day.mafias, event.day.detective)
+                        case "night":
+                            self.night(event.night.is_alive, event.night.role, event.night.players,
+                                       event.night.mafias)
+                        case "end":
+                            print(f"{style_role(event.end.winner)}s are winners!")
+                            return
+                    print()
+                return
+            except grpc.RpcError as e:
+                # The server drops a stream whose client falls behind, it resumes like a lost one.
+                if e.code() not in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED) or \
+                        reconnects_cnt == RECONNECTS_CNT:
+                    print_grpc_error(e)
+                    return
+                reconnects_cnt += 1
+                print(f"{cf.red}Connection lost,{cf.reset} reconnecting ({reconnects_cnt}/{RECONNECTS_CNT})...")
+                time.sleep(1)
+            finally:
+                self.requests.put(None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import secrets
+import string
+
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 5
+# A code is its shard's first character and two of these pairs.
+CODE_PAIRS = [first + second for first in CODE_ALPHABET for second in CODE_ALPHABET]
+PAIR_TO_VALUE = {pair: value for value, pair in enumerate(CODE_PAIRS)}
+
+
+def code_shard(code: str, shards_cnt: int) -> int:
+    # The first character of a game code tells which shard owns the game.
+    if not code or code[0] not in CODE_ALPHABET:
+        return 0
+    return CODE_ALPHABET.index(code[0]) % shards_cnt
+
+
+class CodeAllocator:
+    # Hands out the codes of one shard uniformly at random among the free ones, so a live code is never reused
+    # and a freed one can be drawn again. The free codes are the first free_cnt slots of a permutation of all
+    # of them, drawing one moves the last free slot into its place. Only the slots that ever moved are stored,
+    # any other slot holds its own index, so allocating and freeing are both O(1) at any occupancy.
+    def __init__(self, shard: int = 0, shards_cnt: int = 1):
+        self.first_chars = CODE_ALPHABET[shard::shards_cnt]
+        self.rest_cnt = len(CODE_ALPHABET) ** (CODE_LENGTH - 1)
+        self.free_cnt = len(self.first_chars) * self.rest_cnt
+        self.slot_to_index: dict[int, int] = dict()
+        # Codes taken by recovered games, they are still in the free slots and skipped when drawn.
+        self.reserved: set[int] = set()
+
+    def allocate(self) -> str:
+        while self.free_cnt:
+            slot = secrets.randbelow(self.free_cnt)
+            self.free_cnt -= 1
+            index = self.slot_to_index.get(slot, slot)
+            last = self.slot_to_index.pop(self.free_cnt, self.free_cnt)
+            if slot != self.free_cnt:
+                self.slot_to_index[slot] = last
+            if index in self.reserved:
+                self.reserved.remove(index)
+                continue
+            return self.encode(index)
+        raise Exception('No free game codes')
+
+    def free(self, code: str):
+        index = self.decode(code)
+        if index is None:
+            return
+        if index in self.reserved:
+            self.reserved.remove(index)
+            return
+        self.slot_to_index[self.free_cnt] = index
+        self.free_cnt += 1
+
+    def reserve(self, code: str):
+        # A journal written with another shards count may hold codes of other shards, they are not ours to give.
+        index = self.decode(code)
+        if index is not None:
+            self.reserved.add(index)
+
+    def get_free_cnt(self) -> int:
+        return self.free_cnt - len(self.reserved)
+
+    def encode(self, index: int) -> str:
+        first, rest = divmod(index, self.rest_cnt)
+        high, low = divmod(rest, len(CODE_PAIRS))
+        return self.first_chars[first] + CODE_PAIRS[high] + CODE_PAIRS[low]
+
+    def decode(self, code: str) -> int | None:
+        # None for anything that is not a code of this shard.
+        first = self.first_chars.find(code[:1]) if code else -1
+        high = PAIR_TO_VALUE.get(code[1:3])
+        low = PAIR_TO_VALUE.get(code[3:])
+        if first < 0 or high is None or low is None:
+            return None
+        return first * self.rest_cnt + high * len(CODE_PAIRS) + low
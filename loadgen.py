@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import collections
+import logging
+import multiprocessing
+import os
+import time
+import typing
+
+import grpc
+
+import mafia_pb2
+import mafia_pb2_grpc
+from client import Client
+
+
+class Stats:
+    def __init__(self):
+        self.rpc_latencies: dict[str, list[float]] = collections.defaultdict(list)
+        self.event_latencies: list[float] = []
+        self.winners: collections.Counter[int] = collections.Counter()
+        self.games_cnt = 0
+        self.elapsed = 0.0
+
+    def merge(self, other: 'Stats'):
+        for method, latencies in other.rpc_latencies.items():
+            self.rpc_latencies[method].extend(latencies)
+        self.event_latencies.extend(other.event_latencies)
+        self.winners.update(other.winners)
+        self.games_cnt += other.games_cnt
+        self.elapsed = max(self.elapsed, other.elapsed)
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class BotGame:
+    def __init__(self):
+        # When the last action of the current phase was sent, the next phase event is measured from it.
+        self.last_action_at: float | None = None
+        self.counted = False
+
+
+class Bot(Client):
+    # Headless Client in auto mode, makes the same random choices but talks to the server over grpc.aio.
+    METHOD_TO_ACTION = dict(VoteDay='vote_day', VoteNight='vote_night', Check='check', Publish='publish')
+
+    def __init__(self, name: str, stub: mafia_pb2_grpc.MafiaStub, game: BotGame, stats: Stats,
+                 session: bool = False, get_stub: typing.Callable[[int], mafia_pb2_grpc.MafiaStub] | None = None):
+        super().__init__()
+        self.name = name
+        self.stub = stub
+        # Gives the stub of a worker by its port, the bots are moved to their workers with it.
+        self.get_stub = get_stub
+        self.is_auto = True
+        self.game = game
+        self.stats = stats
+        self.session = session
+        self.call_stream = None
+        self.futures: collections.deque[asyncio.Future] = collections.deque()
+
+    async def call(self, method: str, request):
+        started = time.perf_counter()
+        response = await getattr(self.stub, method)(request)
+        self.stats.rpc_latencies[method].append(time.perf_counter() - started)
+        return response
+
+    async def act(self, method: str, request):
+        self.game.last_action_at = time.perf_counter()
+        if not self.session:
+            return await self.call(method, request)
+
+        # Sent over the Play stream, the result is matched by order.
+        kind = self.METHOD_TO_ACTION[method]
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        started = time.perf_counter()
+        await self.call_stream.write(mafia_pb2.PlayRequest(action=mafia_pb2.Action(**{kind: request})))
+        result = await future
+        self.stats.rpc_latencies[method].append(time.perf_counter() - started)
+        if result.code != grpc.StatusCode.OK.value[0]:
+            raise Exception(f"{method} failed: {result.details}")
+        return result.check if kind == 'check' else result
+
+    async def connect_to_server(self):
+        response = await self.call('Connect', mafia_pb2.ConnectRequest(name=self.name))
+        self.token = response.token
+        self.move('', response.port)
+
+    def move(self, token: str, port: int):
+        if token:
+            self.token = token
+        if port and self.get_stub is not None:
+            self.stub = self.get_stub(port)
+
+    async def vote(self, players: list[mafia_pb2.Player]):
+        player = self.choose_player(players)
+        await self.act('VoteDay', mafia_pb2.VoteDayRequest(token=self.token, player_id=player.id))
+
+    async def check(self, players: list[mafia_pb2.Player]):
+        player = self.choose_player(players)
+        response = await self.act('Check', mafia_pb2.CheckRequest(token=self.token, player_id=player.id))
+        decision = bool(response.mafias) and self.choose_option(["yes", "no"]) == "yes"
+        await self.act('Publish', mafia_pb2.PublishRequest(token=self.token, decision=decision))
+
+    async def kill(self, players: list[mafia_pb2.Player]):
+        player = self.choose_player(players)
+        await self.act('VoteNight', mafia_pb2.VoteNightRequest(token=self.token, player_id=player.id))
+
+    async def on_event(self, response: mafia_pb2.GameProcessResponse):
+        if self.game.last_action_at is not None:
+            self.stats.event_latencies.append(time.perf_counter() - self.game.last_action_at)
+
+        match response.WhichOneof("event"):
+            case "day":
+                if response.day.is_alive:
+                    await self.vote(response.day.players)
+            case "night":
+                if not response.night.is_alive:
+                    return
+                match response.night.role:
+                    case mafia_pb2.ROLE_DETECTIVE:
+                        await self.check(response.night.players)
+                    case mafia_pb2.ROLE_MAFIA:
+                        await self.kill(response.night.players)
+
+    async def play_game(self):
+        if self.session:
+            return await self.play_session()
+
+        async for response in self.stub.GameProcess(mafia_pb2.GameProcessRequest(token=self.token)):
+            if response.WhichOneof("event") == "end":
+                return response.end.winner
+            await self.on_event(response)
+
+    async def play_session(self):
+        # Results are read by a separate task, the events are handled here and wait for them.
+        self.call_stream = self.stub.Play()
+        await self.call_stream.write(mafia_pb2.PlayRequest(start=mafia_pb2.GameProcessRequest(token=self.token)))
+        events: asyncio.Queue[mafia_pb2.GameProcessResponse] = asyncio.Queue()
+
+        async def read():
+            async for response in self.call_stream:
+                if response.WhichOneof("response") == "result":
+                    self.futures.popleft().set_result(response.result)
+                else:
+                    events.put_nowait(response.event)
+
+        reader = asyncio.create_task(read())
+        try:
+            while True:
+                event = await events.get()
+                if event.WhichOneof("event") == "end":
+                    await self.call_stream.done_writing()
+                    return event.end.winner
+                await self.on_event(event)
+        finally:
+            reader.cancel()
+
+
+async def play(stub: mafia_pb2_grpc.MafiaStub, stats: Stats, players_cnt: int, fast_mode: bool, session: bool,
+               code_to_game: dict[str, BotGame] | None,
+               get_stub: typing.Callable[[int], mafia_pb2_grpc.MafiaStub] | None = None):
+    game = BotGame()
+    bots = [Bot(f"bot{i}", stub, game, stats, session, get_stub) for i in range(players_cnt)]
+    await asyncio.gather(*(bot.connect_to_server() for bot in bots))
+
+    if code_to_game is not None:
+        # The bots queue together, but may be matched with the bots queued by other plays.
+        responses = await asyncio.gather(*(bot.call('QuickMatch', mafia_pb2.QuickMatchRequest(
+            token=bot.token, required_players_cnt=players_cnt, fast_mode=fast_mode)) for bot in bots))
+        for bot, response in zip(bots, responses):
+            bot.move(response.token, response.port)
+            bot.game = code_to_game.setdefault(response.code, BotGame())
+    else:
+        response = await bots[0].call('CreateGame', mafia_pb2.CreateGameRequest(
+            token=bots[0].token, required_players_cnt=players_cnt, fast_mode=fast_mode))
+        for bot in bots[1:]:
+            joined = await bot.call('JoinGame', mafia_pb2.JoinGameRequest(token=bot.token, code=response.code))
+            bot.move(joined.token, joined.port)
+
+    winners = await asyncio.gather(*(bot.play_game() for bot in bots))
+    for bot, winner in zip(bots, winners):
+        if not bot.game.counted:
+            bot.game.counted = True
+            stats.winners[winner] += 1
+            stats.games_cnt += 1
+
+
+async def play_games(stubs: list[mafia_pb2_grpc.MafiaStub], games_cnt: int, players_cnt: int = 4,
+                     concurrency: int = 100, fast_mode: bool = True, session: bool = False,
+                     quick_match: bool = False,
+                     get_stub: typing.Callable[[int], mafia_pb2_grpc.MafiaStub] | None = None) -> Stats:
+    stats = Stats()
+    semaphore = asyncio.Semaphore(concurrency)
+    code_to_game: dict[str, BotGame] | None = dict() if quick_match else None
+
+    async def limited(i: int):
+        async with semaphore:
+            await play(stubs[i % len(stubs)], stats, players_cnt, fast_mode, session, code_to_game, get_stub)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(games_cnt)))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+async def run(address: str, games_cnt: int, players_cnt: int = 4, concurrency: int = 100, channels_cnt: int = 1,
+              fast_mode: bool = True, session: bool = False, quick_match: bool = False) -> Stats:
+    channels = [grpc.aio.insecure_channel(address) for _ in range(channels_cnt)]
+    # A sharded server moves the bots to its workers on the same host, a channel each.
+    host = address.rsplit(':', 1)[0]
+    port_to_stub: dict[int, mafia_pb2_grpc.MafiaStub] = dict()
+
+    def get_stub(port: int) -> mafia_pb2_grpc.MafiaStub:
+        if port not in port_to_stub:
+            channels.append(grpc.aio.insecure_channel(f'{host}:{port}'))
+            port_to_stub[port] = mafia_pb2_grpc.MafiaStub(channels[-1])
+        return port_to_stub[port]
+
+    try:
+        return await play_games([mafia_pb2_grpc.MafiaStub(channel) for channel in channels], games_cnt, players_cnt,
+                                concurrency, fast_mode, session, quick_match, get_stub)
+    finally:
+        for channel in channels:
+            await channel.close()
+
+
+def run_process(args: tuple) -> Stats:
+    return asyncio.run(run(*args))
+
+
+def run_processes(address: str, games_cnt: int, processes_cnt: int, *args) -> Stats:
+    stats = Stats()
+    with multiprocessing.get_context('spawn').Pool(processes_cnt) as pool:
+        for process_stats in pool.map(run_process, [(address, games_cnt // processes_cnt, *args)] * processes_cnt):
+            stats.merge(process_stats)
+    return stats
+
+
+async def run_local(games_cnt: int, *args) -> Stats:
+    from server import EService
+
+    server = grpc.aio.server()
+    mafia_pb2_grpc.add_MafiaServicer_to_server(EService(phase_delay=0), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+    try:
+        return await run(f'127.0.0.1:{port}', games_cnt, *args)
+    finally:
+        await server.stop(None)
+
+
+def report(stats: Stats):
+    print(f"Games: {stats.games_cnt} in {stats.elapsed:.2f}s, {stats.games_cnt / stats.elapsed:.1f} games/s")
+    print("Winners:", *(f"{mafia_pb2.Role.Name(role)[5:]}={cnt}" for role, cnt in stats.winners.items()))
+    print(f"{'latency, ms':<12} {'count':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    rows = sorted(stats.rpc_latencies.items()) + [('event', stats.event_latencies)]
+    for name, latencies in rows:
+        if not latencies:
+            continue
+        print(f"{name:<12} {len(latencies):>8}",
+              *(f"{percentile(latencies, q) * 1000:>8.2f}" for q in (0.5, 0.9, 0.99, 1)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    HOST = os.environ.get("HOST", "0.0.0.0")
+    PORT = os.environ.get("PORT", 9000)
+
+    parser = argparse.ArgumentParser(description="Plays bot games against a Mafia server and reports its performance.")
+    parser.add_argument("--address", default=f"{HOST}:{PORT}")
+    parser.add_argument("--local", action="store_true", help="start an in-process server instead of using --address")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=100, help="games played at once by every process")
+    parser.add_argument("--channels", type=int, default=1, help="gRPC channels per process")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--slow", action="store_true", help="create games without fast_mode")
+    parser.add_argument("--play", action="store_true", help="play over the Play stream instead of unary calls")
+    parser.add_argument("--quick-match", action="store_true", help="form games with QuickMatch instead of codes")
+    args = parser.parse_args()
+
+    game_args = (args.players, args.concurrency, args.channels, not args.slow, args.play, args.quick_match)
+    if args.local:
+        report(asyncio.run(run_local(args.games, *game_args)))
+    elif args.processes > 1:
+        report(run_processes(args.address, args.games, args.processes, *game_args))
+    else:
+        report(asyncio.run(run(args.address, args.games, *game_args)))
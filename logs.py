@@ -0,0 +1,37 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import typing
+
+FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Hands records over unformatted, the listener thread formats them instead of the event loop.
+    # Log calls only pass numbers and strings, so formatting them later gives the same text.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: int | str = logging.INFO, stream: typing.TextIO | None = None) -> logging.handlers.QueueListener:
+    # The caller lookup walks the stack for every record, even if the format doesn't use it.
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
+
+    root = logging.getLogger()
+    for old_handler in list(root.handlers):
+        root.removeHandler(old_handler)
+    root.addHandler(DeferredQueueHandler(records))
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
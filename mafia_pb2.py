@@ -13,67 +13,95 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bmafia.proto\x12\x05mafia\"\x1e\n\x0e\x43onnectRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\" \n\x0f\x43onnectResponse\x12\r\n\x05token\x18\x01 \x01(\t\"@\n\x11\x43reateGameRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x1c\n\x14required_players_cnt\x18\x02 \x01(\x05\"\"\n\x12\x43reateGameResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\".\n\x0fJoinGameRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"\x12\n\x10JoinGameResponse\"#\n\x12ListPlayersRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\"\n\x06Player\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x05\"S\n\x13ListPlayersResponse\x12\x1c\n\x14required_players_cnt\x18\x01 \x01(\x05\x12\x1e\n\x07players\x18\x02 \x03(\x0b\x32\r.mafia.Player\"\x1f\n\x0eGetRoleRequest\x12\r\n\x05token\x18\x01 \x01(\t\",\n\x0fGetRoleResponse\x12\x19\n\x04role\x18\x01 \x01(\x0e\x32\x0b.mafia.Role\"#\n\x12GameProcessRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\x1e\n\rEndDayRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\x10\n\x0e\x45ndDayResponse\"2\n\x0eVoteDayRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\"\x11\n\x0fVoteDayResponse\"4\n\x10VoteNightRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\"\x13\n\x11VoteNightResponse\"0\n\x0c\x43heckRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\".\n\rCheckResponse\x12\x1d\n\x06mafias\x18\x01 \x03(\x0b\x32\r.mafia.Player\"1\n\x0ePublishRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x10\n\x08\x64\x65\x63ision\x18\x02 \x01(\x08\"\x11\n\x0fPublishResponse\"\xf2\x03\n\x13GameProcessResponse\x12\x32\n\x03\x64\x61y\x18\x01 \x01(\x0b\x32#.mafia.GameProcessResponse.StartDayH\x00\x12\x36\n\x05night\x18\x02 \x01(\x0b\x32%.mafia.GameProcessResponse.StartNightH\x00\x12\x31\n\x03\x65nd\x18\x03 \x01(\x0b\x32\".mafia.GameProcessResponse.EndGameH\x00\x1a\x90\x01\n\x08StartDay\x12\x10\n\x08is_alive\x18\x01 \x01(\x08\x12\x1e\n\x07players\x18\x02 \x03(\x0b\x32\r.mafia.Player\x12\x1d\n\x06mafias\x18\x03 \x03(\x0b\x32\r.mafia.Player\x12%\n\tdetective\x18\x04 \x01(\x0b\x32\r.mafia.PlayerH\x00\x88\x01\x01\x42\x0c\n\n_detective\x1ax\n\nStartNight\x12\x10\n\x08is_alive\x18\x01 \x01(\x08\x12\x19\n\x04role\x18\x02 \x01(\x0e\x32\x0b.mafia.Role\x12\x1e\n\x07players\x18\x03 \x03(\x0b\x32\r.mafia.Player\x12\x1d\n\x06mafias\x18\x04 \x03(\x0b\x32\r.mafia.Player\x1a&\n\x07\x45ndGame\x12\x1b\n\x06winner\x18\x01 \x01(\x0e\x32\x0b.mafia.RoleB\x07\n\x05\x65vent*S\n\x04Role\x12\x14\n\x10ROLE_UNSPECIFIED\x10\x00\x12\x11\n\rROLE_VILLAGER\x10\x01\x12\x0e\n\nROLE_MAFIA\x10\x02\x12\x12\n\x0eROLE_DETECTIVE\x10\x03\x32\x85\x05\n\x05Mafia\x12:\n\x07\x43onnect\x12\x15.mafia.ConnectRequest\x1a\x16.mafia.ConnectResponse\"\x00\x12\x43\n\nCreateGame\x12\x18.mafia.CreateGameRequest\x1a\x19.mafia.CreateGameResponse\"\x00\x12=\n\x08JoinGame\x12\x16.mafia.JoinGameRequest\x1a\x17.mafia.JoinGameResponse\"\x00\x12\x46\n\x0bListPlayers\x12\x19.mafia.ListPlayersRequest\x1a\x1a.mafia.ListPlayersResponse\"\x00\x12:\n\x07GetRole\x12\x15.mafia.GetRoleRequest\x1a\x16.mafia.GetRoleResponse\"\x00\x12H\n\x0bGameProcess\x12\x19.mafia.GameProcessRequest\x1a\x1a.mafia.GameProcessResponse\"\x00\x30\x01\x12:\n\x07VoteDay\x12\x15.mafia.VoteDayRequest\x1a\x16.mafia.VoteDayResponse\"\x00\x12@\n\tVoteNight\x12\x17.mafia.VoteNightRequest\x1a\x18.mafia.VoteNightResponse\"\x00\x12\x34\n\x05\x43heck\x12\x13.mafia.CheckRequest\x1a\x14.mafia.CheckResponse\"\x00\x12:\n\x07Publish\x12\x15.mafia.PublishRequest\x1a\x16.mafia.PublishResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bmafia.proto\x12\x05mafia\"\x1e\n\x0e\x43onnectRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\".\n\x0f\x43onnectResponse\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\"S\n\x11\x43reateGameRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x1c\n\x14required_players_cnt\x18\x02 \x01(\x05\x12\x11\n\tfast_mode\x18\x03 \x01(\x08\"\"\n\x12\x43reateGameResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\".\n\x0fJoinGameRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"/\n\x10JoinGameResponse\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\"S\n\x11QuickMatchRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x1c\n\x14required_players_cnt\x18\x02 \x01(\x05\x12\x11\n\tfast_mode\x18\x03 \x01(\x08\"?\n\x12QuickMatchResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\r\n\x05token\x18\x02 \x01(\t\x12\x0c\n\x04port\x18\x03 \x01(\x05\"#\n\x12ListPlayersRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\"\n\x06Player\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x05\"S\n\x13ListPlayersResponse\x12\x1c\n\x14required_players_cnt\x18\x01 \x01(\x05\x12\x1e\n\x07players\x18\x02 \x03(\x0b\x32\r.mafia.Player\"\"\n\x11WatchLobbyRequest\x12\r\n\x05token\x18\x01 \x01(\t\"Q\n\x12WatchLobbyResponse\x12\x1c\n\x14required_players_cnt\x18\x01 \x01(\x05\x12\x1d\n\x06joined\x18\x02 \x03(\x0b\x32\r.mafia.Player\"\x1f\n\x0eGetRoleRequest\x12\r\n\x05token\x18\x01 \x01(\t\",\n\x0fGetRoleResponse\x12\x19\n\x04role\x18\x01 \x01(\x0e\x32\x0b.mafia.Role\"5\n\x12GameProcessRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x10\n\x08last_seq\x18\x02 \x01(\x05\"\x1e\n\rEndDayRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\x10\n\x0e\x45ndDayResponse\"2\n\x0eVoteDayRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\"\x11\n\x0fVoteDayResponse\"4\n\x10VoteNightRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\"\x13\n\x11VoteNightResponse\"0\n\x0c\x43heckRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\".\n\rCheckResponse\x12\x1d\n\x06mafias\x18\x01 \x03(\x0b\x32\r.mafia.Player\"1\n\x0ePublishRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x10\n\x08\x64\x65\x63ision\x18\x02 \x01(\x08\"\x11\n\x0fPublishResponse\"\xbc\x01\n\x06\x41\x63tion\x12)\n\x08vote_day\x18\x01 \x01(\x0b\x32\x15.mafia.VoteDayRequestH\x00\x12-\n\nvote_night\x18\x02 \x01(\x0b\x32\x17.mafia.VoteNightRequestH\x00\x12$\n\x05\x63heck\x18\x03 \x01(\x0b\x32\x13.mafia.CheckRequestH\x00\x12(\n\x07publish\x18\x04 \x01(\x0b\x32\x15.mafia.PublishRequestH\x00\x42\x08\n\x06\x61\x63tion\"6\n\x14SubmitActionsRequest\x12\x1e\n\x07\x61\x63tions\x18\x01 \x03(\x0b\x32\r.mafia.Action\"R\n\x0c\x41\x63tionResult\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07\x64\x65tails\x18\x02 \x01(\t\x12#\n\x05\x63heck\x18\x03 \x01(\x0b\x32\x14.mafia.CheckResponse\"=\n\x15SubmitActionsResponse\x12$\n\x07results\x18\x01 \x03(\x0b\x32\x13.mafia.ActionResult\"e\n\x0bPlayRequest\x12*\n\x05start\x18\x01 \x01(\x0b\x32\x19.mafia.GameProcessRequestH\x00\x12\x1f\n\x06\x61\x63tion\x18\x02 \x01(\x0b\x32\r.mafia.ActionH\x00\x42\t\n\x07request\"n\n\x0cPlayResponse\x12+\n\x05\x65vent\x18\x01 \x01(\x0b\x32\x1a.mafia.GameProcessResponseH\x00\x12%\n\x06result\x18\x02 \x01(\x0b\x32\x13.mafia.ActionResultH\x00\x42\n\n\x08response\"\xff\x03\n\x13GameProcessResponse\x12\x32\n\x03\x64\x61y\x18\x01 \x01(\x0b\x32#.mafia.GameProcessResponse.StartDayH\x00\x12\x36\n\x05night\x18\x02 \x01(\x0b\x32%.mafia.GameProcessResponse.StartNightH\x00\x12\x31\n\x03\x65nd\x18\x03 \x01(\x0b\x32\".mafia.GameProcessResponse.EndGameH\x00\x12\x0b\n\x03seq\x18\x04 \x01(\x05\x1a\x90\x01\n\x08StartDay\x12\x10\n\x08is_alive\x18\x01 \x01(\x08\x12\x1e\n\x07players\x18\x02 \x03(\x0b\x32\r.mafia.Player\x12\x1d\n\x06mafias\x18\x03 \x03(\x0b\x32\r.mafia.Player\x12%\n\tdetective\x18\x04 \x01(\x0b\x32\r.mafia.PlayerH\x00\x88\x01\x01\x42\x0c\n\n_detective\x1ax\n\nStartNight\x12\x10\n\x08is_alive\x18\x01 \x01(\x08\x12\x19\n\x04role\x18\x02 \x01(\x0e\x32\x0b.mafia.Role\x12\x1e\n\x07players\x18\x03 \x03(\x0b\x32\r.mafia.Player\x12\x1d\n\x06mafias\x18\x04 \x03(\x0b\x32\r.mafia.Player\x1a&\n\x07\x45ndGame\x12\x1b\n\x06winner\x18\x01 \x01(\x0e\x32\x0b.mafia.RoleB\x07\n\x05\x65vent\"\xf3\x04\n\rJournalRecord\x12\x0f\n\x07game_id\x18\x01 \x01(\x05\x12\x11\n\tplayer_id\x18\x02 \x01(\x05\x12+\n\tconnected\x18\x03 \x01(\x0b\x32\x16.mafia.ConnectResponseH\x00\x12\x33\n\x07\x63reated\x18\x04 \x01(\x0b\x32 .mafia.JournalRecord.GameCreatedH\x00\x12\x10\n\x06joined\x18\x05 \x01(\x08H\x00\x12<\n\x0eroles_assigned\x18\x06 \x01(\x0b\x32\".mafia.JournalRecord.RolesAssignedH\x00\x12)\n\x08vote_day\x18\x07 \x01(\x0b\x32\x15.mafia.VoteDayRequestH\x00\x12-\n\nvote_night\x18\x08 \x01(\x0b\x32\x17.mafia.VoteNightRequestH\x00\x12$\n\x05\x63heck\x18\t \x01(\x0b\x32\x13.mafia.CheckRequestH\x00\x12(\n\x07publish\x18\n \x01(\x0b\x32\x15.mafia.PublishRequestH\x00\x12\x10\n\x06killed\x18\x0b \x01(\x08H\x00\x12\x17\n\rphase_started\x18\x0c \x01(\x05H\x00\x12\x12\n\x08\x66inished\x18\r \x01(\x08H\x00\x12\x11\n\x07\x65victed\x18\x0e \x01(\x08H\x00\x12\x0c\n\x04name\x18\x0f \x01(\t\x1aL\n\x0bGameCreated\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x1c\n\x14required_players_cnt\x18\x02 \x01(\x05\x12\x11\n\tfast_mode\x18\x03 \x01(\x08\x1a+\n\rRolesAssigned\x12\x1a\n\x05roles\x18\x01 \x03(\x0e\x32\x0b.mafia.RoleB\x07\n\x05\x65vent\"I\n\x0fJournalSnapshot\x12\x0f\n\x07journal\x18\x01 \x01(\x05\x12%\n\x07records\x18\x02 \x03(\x0b\x32\x14.mafia.JournalRecord*S\n\x04Role\x12\x14\n\x10ROLE_UNSPECIFIED\x10\x00\x12\x11\n\rROLE_VILLAGER\x10\x01\x12\x0e\n\nROLE_MAFIA\x10\x02\x12\x12\n\x0eROLE_DETECTIVE\x10\x03\x32\x96\x07\n\x05Mafia\x12:\n\x07\x43onnect\x12\x15.mafia.ConnectRequest\x1a\x16.mafia.ConnectResponse\"\x00\x12\x43\n\nCreateGame\x12\x18.mafia.CreateGameRequest\x1a\x19.mafia.CreateGameResponse\"\x00\x12=\n\x08JoinGame\x12\x16.mafia.JoinGameRequest\x1a\x17.mafia.JoinGameResponse\"\x00\x12\x43\n\nQuickMatch\x12\x18.mafia.QuickMatchRequest\x1a\x19.mafia.QuickMatchResponse\"\x00\x12\x46\n\x0bListPlayers\x12\x19.mafia.ListPlayersRequest\x1a\x1a.mafia.ListPlayersResponse\"\x00\x12\x45\n\nWatchLobby\x12\x18.mafia.WatchLobbyRequest\x1a\x19.mafia.WatchLobbyResponse\"\x00\x30\x01\x12:\n\x07GetRole\x12\x15.mafia.GetRoleRequest\x1a\x16.mafia.GetRoleResponse\"\x00\x12H\n\x0bGameProcess\x12\x19.mafia.GameProcessRequest\x1a\x1a.mafia.GameProcessResponse\"\x00\x30\x01\x12:\n\x07VoteDay\x12\x15.mafia.VoteDayRequest\x1a\x16.mafia.VoteDayResponse\"\x00\x12@\n\tVoteNight\x12\x17.mafia.VoteNightRequest\x1a\x18.mafia.VoteNightResponse\"\x00\x12\x34\n\x05\x43heck\x12\x13.mafia.CheckRequest\x1a\x14.mafia.CheckResponse\"\x00\x12:\n\x07Publish\x12\x15.mafia.PublishRequest\x1a\x16.mafia.PublishResponse\"\x00\x12L\n\rSubmitActions\x12\x1b.mafia.SubmitActionsRequest\x1a\x1c.mafia.SubmitActionsResponse\"\x00\x12\x35\n\x04Play\x12\x12.mafia.PlayRequest\x1a\x13.mafia.PlayResponse\"\x00(\x01\x30\x01\x62\x06proto3')
 
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'mafia_pb2', globals())
 if _descriptor._USE_C_DESCRIPTORS == False:
 
   DESCRIPTOR._options = None
-  _ROLE._serialized_start=1397
-  _ROLE._serialized_end=1480
+  _ROLE._serialized_start=3073
+  _ROLE._serialized_end=3156
   _CONNECTREQUEST._serialized_start=22
   _CONNECTREQUEST._serialized_end=52
   _CONNECTRESPONSE._serialized_start=54
-  _CONNECTRESPONSE._serialized_end=86
-  _CREATEGAMEREQUEST._serialized_start=88
-  _CREATEGAMEREQUEST._serialized_end=152
-  _CREATEGAMERESPONSE._serialized_start=154
-  _CREATEGAMERESPONSE._serialized_end=188
-  _JOINGAMEREQUEST._serialized_start=190
-  _JOINGAMEREQUEST._serialized_end=236
-  _JOINGAMERESPONSE._serialized_start=238
-  _JOINGAMERESPONSE._serialized_end=256
-  _LISTPLAYERSREQUEST._serialized_start=258
-  _LISTPLAYERSREQUEST._serialized_end=293
-  _PLAYER._serialized_start=295
-  _PLAYER._serialized_end=329
-  _LISTPLAYERSRESPONSE._serialized_start=331
-  _LISTPLAYERSRESPONSE._serialized_end=414
-  _GETROLEREQUEST._serialized_start=416
-  _GETROLEREQUEST._serialized_end=447
-  _GETROLERESPONSE._serialized_start=449
-  _GETROLERESPONSE._serialized_end=493
-  _GAMEPROCESSREQUEST._serialized_start=495
-  _GAMEPROCESSREQUEST._serialized_end=530
-  _ENDDAYREQUEST._serialized_start=532
-  _ENDDAYREQUEST._serialized_end=562
-  _ENDDAYRESPONSE._serialized_start=564
-  _ENDDAYRESPONSE._serialized_end=580
-  _VOTEDAYREQUEST._serialized_start=582
-  _VOTEDAYREQUEST._serialized_end=632
-  _VOTEDAYRESPONSE._serialized_start=634
-  _VOTEDAYRESPONSE._serialized_end=651
-  _VOTENIGHTREQUEST._serialized_start=653
-  _VOTENIGHTREQUEST._serialized_end=705
-  _VOTENIGHTRESPONSE._serialized_start=707
-  _VOTENIGHTRESPONSE._serialized_end=726
-  _CHECKREQUEST._serialized_start=728
-  _CHECKREQUEST._serialized_end=776
-  _CHECKRESPONSE._serialized_start=778
-  _CHECKRESPONSE._serialized_end=824
-  _PUBLISHREQUEST._serialized_start=826
-  _PUBLISHREQUEST._serialized_end=875
-  _PUBLISHRESPONSE._serialized_start=877
-  _PUBLISHRESPONSE._serialized_end=894
-  _GAMEPROCESSRESPONSE._serialized_start=897
-  _GAMEPROCESSRESPONSE._serialized_end=1395
-  _GAMEPROCESSRESPONSE_STARTDAY._serialized_start=1080
-  _GAMEPROCESSRESPONSE_STARTDAY._serialized_end=1224
-  _GAMEPROCESSRESPONSE_STARTNIGHT._serialized_start=1226
-  _GAMEPROCESSRESPONSE_STARTNIGHT._serialized_end=1346
-  _GAMEPROCESSRESPONSE_ENDGAME._serialized_start=1348
-  _GAMEPROCESSRESPONSE_ENDGAME._serialized_end=1386
-  _MAFIA._serialized_start=1483
-  _MAFIA._serialized_end=2128
+  _CONNECTRESPONSE._serialized_end=100
+  _CREATEGAMEREQUEST._serialized_start=102
+  _CREATEGAMEREQUEST._serialized_end=185
+  _CREATEGAMERESPONSE._serialized_start=187
+  _CREATEGAMERESPONSE._serialized_end=221
+  _JOINGAMEREQUEST._serialized_start=223
+  _JOINGAMEREQUEST._serialized_end=269
+  _JOINGAMERESPONSE._serialized_start=271
+  _JOINGAMERESPONSE._serialized_end=318
+  _QUICKMATCHREQUEST._serialized_start=320
+  _QUICKMATCHREQUEST._serialized_end=403
+  _QUICKMATCHRESPONSE._serialized_start=405
+  _QUICKMATCHRESPONSE._serialized_end=468
+  _LISTPLAYERSREQUEST._serialized_start=470
+  _LISTPLAYERSREQUEST._serialized_end=505
+  _PLAYER._serialized_start=507
+  _PLAYER._serialized_end=541
+  _LISTPLAYERSRESPONSE._serialized_start=543
+  _LISTPLAYERSRESPONSE._serialized_end=626
+  _WATCHLOBBYREQUEST._serialized_start=628
+  _WATCHLOBBYREQUEST._serialized_end=662
+  _WATCHLOBBYRESPONSE._serialized_start=664
+  _WATCHLOBBYRESPONSE._serialized_end=745
+  _GETROLEREQUEST._serialized_start=747
+  _GETROLEREQUEST._serialized_end=778
+  _GETROLERESPONSE._serialized_start=780
+  _GETROLERESPONSE._serialized_end=824
+  _GAMEPROCESSREQUEST._serialized_start=826
+  _GAMEPROCESSREQUEST._serialized_end=879
+  _ENDDAYREQUEST._serialized_start=881
+  _ENDDAYREQUEST._serialized_end=911
+  _ENDDAYRESPONSE._serialized_start=913
+  _ENDDAYRESPONSE._serialized_end=929
+  _VOTEDAYREQUEST._serialized_start=931
+  _VOTEDAYREQUEST._serialized_end=981
+  _VOTEDAYRESPONSE._serialized_start=983
+  _VOTEDAYRESPONSE._serialized_end=1000
+  _VOTENIGHTREQUEST._serialized_start=1002
+  _VOTENIGHTREQUEST._serialized_end=1054
+  _VOTENIGHTRESPONSE._serialized_start=1056
+  _VOTENIGHTRESPONSE._serialized_end=1075
+  _CHECKREQUEST._serialized_start=1077
+  _CHECKREQUEST._serialized_end=1125
+  _CHECKRESPONSE._serialized_start=1127
+  _CHECKRESPONSE._serialized_end=1173
+  _PUBLISHREQUEST._serialized_start=1175
+  _PUBLISHREQUEST._serialized_end=1224
+  _PUBLISHRESPONSE._serialized_start=1226
+  _PUBLISHRESPONSE._serialized_end=1243
+  _ACTION._serialized_start=1246
+  _ACTION._serialized_end=1434
+  _SUBMITACTIONSREQUEST._serialized_start=1436
+  _SUBMITACTIONSREQUEST._serialized_end=1490
+  _ACTIONRESULT._serialized_start=1492
+  _ACTIONRESULT._serialized_end=1574
+  _SUBMITACTIONSRESPONSE._serialized_start=1576
+  _SUBMITACTIONSRESPONSE._serialized_end=1637
+  _PLAYREQUEST._serialized_start=1639
+  _PLAYREQUEST._serialized_end=1740
+  _PLAYRESPONSE._serialized_start=1742
+  _PLAYRESPONSE._serialized_end=1852
+  _GAMEPROCESSRESPONSE._serialized_start=1855
+  _GAMEPROCESSRESPONSE._serialized_end=2366
+  _GAMEPROCESSRESPONSE_STARTDAY._serialized_start=2051
+  _GAMEPROCESSRESPONSE_STARTDAY._serialized_end=2195
+  _GAMEPROCESSRESPONSE_STARTNIGHT._serialized_start=2197
+  _GAMEPROCESSRESPONSE_STARTNIGHT._serialized_end=2317
+  _GAMEPROCESSRESPONSE_ENDGAME._serialized_start=2319
+  _GAMEPROCESSRESPONSE_ENDGAME._serialized_end=2357
+  _JOURNALRECORD._serialized_start=2369
+  _JOURNALRECORD._serialized_end=2996
+  _JOURNALRECORD_GAMECREATED._serialized_start=2866
+  _JOURNALRECORD_GAMECREATED._serialized_end=2942
+  _JOURNALRECORD_ROLESASSIGNED._serialized_start=2944
+  _JOURNALRECORD_ROLESASSIGNED._serialized_end=2987
+  _JOURNALSNAPSHOT._serialized_start=2998
+  _JOURNALSNAPSHOT._serialized_end=3071
+  _MAFIA._serialized_start=3159
+  _MAFIA._serialized_end=4077
 # @@protoc_insertion_point(module_scope)
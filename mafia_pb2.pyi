@@ -10,6 +10,28 @@ ROLE_MAFIA: Role
 ROLE_UNSPECIFIED: Role
 ROLE_VILLAGER: Role
 
+class Action(_message.Message):
+    __slots__ = ["check", "publish", "vote_day", "vote_night"]
+    CHECK_FIELD_NUMBER: _ClassVar[int]
+    PUBLISH_FIELD_NUMBER: _ClassVar[int]
+    VOTE_DAY_FIELD_NUMBER: _ClassVar[int]
+    VOTE_NIGHT_FIELD_NUMBER: _ClassVar[int]
+    check: CheckRequest
+    publish: PublishRequest
+    vote_day: VoteDayRequest
+    vote_night: VoteNightRequest
+    def __init__(self, vote_day: _Optional[_Union[VoteDayRequest, _Mapping]] = ..., vote_night: _Optional[_Union[VoteNightRequest, _Mapping]] = ..., check: _Optional[_Union[CheckRequest, _Mapping]] = ..., publish: _Optional[_Union[PublishRequest, _Mapping]] = ...) -> None: ...
+
+class ActionResult(_message.Message):
+    __slots__ = ["check", "code", "details"]
+    CHECK_FIELD_NUMBER: _ClassVar[int]
+    CODE_FIELD_NUMBER: _ClassVar[int]
+    DETAILS_FIELD_NUMBER: _ClassVar[int]
+    check: CheckResponse
+    code: int
+    details: str
+    def __init__(self, code: _Optional[int] = ..., details: _Optional[str] = ..., check: _Optional[_Union[CheckResponse, _Mapping]] = ...) -> None: ...
+
 class CheckRequest(_message.Message):
     __slots__ = ["player_id", "token"]
     PLAYER_ID_FIELD_NUMBER: _ClassVar[int]
@@ -31,18 +53,22 @@ class ConnectRequest(_message.Message):
     def __init__(self, name: _Optional[str] = ...) -> None: ...
 
 class ConnectResponse(_message.Message):
-    __slots__ = ["token"]
+    __slots__ = ["port", "token"]
+    PORT_FIELD_NUMBER: _ClassVar[int]
     TOKEN_FIELD_NUMBER: _ClassVar[int]
+    port: int
     token: str
-    def __init__(self, token: _Optional[str] = ...) -> None: ...
+    def __init__(self, token: _Optional[str] = ..., port: _Optional[int] = ...) -> None: ...
 
 class CreateGameRequest(_message.Message):
-    __slots__ = ["required_players_cnt", "token"]
+    __slots__ = ["fast_mode", "required_players_cnt", "token"]
+    FAST_MODE_FIELD_NUMBER: _ClassVar[int]
     REQUIRED_PLAYERS_CNT_FIELD_NUMBER: _ClassVar[int]
     TOKEN_FIELD_NUMBER: _ClassVar[int]
+    fast_mode: bool
     required_players_cnt: int
     token: str
-    def __init__(self, token: _Optional[str] = ..., required_players_cnt: _Optional[int] = ...) -> None: ...
+    def __init__(self, token: _Optional[str] = ..., required_players_cnt: _Optional[int] = ..., fast_mode: bool = ...) -> None: ...
 
 class CreateGameResponse(_message.Message):
     __slots__ = ["code"]
@@ -61,13 +87,15 @@ class EndDayResponse(_message.Message):
     def __init__(self) -> None: ...
 
 class GameProcessRequest(_message.Message):
-    __slots__ = ["token"]
+    __slots__ = ["last_seq", "token"]
+    LAST_SEQ_FIELD_NUMBER: _ClassVar[int]
     TOKEN_FIELD_NUMBER: _ClassVar[int]
+    last_seq: int
     token: str
-    def __init__(self, token: _Optional[str] = ...) -> None: ...
+    def __init__(self, token: _Optional[str] = ..., last_seq: _Optional[int] = ...) -> None: ...
 
 class GameProcessResponse(_message.Message):
-    __slots__ = ["day", "end", "night"]
+    __slots__ = ["day", "end", "night", "seq"]
     class EndGame(_message.Message):
         __slots__ = ["winner"]
         WINNER_FIELD_NUMBER: _ClassVar[int]
@@ -98,10 +126,12 @@ class GameProcessResponse(_message.Message):
     DAY_FIELD_NUMBER: _ClassVar[int]
     END_FIELD_NUMBER: _ClassVar[int]
     NIGHT_FIELD_NUMBER: _ClassVar[int]
+    SEQ_FIELD_NUMBER: _ClassVar[int]
     day: GameProcessResponse.StartDay
     end: GameProcessResponse.EndGame
     night: GameProcessResponse.StartNight
-    def __init__(self, day: _Optional[_Union[GameProcessResponse.StartDay, _Mapping]] = ..., night: _Optional[_Union[GameProcessResponse.StartNight, _Mapping]] = ..., end: _Optional[_Union[GameProcessResponse.EndGame, _Mapping]] = ...) -> None: ...
+    seq: int
+    def __init__(self, day: _Optional[_Union[GameProcessResponse.StartDay, _Mapping]] = ..., night: _Optional[_Union[GameProcessResponse.StartNight, _Mapping]] = ..., end: _Optional[_Union[GameProcessResponse.EndGame, _Mapping]] = ..., seq: _Optional[int] = ...) -> None: ...
 
 class GetRoleRequest(_message.Message):
     __slots__ = ["token"]
@@ -124,8 +154,68 @@ class JoinGameRequest(_message.Message):
     def __init__(self, token: _Optional[str] = ..., code: _Optional[str] = ...) -> None: ...
 
 class JoinGameResponse(_message.Message):
-    __slots__ = []
-    def __init__(self) -> None: ...
+    __slots__ = ["port", "token"]
+    PORT_FIELD_NUMBER: _ClassVar[int]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    port: int
+    token: str
+    def __init__(self, token: _Optional[str] = ..., port: _Optional[int] = ...) -> None: ...
+
+class JournalRecord(_message.Message):
+    __slots__ = ["check", "connected", "created", "evicted", "finished", "game_id", "joined", "killed", "name", "phase_started", "player_id", "publish", "roles_assigned", "vote_day", "vote_night"]
+    class GameCreated(_message.Message):
+        __slots__ = ["code", "fast_mode", "required_players_cnt"]
+        CODE_FIELD_NUMBER: _ClassVar[int]
+        FAST_MODE_FIELD_NUMBER: _ClassVar[int]
+        REQUIRED_PLAYERS_CNT_FIELD_NUMBER: _ClassVar[int]
+        code: str
+        fast_mode: bool
+        required_players_cnt: int
+        def __init__(self, code: _Optional[str] = ..., required_players_cnt: _Optional[int] = ..., fast_mode: bool = ...) -> None: ...
+    class RolesAssigned(_message.Message):
+        __slots__ = ["roles"]
+        ROLES_FIELD_NUMBER: _ClassVar[int]
+        roles: _containers.RepeatedScalarFieldContainer[Role]
+        def __init__(self, roles: _Optional[_Iterable[_Union[Role, str]]] = ...) -> None: ...
+    CHECK_FIELD_NUMBER: _ClassVar[int]
+    CONNECTED_FIELD_NUMBER: _ClassVar[int]
+    CREATED_FIELD_NUMBER: _ClassVar[int]
+    EVICTED_FIELD_NUMBER: _ClassVar[int]
+    FINISHED_FIELD_NUMBER: _ClassVar[int]
+    GAME_ID_FIELD_NUMBER: _ClassVar[int]
+    JOINED_FIELD_NUMBER: _ClassVar[int]
+    KILLED_FIELD_NUMBER: _ClassVar[int]
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    PHASE_STARTED_FIELD_NUMBER: _ClassVar[int]
+    PLAYER_ID_FIELD_NUMBER: _ClassVar[int]
+    PUBLISH_FIELD_NUMBER: _ClassVar[int]
+    ROLES_ASSIGNED_FIELD_NUMBER: _ClassVar[int]
+    VOTE_DAY_FIELD_NUMBER: _ClassVar[int]
+    VOTE_NIGHT_FIELD_NUMBER: _ClassVar[int]
+    check: CheckRequest
+    connected: ConnectResponse
+    created: JournalRecord.GameCreated
+    evicted: bool
+    finished: bool
+    game_id: int
+    joined: bool
+    killed: bool
+    name: str
+    phase_started: int
+    player_id: int
+    publish: PublishRequest
+    roles_assigned: JournalRecord.RolesAssigned
+    vote_day: VoteDayRequest
+    vote_night: VoteNightRequest
+    def __init__(self, game_id: _Optional[int] = ..., player_id: _Optional[int] = ..., connected: _Optional[_Union[ConnectResponse, _Mapping]] = ..., created: _Optional[_Union[JournalRecord.GameCreated, _Mapping]] = ..., joined: bool = ..., roles_assigned: _Optional[_Union[JournalRecord.RolesAssigned, _Mapping]] = ..., vote_day: _Optional[_Union[VoteDayRequest, _Mapping]] = ..., vote_night: _Optional[_Union[VoteNightRequest, _Mapping]] = ..., check: _Optional[_Union[CheckRequest, _Mapping]] = ..., publish: _Optional[_Union[PublishRequest, _Mapping]] = ..., killed: bool = ..., phase_started: _Optional[int] = ..., finished: bool = ..., evicted: bool = ..., name: _Optional[str] = ...) -> None: ...
+
+class JournalSnapshot(_message.Message):
+    __slots__ = ["journal", "records"]
+    JOURNAL_FIELD_NUMBER: _ClassVar[int]
+    RECORDS_FIELD_NUMBER: _ClassVar[int]
+    journal: int
+    records: _containers.RepeatedCompositeFieldContainer[JournalRecord]
+    def __init__(self, journal: _Optional[int] = ..., records: _Optional[_Iterable[_Union[JournalRecord, _Mapping]]] = ...) -> None: ...
 
 class ListPlayersRequest(_message.Message):
     __slots__ = ["token"]
@@ -141,6 +231,22 @@ class ListPlayersResponse(_message.Message):
     required_players_cnt: int
     def __init__(self, required_players_cnt: _Optional[int] = ..., players: _Optional[_Iterable[_Union[Player, _Mapping]]] = ...) -> None: ...
 
+class PlayRequest(_message.Message):
+    __slots__ = ["action", "start"]
+    ACTION_FIELD_NUMBER: _ClassVar[int]
+    START_FIELD_NUMBER: _ClassVar[int]
+    action: Action
+    start: GameProcessRequest
+    def __init__(self, start: _Optional[_Union[GameProcessRequest, _Mapping]] = ..., action: _Optional[_Union[Action, _Mapping]] = ...) -> None: ...
+
+class PlayResponse(_message.Message):
+    __slots__ = ["event", "result"]
+    EVENT_FIELD_NUMBER: _ClassVar[int]
+    RESULT_FIELD_NUMBER: _ClassVar[int]
+    event: GameProcessResponse
+    result: ActionResult
+    def __init__(self, event: _Optional[_Union[GameProcessResponse, _Mapping]] = ..., result: _Optional[_Union[ActionResult, _Mapping]] = ...) -> None: ...
+
 class Player(_message.Message):
     __slots__ = ["id", "name"]
     ID_FIELD_NUMBER: _ClassVar[int]
@@ -161,6 +267,38 @@ class PublishResponse(_message.Message):
     __slots__ = []
     def __init__(self) -> None: ...
 
+class QuickMatchRequest(_message.Message):
+    __slots__ = ["fast_mode", "required_players_cnt", "token"]
+    FAST_MODE_FIELD_NUMBER: _ClassVar[int]
+    REQUIRED_PLAYERS_CNT_FIELD_NUMBER: _ClassVar[int]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    fast_mode: bool
+    required_players_cnt: int
+    token: str
+    def __init__(self, token: _Optional[str] = ..., required_players_cnt: _Optional[int] = ..., fast_mode: bool = ...) -> None: ...
+
+class QuickMatchResponse(_message.Message):
+    __slots__ = ["code", "port", "token"]
+    CODE_FIELD_NUMBER: _ClassVar[int]
+    PORT_FIELD_NUMBER: _ClassVar[int]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    code: str
+    port: int
+    token: str
+    def __init__(self, code: _Optional[str] = ..., token: _Optional[str] = ..., port: _Optional[int] = ...) -> None: ...
+
+class SubmitActionsRequest(_message.Message):
+    __slots__ = ["actions"]
+    ACTIONS_FIELD_NUMBER: _ClassVar[int]
+    actions: _containers.RepeatedCompositeFieldContainer[Action]
+    def __init__(self, actions: _Optional[_Iterable[_Union[Action, _Mapping]]] = ...) -> None: ...
+
+class SubmitActionsResponse(_message.Message):
+    __slots__ = ["results"]
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    results: _containers.RepeatedCompositeFieldContainer[ActionResult]
+    def __init__(self, results: _Optional[_Iterable[_Union[ActionResult, _Mapping]]] = ...) -> None: ...
+
 class VoteDayRequest(_message.Message):
     __slots__ = ["player_id", "token"]
     PLAYER_ID_FIELD_NUMBER: _ClassVar[int]
@@ -185,5 +323,19 @@ class VoteNightResponse(_message.Message):
     __slots__ = []
     def __init__(self) -> None: ...
 
+class WatchLobbyRequest(_message.Message):
+    __slots__ = ["token"]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    token: str
+    def __init__(self, token: _Optional[str] = ...) -> None: ...
+
+class WatchLobbyResponse(_message.Message):
+    __slots__ = ["joined", "required_players_cnt"]
+    JOINED_FIELD_NUMBER: _ClassVar[int]
+    REQUIRED_PLAYERS_CNT_FIELD_NUMBER: _ClassVar[int]
+    joined: _containers.RepeatedCompositeFieldContainer[Player]
+    required_players_cnt: int
+    def __init__(self, required_players_cnt: _Optional[int] = ..., joined: _Optional[_Iterable[_Union[Player, _Mapping]]] = ...) -> None: ...
+
 class Role(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
     __slots__ = []
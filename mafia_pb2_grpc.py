@@ -29,11 +29,21 @@ class MafiaStub(object):
                 request_serializer=mafia__pb2.JoinGameRequest.SerializeToString,
                 response_deserializer=mafia__pb2.JoinGameResponse.FromString,
                 )
+        self.QuickMatch = channel.unary_unary(
+                '/mafia.Mafia/QuickMatch',
+                request_serializer=mafia__pb2.QuickMatchRequest.SerializeToString,
+                response_deserializer=mafia__pb2.QuickMatchResponse.FromString,
+                )
         self.ListPlayers = channel.unary_unary(
                 '/mafia.Mafia/ListPlayers',
                 request_serializer=mafia__pb2.ListPlayersRequest.SerializeToString,
                 response_deserializer=mafia__pb2.ListPlayersResponse.FromString,
                 )
+        self.WatchLobby = channel.unary_stream(
+                '/mafia.Mafia/WatchLobby',
+                request_serializer=mafia__pb2.WatchLobbyRequest.SerializeToString,
+                response_deserializer=mafia__pb2.WatchLobbyResponse.FromString,
+                )
         self.GetRole = channel.unary_unary(
                 '/mafia.Mafia/GetRole',
                 request_serializer=mafia__pb2.GetRoleRequest.SerializeToString,
@@ -64,6 +74,16 @@ class MafiaStub(object):
                 request_serializer=mafia__pb2.PublishRequest.SerializeToString,
                 response_deserializer=mafia__pb2.PublishResponse.FromString,
                 )
+        self.SubmitActions = channel.unary_unary(
+                '/mafia.Mafia/SubmitActions',
+                request_serializer=mafia__pb2.SubmitActionsRequest.SerializeToString,
+                response_deserializer=mafia__pb2.SubmitActionsResponse.FromString,
+                )
+        self.Play = channel.stream_stream(
+                '/mafia.Mafia/Play',
+                request_serializer=mafia__pb2.PlayRequest.SerializeToString,
+                response_deserializer=mafia__pb2.PlayResponse.FromString,
+                )
 
 
 class MafiaServicer(object):
@@ -87,12 +107,25 @@ class MafiaServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def QuickMatch(self, request, context):
+        """Waits in a queue of players wanting the same game and returns once a game is formed of them.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListPlayers(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchLobby(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetRole(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -129,6 +162,20 @@ class MafiaServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubmitActions(self, request, context):
+        """Actions of many seats in one call, every one gets its own status.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Play(self, request_iterator, context):
+        """GameProcess and the player's actions over one stream, authenticated once by its first message.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MafiaServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -147,11 +194,21 @@ def add_MafiaServicer_to_server(servicer, server):
                     request_deserializer=mafia__pb2.JoinGameRequest.FromString,
                     response_serializer=mafia__pb2.JoinGameResponse.SerializeToString,
             ),
+            'QuickMatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.QuickMatch,
+                    request_deserializer=mafia__pb2.QuickMatchRequest.FromString,
+                    response_serializer=mafia__pb2.QuickMatchResponse.SerializeToString,
+            ),
             'ListPlayers': grpc.unary_unary_rpc_method_handler(
                     servicer.ListPlayers,
                     request_deserializer=mafia__pb2.ListPlayersRequest.FromString,
                     response_serializer=mafia__pb2.ListPlayersResponse.SerializeToString,
             ),
+            'WatchLobby': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchLobby,
+                    request_deserializer=mafia__pb2.WatchLobbyRequest.FromString,
+                    response_serializer=mafia__pb2.WatchLobbyResponse.SerializeToString,
+            ),
             'GetRole': grpc.unary_unary_rpc_method_handler(
                     servicer.GetRole,
                     request_deserializer=mafia__pb2.GetRoleRequest.FromString,
@@ -182,6 +239,16 @@ def add_MafiaServicer_to_server(servicer, server):
                     request_deserializer=mafia__pb2.PublishRequest.FromString,
                     response_serializer=mafia__pb2.PublishResponse.SerializeToString,
             ),
+            'SubmitActions': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitActions,
+                    request_deserializer=mafia__pb2.SubmitActionsRequest.FromString,
+                    response_serializer=mafia__pb2.SubmitActionsResponse.SerializeToString,
+            ),
+            'Play': grpc.stream_stream_rpc_method_handler(
+                    servicer.Play,
+                    request_deserializer=mafia__pb2.PlayRequest.FromString,
+                    response_serializer=mafia__pb2.PlayResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mafia.Mafia', rpc_method_handlers)
@@ -243,6 +310,23 @@ class Mafia(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def QuickMatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mafia.Mafia/QuickMatch',
+            mafia__pb2.QuickMatchRequest.SerializeToString,
+            mafia__pb2.QuickMatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def ListPlayers(request,
             target,
@@ -260,6 +344,23 @@ class Mafia(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchLobby(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/mafia.Mafia/WatchLobby',
+            mafia__pb2.WatchLobbyRequest.SerializeToString,
+            mafia__pb2.WatchLobbyResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetRole(request,
             target,
@@ -361,3 +462,37 @@ class Mafia(object):
             mafia__pb2.PublishResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubmitActions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mafia.Mafia/SubmitActions',
+            mafia__pb2.SubmitActionsRequest.SerializeToString,
+            mafia__pb2.SubmitActionsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Play(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/mafia.Mafia/Play',
+            mafia__pb2.PlayRequest.SerializeToString,
+            mafia__pb2.PlayResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
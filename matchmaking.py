@@ -0,0 +1,69 @@
+import asyncio
+import collections
+import typing
+
+
+class Matchmaker:
+    # One queue per kind of game, a game is formed as soon as a queue holds enough players for it.
+    # A player leaving the queue is only marked, the queue skips it when it reaches the front,
+    # so joining, leaving and matching a player are all O(1) amortized.
+    def __init__(self, form: typing.Callable[[int, bool, list], typing.Any]):
+        self.form = form
+        self.key_to_queue: dict[tuple[int, bool], collections.deque[tuple[str, typing.Any, asyncio.Future]]] = dict()
+        self.key_to_waiting_cnt: dict[tuple[int, bool], int] = dict()
+        self.token_to_waiter: dict[str, tuple[tuple[int, bool], asyncio.Future]] = dict()
+
+    def is_queued(self, token: str) -> bool:
+        return token in self.token_to_waiter
+
+    def get_queued_cnt(self) -> int:
+        return len(self.token_to_waiter)
+
+    def enqueue(self, token: str, item, required_players_cnt: int, fast_mode: bool) -> asyncio.Future:
+        # The future gets what form returned for the matched players.
+        key = (required_players_cnt, fast_mode)
+        future = asyncio.get_running_loop().create_future()
+        if key not in self.key_to_queue:
+            self.key_to_queue[key] = collections.deque()
+            self.key_to_waiting_cnt[key] = 0
+        self.key_to_queue[key].append((token, item, future))
+        self.key_to_waiting_cnt[key] += 1
+        self.token_to_waiter[token] = (key, future)
+        if self.key_to_waiting_cnt[key] == required_players_cnt:
+            self.match(key)
+        return future
+
+    def leave(self, token: str):
+        key, future = self.token_to_waiter.pop(token)
+        future.cancel()
+        self.key_to_waiting_cnt[key] -= 1
+        if not self.key_to_waiting_cnt[key]:
+            # Nobody is left but the marked players, they go with the queue.
+            self.remove(key)
+
+    def remove(self, key: tuple[int, bool]):
+        del self.key_to_queue[key]
+        del self.key_to_waiting_cnt[key]
+
+    def match(self, key: tuple[int, bool]):
+        required_players_cnt, fast_mode = key
+        queue = self.key_to_queue[key]
+        matched = []
+        while len(matched) < required_players_cnt:
+            token, item, future = queue.popleft()
+            if not future.done():
+                del self.token_to_waiter[token]
+                matched.append((item, future))
+        self.key_to_waiting_cnt[key] -= required_players_cnt
+        if not self.key_to_waiting_cnt[key]:
+            self.remove(key)
+
+        try:
+            result = self.form(required_players_cnt, fast_mode, [item for item, _ in matched])
+        except Exception as e:
+            # The matched players are out of the queue either way, they all learn the game wasn't formed.
+            for _, future in matched:
+                future.set_exception(e)
+            return
+        for _, future in matched:
+            future.set_result(result)
@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import logging
+import time
+import typing
+
+import grpc
+
+logger = logging.getLogger('mafia.metrics')
+
+# Seconds, from a cached lookup to a slow phase.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Messages, up to a full stream queue.
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+def format_labels(label_names: tuple[str, ...], labels: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, labels)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.values: dict[tuple, float] = dict()
+
+    def inc(self, *labels, value: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self) -> typing.Iterator[str]:
+        for labels, value in self.values.items():
+            yield f'{self.name}{format_labels(self.label_names, labels)} {value}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels, value: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - value
+
+
+class GaugeFunction:
+    # Read when scraped, so the hot path doesn't pay for values it already keeps.
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, function: typing.Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.function = function
+
+    def render(self) -> typing.Iterator[str]:
+        yield f'{self.name} {self.function()}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        # Per labels: the count of every bucket and of +Inf, not cumulative until rendered, then the sum.
+        self.counts: dict[tuple, list[int]] = dict()
+        self.sums: dict[tuple, float] = dict()
+
+    def observe(self, value: float, *labels):
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def render(self) -> typing.Iterator[str]:
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                total += count
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{format_labels(self.label_names, labels, le)} {total}'
+            yield f'{self.name}_sum{format_labels(self.label_names, labels)} {self.sums[labels]}'
+            yield f'{self.name}_count{format_labels(self.label_names, labels)} {total}'
+
+
+class Metrics:
+    def __init__(self):
+        self.instruments = []
+        self.rpc_duration = self.add(Histogram(
+            'mafia_rpc_duration_seconds', 'Unary RPC handling time.', ('method',)))
+        self.rpc_in_flight = self.add(Gauge('mafia_rpc_in_flight', 'Unary RPCs being handled.', ('method',)))
+        self.rpc_exceptions = self.add(Counter(
+            'mafia_rpc_exceptions_total', 'RPCs failed with an exception.', ('method',)))
+        self.rpc_rejected = self.add(Counter(
+            'mafia_rpc_rejected_total', 'RPCs the service answered with an error status.', ('method', 'code')))
+        self.streams_active = self.add(Gauge('mafia_streams_active', 'Open server streams.', ('method',)))
+        self.stream_messages = self.add(Counter(
+            'mafia_stream_messages_total', 'Messages sent to server streams.', ('method',)))
+        self.stream_queue_peak = self.add(Histogram(
+            'mafia_stream_queue_peak', 'Most messages queued at once in a stream, observed once per stream.',
+            ('method',), DEPTH_BUCKETS))
+        self.stream_overflows = self.add(Counter(
+            'mafia_stream_overflows_total', 'Full stream queues, coalesced or dropped with the stream.',
+            ('method', 'outcome')))
+        self.phase_duration = self.add(Histogram(
+            'mafia_phase_duration_seconds', 'From the start of a phase to the start of the next one.', ('phase',)))
+        self.vote_resolution = self.add(Histogram(
+            'mafia_vote_resolution_seconds', 'From the start of a phase to its kill.', ('phase',)))
+
+    def add(self, instrument):
+        self.instruments.append(instrument)
+        return instrument
+
+    def add_stats(self, get_stats: typing.Callable[[], dict[str, int]], names: typing.Iterable[str]):
+        for name in names:
+            self.add(GaugeFunction(f'mafia_{name}', f'{name} in EService.get_stats().',
+                                   lambda name=name: get_stats().get(name, 0)))
+
+    def render(self) -> str:
+        lines = []
+        for instrument in self.instruments:
+            lines.append(f'# HELP {instrument.name} {instrument.help}')
+            lines.append(f'# TYPE {instrument.name} {instrument.kind}')
+            lines.extend(instrument.render())
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        # Wrapped once per method rather than on every call.
+        self.method_to_handler: dict[str, grpc.RpcMethodHandler] = dict()
+
+    async def intercept_service(self, continuation, handler_call_details):
+        if handler_call_details.method in self.method_to_handler:
+            return self.method_to_handler[handler_call_details.method]
+
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        if handler.unary_unary:
+            handler = grpc.unary_unary_rpc_method_handler(
+                self.unary(method, handler.unary_unary), handler.request_deserializer, handler.response_serializer)
+        elif handler.unary_stream:
+            handler = grpc.unary_stream_rpc_method_handler(
+                self.stream(method, handler.unary_stream), handler.request_deserializer, handler.response_serializer)
+        elif handler.stream_stream:
+            handler = grpc.stream_stream_rpc_method_handler(
+                self.stream(method, handler.stream_stream), handler.request_deserializer, handler.response_serializer)
+        self.method_to_handler[handler_call_details.method] = handler
+        return handler
+
+    def unary(self, method: str, behavior):
+        metrics = self.metrics
+
+        async def wrapped(request, context):
+            metrics.rpc_in_flight.inc(method)
+            started = time.perf_counter()
+            try:
+                return await behavior(request, context)
+            except Exception:
+                metrics.rpc_exceptions.inc(method)
+                raise
+            finally:
+                metrics.rpc_duration.observe(time.perf_counter() - started, method)
+                metrics.rpc_in_flight.dec(method)
+        return wrapped
+
+    def stream(self, method: str, behavior):
+        metrics = self.metrics
+
+        async def wrapped(request, context):
+            metrics.streams_active.inc(method)
+            try:
+                async for response in behavior(request, context):
+                    metrics.stream_messages.inc(method)
+                    yield response
+            except Exception:
+                metrics.rpc_exceptions.inc(method)
+                raise
+            finally:
+                metrics.streams_active.dec(method)
+        return wrapped
+
+
+async def serve_metrics(metrics: Metrics, host: str, port: int) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while await reader.readline() not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.split()
+            if len(parts) > 1 and parts[1] == b'/metrics':
+                status, body = '200 OK', metrics.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n'
+                         f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("serving url=http://%s:%s/metrics", host, port)
+    return server
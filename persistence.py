@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import re
+import typing
+
+import mafia_pb2
+from wire import decode_delimited, encode_delimited
+
+logger = logging.getLogger('mafia.journal')
+
+
+class Journal:
+    # Records are buffered and written with one fsync per flush interval, so a crash loses at most
+    # the last interval of changes. A snapshot replaces all the journal files written before it.
+    SNAPSHOT = 'snapshot.bin'
+
+    def __init__(self, directory: str, flush_interval: float = 0.05):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.buffer: list[bytes] = []
+        self.number = 0
+        self.file: typing.BinaryIO | None = None
+        self.lock = asyncio.Lock()
+        self.records_cnt = 0
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get_journal_path(self, number: int) -> str:
+        return self.get_path(f'journal-{number}.log')
+
+    def get_journal_numbers(self) -> list[int]:
+        return sorted(int(match.group(1)) for name in os.listdir(self.directory)
+                      if (match := re.fullmatch(r'journal-(\d+)\.log', name)))
+
+    def load(self) -> typing.Iterator[mafia_pb2.JournalRecord]:
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = mafia_pb2.JournalSnapshot()
+        if os.path.exists(self.get_path(self.SNAPSHOT)):
+            with open(self.get_path(self.SNAPSHOT), 'rb') as file:
+                snapshot.ParseFromString(file.read())
+        yield from snapshot.records
+
+        numbers = self.get_journal_numbers()
+        for number in numbers:
+            if number < snapshot.journal:
+                # Left behind by a crash right after the snapshot that covers it.
+                os.remove(self.get_journal_path(number))
+                continue
+            with open(self.get_journal_path(number), 'rb') as file:
+                for data in decode_delimited(file.read()):
+                    yield mafia_pb2.JournalRecord.FromString(data)
+
+        # A fresh file, the last one may end with a torn record.
+        self.number = max(numbers + [snapshot.journal]) + 1
+        self.file = open(self.get_journal_path(self.number), 'ab')
+
+    def append(self, record: mafia_pb2.JournalRecord):
+        self.buffer.append(encode_delimited(record.SerializeToString()))
+        self.records_cnt += 1
+
+    @staticmethod
+    def write(file: typing.BinaryIO, data: bytes):
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    async def flush(self):
+        async with self.lock:
+            if not self.buffer:
+                return
+            data = b''.join(self.buffer)
+            self.buffer = []
+            await asyncio.to_thread(self.write, self.file, data)
+
+    async def flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def compact(self, records: list[mafia_pb2.JournalRecord]):
+        # Switches to the next journal before the first await, so the records describe exactly
+        # the state before everything written to it.
+        snapshot = mafia_pb2.JournalSnapshot(journal=self.number + 1, records=records)
+        data = b''.join(self.buffer)
+        self.buffer = []
+        file = self.file
+        self.number += 1
+        self.file = open(self.get_journal_path(self.number), 'ab')
+        self.records_cnt = 0
+
+        async with self.lock:
+            await asyncio.to_thread(self.write_snapshot, file, data, snapshot)
+        logger.info("snapshot records=%s journal=%s", len(records), self.number)
+
+    def write_snapshot(self, file: typing.BinaryIO, data: bytes, snapshot: mafia_pb2.JournalSnapshot):
+        self.write(file, data)
+        file.close()
+
+        path = self.get_path(self.SNAPSHOT + '.tmp')
+        with open(path, 'wb') as snapshot_file:
+            self.write(snapshot_file, snapshot.SerializeToString())
+        os.replace(path, self.get_path(self.SNAPSHOT))
+        directory = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        for number in self.get_journal_numbers():
+            if number < snapshot.journal:
+                os.remove(self.get_journal_path(number))
+
+    async def compact_forever(self, get_records: typing.Callable[[], list[mafia_pb2.JournalRecord]],
+                              interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if self.records_cnt:
+                await self.compact(get_records())
+
+    def close(self):
+        if self.buffer:
+            self.write(self.file, b''.join(self.buffer))
+            self.buffer = []
+        if self.file is not None:
+            self.file.close()
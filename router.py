@@ -0,0 +1,206 @@
+import asyncio
+import collections
+import logging
+import multiprocessing
+import typing
+
+import grpc
+
+import mafia_pb2
+import mafia_pb2_grpc
+
+logger = logging.getLogger('mafia.router')
+
+
+def token_shard(token: str, shards_cnt: int) -> int | None:
+    # Workers prefix their tokens with their shard, so the player's worker is known without any state.
+    shard, _, _ = token.partition('.')
+    if not shard.isdigit() or int(shard) >= shards_cnt:
+        return None
+    return int(shard)
+
+
+class Peers:
+    # The workers of a sharded server, their channels are opened on first use.
+    def __init__(self, addresses: list[str]):
+        self.addresses = addresses
+        self.stubs: dict[int, mafia_pb2_grpc.MafiaStub] = dict()
+
+    def get_stub(self, shard: int) -> mafia_pb2_grpc.MafiaStub:
+        if shard not in self.stubs:
+            self.stubs[shard] = mafia_pb2_grpc.MafiaStub(grpc.aio.insecure_channel(self.addresses[shard]))
+        return self.stubs[shard]
+
+    def get_port(self, shard: int) -> int:
+        return int(self.addresses[shard].rsplit(':', 1)[1])
+
+
+def routed(response):
+    def wrapper(handler):
+        async def wrapped(self, request, context):
+            shard = token_shard(request.token, len(self.stubs))
+            if shard is None:
+                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+                context.set_details(f"Player {request.token} not registered")
+                return response
+
+            try:
+                return await handler(self, request, context, shard)
+            except grpc.aio.AioRpcError as e:
+                context.set_code(e.code())
+                context.set_details(e.details())
+                return response
+        return wrapped
+    return wrapper
+
+
+def forward(method: str, response):
+    @routed(response)
+    async def handler(self, request, context, shard: int):
+        return await getattr(self.stubs[shard], method)(request)
+    return handler
+
+
+def forward_stream(method: str, response):
+    async def handler(self, request, context):
+        shard = token_shard(request.token, len(self.stubs))
+        if shard is None:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details(f"Player {request.token} not registered")
+            yield response
+            return
+
+        try:
+            async for event in getattr(self.stubs[shard], method)(request):
+                yield event
+        except grpc.aio.AioRpcError as e:
+            context.set_code(e.code())
+            context.set_details(e.details())
+    return handler
+
+
+class Router(mafia_pb2_grpc.MafiaServicer):
+    # Every game lives in exactly one worker and every token names the worker of its player. The router spreads
+    # Connects over the workers and forwards the calls of clients that don't talk to the workers directly.
+    def __init__(self, addresses: list[str]):
+        self.channels = [grpc.aio.insecure_channel(address) for address in addresses]
+        self.stubs = [mafia_pb2_grpc.MafiaStub(channel) for channel in self.channels]
+        self.next_shard = 0
+
+    async def Connect(self, request: mafia_pb2.ConnectRequest, context) -> mafia_pb2.ConnectResponse:
+        shard = self.next_shard
+        self.next_shard = (self.next_shard + 1) % len(self.stubs)
+
+        try:
+            return await self.stubs[shard].Connect(request)
+        except grpc.aio.AioRpcError as e:
+            context.set_code(e.code())
+            context.set_details(e.details())
+            return mafia_pb2.ConnectResponse()
+
+    CreateGame = forward('CreateGame', mafia_pb2.CreateGameResponse())
+    # The player's worker moves the player to the worker of the game itself.
+    JoinGame = forward('JoinGame', mafia_pb2.JoinGameResponse())
+    QuickMatch = forward('QuickMatch', mafia_pb2.QuickMatchResponse())
+    ListPlayers = forward('ListPlayers', mafia_pb2.ListPlayersResponse())
+    GetRole = forward('GetRole', mafia_pb2.GetRoleResponse())
+    VoteDay = forward('VoteDay', mafia_pb2.VoteDayResponse())
+    VoteNight = forward('VoteNight', mafia_pb2.VoteNightResponse())
+    Check = forward('Check', mafia_pb2.CheckResponse())
+    Publish = forward('Publish', mafia_pb2.PublishResponse())
+
+    async def SubmitActions(self, request: mafia_pb2.SubmitActionsRequest, context) -> mafia_pb2.SubmitActionsResponse:
+        # Split by the shard of every token, the workers get their parts at once.
+        results = [mafia_pb2.ActionResult() for _ in request.actions]
+        shard_to_actions: dict[int, list[tuple[int, mafia_pb2.Action]]] = collections.defaultdict(list)
+        for i, action in enumerate(request.actions):
+            kind = action.WhichOneof('action')
+            if kind is None:
+                results[i].code = grpc.StatusCode.INVALID_ARGUMENT.value[0]
+                results[i].details = "Empty action"
+                continue
+
+            action_request = getattr(action, kind)
+            shard = token_shard(action_request.token, len(self.stubs))
+            if shard is None:
+                results[i].code = grpc.StatusCode.UNAUTHENTICATED.value[0]
+                results[i].details = f"Player {action_request.token} not registered"
+                continue
+
+            shard_to_actions[shard].append((i, action))
+
+        async def submit(shard: int, actions: list[tuple[int, mafia_pb2.Action]]):
+            response = await self.stubs[shard].SubmitActions(
+                mafia_pb2.SubmitActionsRequest(actions=[action for _, action in actions]))
+            for (i, _), result in zip(actions, response.results):
+                results[i].CopyFrom(result)
+
+        try:
+            await asyncio.gather(*(submit(shard, actions) for shard, actions in shard_to_actions.items()))
+        except grpc.aio.AioRpcError as e:
+            context.set_code(e.code())
+            context.set_details(e.details())
+            return mafia_pb2.SubmitActionsResponse()
+        return mafia_pb2.SubmitActionsResponse(results=results)
+
+    WatchLobby = forward_stream('WatchLobby', mafia_pb2.WatchLobbyResponse())
+    GameProcess = forward_stream('GameProcess', mafia_pb2.GameProcessResponse())
+
+    async def Play(self, request_iterator, context) -> typing.AsyncIterator[mafia_pb2.PlayResponse]:
+        # Only the first message carries the token, the actions are applied for the stream's player.
+        start = await anext(request_iterator, None)
+        if start is None or start.WhichOneof('request') != 'start':
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Play must start with a GameProcessRequest")
+            return
+        shard = token_shard(start.start.token, len(self.stubs))
+        if shard is None:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details(f"Player {start.start.token} not registered")
+            return
+
+        call = self.stubs[shard].Play()
+
+        async def pump():
+            await call.write(start)
+            async for request in request_iterator:
+                await call.write(request)
+            await call.done_writing()
+
+        task = asyncio.create_task(pump())
+        try:
+            async for response in call:
+                yield response
+        except grpc.aio.AioRpcError as e:
+            context.set_code(e.code())
+            context.set_details(e.details())
+        finally:
+            task.cancel()
+            call.cancel()
+
+
+async def serve_sharded(host, port, workers_cnt: int, run_worker: typing.Callable[..., None]):
+    worker_ports = [int(port) + 1 + shard for shard in range(workers_cnt)]
+    addresses = [f'127.0.0.1:{worker_port}' for worker_port in worker_ports]
+    # Spawned rather than forked, the router's event loop is already running here. The workers listen on the
+    # router's host, the clients call them directly.
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_worker, args=(host, worker_port, shard, workers_cnt),
+                               kwargs=dict(peers=addresses), daemon=True)
+               for shard, worker_port in enumerate(worker_ports)]
+    for worker in workers:
+        worker.start()
+
+    router = Router(addresses)
+    await asyncio.gather(*(channel.channel_ready() for channel in router.channels))
+
+    server = grpc.aio.server()
+    mafia_pb2_grpc.add_MafiaServicer_to_server(router, server)
+    server.add_insecure_port(f'{host}:{port}')
+    await server.start()
+    logger.info("routing address=%s:%s workers=%s ports=%s", host, port, workers_cnt, worker_ports)
+    try:
+        await server.wait_for_termination()
+    finally:
+        for worker in workers:
+            worker.terminate()
@@ -0,0 +1,191 @@
+import collections
+import random
+import typing
+
+import mafia_pb2
+
+
+class RuleError(Exception):
+    # An action the rules don't allow, the player is told why.
+    pass
+
+
+class Rules:
+    # The game rules alone, without timers, events or I/O: the same seed and the same actions always play out
+    # the same game. Game adds the server's signalling on top of it, the simulator runs it as is.
+    def __init__(self, required_players_cnt: int, seed: int | None = None):
+        self.required_players_cnt = required_players_cnt
+        # A generator state takes ~2.5 KB, so only seeded games get their own.
+        self.random = random.Random(seed) if seed is not None else random
+
+        # Players are seated in join order, role and liveness take one byte per seat.
+        self.player_id_to_seat: dict[int, int] = dict()
+        self.players_ids: list[int] = []
+        self.roles = bytearray(required_players_cnt)
+        self.alive = bytearray(required_players_cnt)
+        self.alive_players_ids: set[int] = set()
+        self.alive_mafias_ids: set[int] = set()
+        self.alive_detective_id: int | None = None
+        # Bumped on every membership, role or liveness change, used to invalidate cached messages.
+        self.version = 0
+
+        self.votes: dict[int, int] = dict()
+        self.votes_cnt: collections.Counter[int] = collections.Counter()
+        self.leaders_ids: list[int] = []
+        self.leaders_votes_cnt = 0
+        self.checked_decision: bool | None = None
+        self.checked_ids: list[int] = []
+        self.killed_id: int | None = None
+
+    def assign_roles(self) -> list[mafia_pb2.Role]:
+        mafia_cnt = self.required_players_cnt // 4
+        roles = [mafia_pb2.ROLE_DETECTIVE] + [mafia_pb2.ROLE_MAFIA] * mafia_cnt + \
+                [mafia_pb2.ROLE_VILLAGER] * (self.required_players_cnt - mafia_cnt - 1)
+        self.random.shuffle(roles)
+        self.set_roles(roles)
+        return roles
+
+    def set_roles(self, roles: typing.Iterable[mafia_pb2.Role]):
+        for seat, (id, role) in enumerate(zip(self.players_ids, roles)):
+            self.roles[seat] = role
+            if role == mafia_pb2.ROLE_MAFIA:
+                self.alive_mafias_ids.add(id)
+            elif role == mafia_pb2.ROLE_DETECTIVE:
+                self.alive_detective_id = id
+        self.version += 1
+
+    def add_player(self, player_id: int):
+        if len(self.players_ids) == self.required_players_cnt:
+            raise RuleError('Game is full')
+
+        if player_id in self.player_id_to_seat:
+            raise RuleError(f'{player_id} already joined.')
+
+        self.seat(player_id)
+
+    def seat(self, player_id: int):
+        seat = len(self.players_ids)
+        self.player_id_to_seat[player_id] = seat
+        self.players_ids.append(player_id)
+        self.alive[seat] = True
+        self.alive_players_ids.add(player_id)
+        self.version += 1
+
+    def is_full(self) -> bool:
+        return len(self.players_ids) == self.required_players_cnt
+
+    def get_players_ids(self) -> list[int]:
+        return self.players_ids
+
+    def get_role(self, player_id: int) -> mafia_pb2.Role:
+        return self.roles[self.player_id_to_seat[player_id]]
+
+    def is_alive(self, player_id: int) -> bool:
+        return bool(self.alive[self.player_id_to_seat[player_id]])
+
+    def is_mafia(self, player_id: int) -> bool:
+        return self.get_role(player_id) == mafia_pb2.ROLE_MAFIA
+
+    def is_detective(self, player_id: int) -> bool:
+        return self.get_role(player_id) == mafia_pb2.ROLE_DETECTIVE
+
+    # Alive indexes are maintained incrementally and returned as is, callers must not mutate them.
+    def get_alive_players_ids(self) -> set[int]:
+        return self.alive_players_ids
+
+    def get_alive_mafias_ids(self) -> set[int]:
+        return self.alive_mafias_ids
+
+    def get_alive_detective_id(self) -> int | None:
+        return self.alive_detective_id
+
+    def choose_and_kill_player(self) -> int:
+        # Ties are broken by the game's own random, so a seeded game always kills the same player.
+        if len(self.leaders_ids) == 1:
+            chosen_id = self.leaders_ids[0]
+        else:
+            chosen_id = self.random.choice(sorted(self.leaders_ids))
+
+        self.kill(chosen_id)
+        return chosen_id
+
+    def kill(self, player_id: int):
+        self.alive[self.player_id_to_seat[player_id]] = False
+        self.alive_players_ids.discard(player_id)
+        self.alive_mafias_ids.discard(player_id)
+        if self.alive_detective_id == player_id:
+            self.alive_detective_id = None
+        self.version += 1
+        self.killed_id = player_id
+
+        self.votes = dict()
+        self.votes_cnt = collections.Counter()
+        self.leaders_ids = []
+        self.leaders_votes_cnt = 0
+
+    def validate_vote(self, player_id: int, candidate_id: int, voters_ids: set[int]):
+        if player_id not in voters_ids:
+            raise RuleError(f'{player_id} is not voter.')
+
+        if player_id in self.votes:
+            raise RuleError(f'{player_id} already voted.')
+
+        if candidate_id not in self.alive_players_ids:
+            raise RuleError(f'{candidate_id} is not alive candidate.')
+
+    def add_vote(self, player_id: int, candidate_id: int, voters_ids: set[int]) -> int | None:
+        # Returns the killed player once the last voter voted.
+        self.validate_vote(player_id, candidate_id, voters_ids)
+        self.count_vote(player_id, candidate_id)
+        if len(self.votes) == len(voters_ids):
+            return self.choose_and_kill_player()
+        return None
+
+    def count_vote(self, player_id: int, candidate_id: int):
+        self.votes[player_id] = candidate_id
+        candidate_votes_cnt = self.votes_cnt[candidate_id] + 1
+        self.votes_cnt[candidate_id] = candidate_votes_cnt
+        if candidate_votes_cnt > self.leaders_votes_cnt:
+            self.leaders_ids = [candidate_id]
+            self.leaders_votes_cnt = candidate_votes_cnt
+        elif candidate_votes_cnt == self.leaders_votes_cnt:
+            self.leaders_ids.append(candidate_id)
+
+    def add_day_vote(self, player_id: int, candidate_id: int) -> int | None:
+        return self.add_vote(player_id, candidate_id, self.get_alive_players_ids())
+
+    def add_night_vote(self, player_id: int, candidate_id: int) -> int | None:
+        return self.add_vote(player_id, candidate_id, self.get_alive_mafias_ids())
+
+    def get_player_role(self, player_id: int, candidate_id: int) -> mafia_pb2.Role:
+        if not self.is_detective(player_id):
+            raise RuleError(f'{player_id} cannot check.')
+
+        role = self.get_role(candidate_id)
+        if role == mafia_pb2.ROLE_MAFIA:
+            self.checked_ids.append(candidate_id)
+        return role
+
+    def check(self, player_id: int, candidate_id: int):
+        if not self.is_detective(player_id):
+            raise RuleError(f'{player_id} cannot check.')
+
+        if candidate_id not in self.player_id_to_seat:
+            raise RuleError(f'{candidate_id} is not in the game.')
+
+        if self.is_mafia(candidate_id):
+            self.checked_ids.append(candidate_id)
+
+    def publish(self, player_id: int, decision: bool):
+        if not self.is_detective(player_id):
+            raise RuleError(f'{player_id} cannot publish.')
+
+        self.checked_decision = decision
+
+    def get_winner(self) -> mafia_pb2.Role:
+        mafias_cnt = len(self.alive_mafias_ids)
+        if not mafias_cnt:
+            return mafia_pb2.ROLE_VILLAGER
+        if 2 * mafias_cnt >= len(self.alive_players_ids):
+            return mafia_pb2.ROLE_MAFIA
+        return None
@@ -1,6 +1,7 @@
+import functools
 import logging
+import math
 import os
-import string
 import typing
 import uuid
 
@@ -8,393 +9,1244 @@ import grpc
 
 import mafia_pb2
 import mafia_pb2_grpc
+from actors import Actor, ActorStopped
+from codes import CodeAllocator, code_shard
+from logs import setup_logging
+from matchmaking import Matchmaker
+from wire import encode_message_field
+from metrics import Metrics, MetricsInterceptor, serve_metrics
+from persistence import Journal
+from router import Peers, serve_sharded
+from rules import RuleError, Rules
+from streams import POLICIES, STREAM_QUEUE_SIZE, SendQueue
+from timers import Timer, TimerWheel
 
 import asyncio
-import random
-
-
-class PlayerInfo:
+import collections
+import time
+
+MIN_PLAYERS_CNT = 4
+# A game's tables are sized for all its players when it is created.
+MAX_PLAYERS_CNT = 1000
+
+game_logger = logging.getLogger('mafia.game')
+service_logger = logging.getLogger('mafia.service')
+stream_logger = logging.getLogger('mafia.stream')
+
+
+class PhaseScheduler:
+    # One pending timer per game instead of one sleeping coroutine per stream.
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        # Runs a timer's callback where the game is changed, the game's actor sets its tell.
+        self.dispatch: typing.Callable[[typing.Callable[[], None]], None] | None = None
+
+    def schedule(self, callback: typing.Callable[[], None]):
+        if self.delay <= 0:
+            callback()
+        elif self.dispatch is None:
+            asyncio.get_running_loop().call_later(self.delay, callback)
+        else:
+            asyncio.get_running_loop().call_later(self.delay, self.dispatch, callback)
+
+
+class PhaseBarrier:
+    # Streams wait for the end of the phase they are in. The game ends each phase once and wakes the streams
+    # waiting for it, a stream that comes to wait after the end does not wait at all.
+    # A phase starts only after the previous one ended, so everybody waiting waits for the next end.
     def __init__(self):
-        self.role: mafia_pb2.Role = mafia_pb2.ROLE_UNSPECIFIED
-        self.is_alive = True
+        self.ended_phase = 0
+        self.waiters: list[asyncio.Future] = []
 
-    def is_mafia(self):
-        return self.role == mafia_pb2.ROLE_MAFIA
+    async def wait(self, phase: int):
+        while phase > self.ended_phase:
+            future = asyncio.get_running_loop().create_future()
+            self.waiters.append(future)
+            await future
 
-    def is_detective(self):
-        return self.role == mafia_pb2.ROLE_DETECTIVE
+    def end(self, phase: int):
+        self.ended_phase = max(self.ended_phase, phase)
+        waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            # A cancelled stream leaves its future behind.
+            if not waiter.done():
+                waiter.set_result(None)
 
 
-class Game:
+class Game(Rules):
     next_id = 1
 
-    def __init__(self, required_players_cnt: int):
-        self.required_players_cnt = required_players_cnt
-
-        self.player_id_to_player_info: dict[int, PlayerInfo] = dict()
+    def __init__(self, required_players_cnt: int, seed: int | None = None, phase_delay: float = 0,
+                 journal: Journal | None = None, id: int | None = None, metrics: Metrics | None = None):
+        super().__init__(required_players_cnt, seed)
+        self.scheduler = PhaseScheduler(phase_delay)
 
-        self.votes: dict[int, int] = dict()
+        self.lobby_watchers: list[asyncio.Queue[int | None]] = []
         self.event_started: asyncio.Event = asyncio.Event()
-        self.event_killed: asyncio.Event = asyncio.Event()
-        self.event_checked: asyncio.Event = asyncio.Event()
-        self.checked_decision: bool | None = None
-        self.checked_ids: list[int] = []
-        self.started_cnt = 0
-
-        self.id: int = Game.next_id
-        logging.info(f"New Game({required_players_cnt}, id={Game.next_id})")
-        Game.next_id += 1
-
-    def assign_roles(self):
-        mafia_cnt = self.required_players_cnt // 4
-        roles = [mafia_pb2.ROLE_DETECTIVE] + [mafia_pb2.ROLE_MAFIA] * mafia_cnt + \
-                [mafia_pb2.ROLE_VILLAGER] * (self.required_players_cnt - mafia_cnt - 1)
-        random.shuffle(roles)
-
-        for id, role in zip(self.player_id_to_player_info.keys(), roles):
-            self.player_id_to_player_info[id].role = role
-
-        logging.info(f"Roles assigned")
+        self.barrier = PhaseBarrier()
+        # What the current phase still waits for, each step is done phase_delay after its action.
+        self.pending_steps: set[str] = set()
+        # Players with a stream open, a reopened stream counts once.
+        self.started_ids: set[int] = set()
+        # Number of nights and days started, every stream asks to start each phase but only the first one does.
+        self.phase = 0
+        # The phase of the last kill, a snapshot restores it after the phase start.
+        self.killed_phase = 0
+        self.code: str | None = None
+        self.finished = False
+        # Tears the game down once the phase that decided it ends, set by the service.
+        self.on_won: typing.Callable[[], None] | None = None
+        self.touched_at = time.monotonic()
+        self.journal = journal
+        self.metrics = metrics
+        self.phase_started_at = time.monotonic()
+
+        self.id: int = Game.next_id if id is None else id
+        game_logger.debug("created game=%s required_players_cnt=%s", self.id, required_players_cnt)
+        Game.next_id = max(Game.next_id, self.id + 1)
+
+    def record(self, player_id: int, **event):
+        if self.journal is not None:
+            self.journal.append(mafia_pb2.JournalRecord(game_id=self.id, player_id=player_id, **event))
+
+    def assign_roles(self) -> list[mafia_pb2.Role]:
+        roles = super().assign_roles()
+        self.record(0, roles_assigned=mafia_pb2.JournalRecord.RolesAssigned(roles=roles))
+
+        game_logger.info("roles_assigned game=%s", self.id)
+        return roles
 
     def add_player(self, player_id: int):
-        if len(self.player_id_to_player_info) == self.required_players_cnt:
-            raise Exception(f'Game {self.id} is full')
-
-        self.player_id_to_player_info[player_id] = PlayerInfo()
-        if len(self.player_id_to_player_info) == self.required_players_cnt:
+        if self.is_full():
+            raise RuleError(f'Game {self.id} is full')
+
+        super().add_player(player_id)
+        self.touch()
+        self.record(player_id, joined=True)
+        for watcher in self.lobby_watchers:
+            watcher.put_nowait(player_id)
+        if self.is_full():
             self.assign_roles()
 
-        logging.info(f"{player_id} added")
-
-    def get_alive_players_ids(self) -> set[int]:
-        return set([player_id for player_id, player in self.player_id_to_player_info.items() if player.is_alive])
-
-    def get_alive_mafias_ids(self) -> set[int]:
-        return set([player_id for player_id, player in self.player_id_to_player_info.items() if
-                    player.is_alive and player.is_mafia()])
-
-    def get_alive_detective_id(self) -> int | None:
-        for player_id, player in self.player_id_to_player_info.items():
-            if player.is_alive and player.is_detective():
-                return player_id
+        game_logger.debug("joined game=%s player=%s", self.id, player_id)
+
+    def choose_and_kill_player(self) -> int:
+        chosen_id = super().choose_and_kill_player()
+        self.record(chosen_id, killed=True)
+        if self.metrics is not None:
+            self.metrics.vote_resolution.observe(time.monotonic() - self.phase_started_at, self.get_phase_name())
+        self.scheduler.schedule(functools.partial(self.end_step, self.phase, 'kill'))
+
+        game_logger.info("killed game=%s player=%s", self.id, chosen_id)
+        return chosen_id
+
+    def kill(self, player_id: int):
+        super().kill(player_id)
+        self.killed_phase = self.phase
+
+    def add_vote(self, player_id: int, candidate_id: int, voters_ids: set[int], **event) -> int | None:
+        # The vote is journaled before the kill it may cause, replay needs them in this order.
+        self.validate_vote(player_id, candidate_id, voters_ids)
+        self.touch()
+        self.count_vote(player_id, candidate_id)
+        self.record(player_id, **event)
+        game_logger.debug("voted game=%s player=%s candidate=%s", self.id, player_id, candidate_id)
+        if len(self.votes) == len(voters_ids):
+            return self.choose_and_kill_player()
         return None
 
-    def choose_and_kill_player(self, votes: list[int], candidates_ids: set[int]):
-        chosen_id = max(candidates_ids, key=votes.count)
-
-        self.player_id_to_player_info[chosen_id].is_alive = False
-        self.event_killed.set()
-
-        logging.info(f"{chosen_id} killed")
+    def add_day_vote(self, player_id: int, candidate_id: int) -> int | None:
+        return self.add_vote(player_id, candidate_id, self.get_alive_players_ids(),
+                             vote_day=mafia_pb2.VoteDayRequest(player_id=candidate_id))
 
-    def add_vote(self, player_id: int, candidate_id: int, voters_ids: set[int]):
-        if player_id not in voters_ids:
-            raise Exception(f'{player_id} is not voter.')
+    def add_night_vote(self, player_id: int, candidate_id: int) -> int | None:
+        return self.add_vote(player_id, candidate_id, self.get_alive_mafias_ids(),
+                             vote_night=mafia_pb2.VoteNightRequest(player_id=candidate_id))
 
-        if player_id in self.votes:
-            raise Exception(f'{player_id} already voted.')
+    def check(self, player_id: int, candidate_id: int):
+        super().check(player_id, candidate_id)
+        self.touch()
+        self.record(player_id, check=mafia_pb2.CheckRequest(player_id=candidate_id))
 
-        alive_players_ids = self.get_alive_players_ids()
-        if candidate_id not in alive_players_ids:
-            raise Exception(f'{candidate_id} is not alive candidate.')
+    def publish(self, player_id: int, decision: bool):
+        super().publish(player_id, decision)
+        self.touch()
+        self.record(player_id, publish=mafia_pb2.PublishRequest(decision=decision))
+        self.scheduler.schedule(functools.partial(self.end_step, self.phase, 'check'))
+
+    def expire_phase(self, phase: int, vote_policy: str):
+        # The phase's deadline: the voters who didn't vote abstain or vote at random, a detective who didn't publish
+        # publishes nothing.
+        if phase != self.phase or self.finished:
+            return
 
-        self.votes[player_id] = candidate_id
-        if len(self.votes) == len(voters_ids):
-            self.choose_and_kill_player(list(self.votes.values()), alive_players_ids)
-            self.votes = dict()
+        if self.killed_phase != phase:
+            night = phase % 2
+            voters_ids = self.get_alive_mafias_ids() if night else self.get_alive_players_ids()
+            missing_ids = sorted(voters_ids - self.votes.keys())
+            game_logger.info("votes_expired game=%s phase=%s missing=%s policy=%s", self.id, phase, missing_ids,
+                             vote_policy)
+            if vote_policy == 'random':
+                for player_id in missing_ids:
+                    excluded_ids = self.get_alive_mafias_ids() if night else {player_id}
+                    candidate_id = self.random.choice(sorted(self.get_alive_players_ids() - excluded_ids))
+                    if night:
+                        self.add_night_vote(player_id, candidate_id)
+                    else:
+                        self.add_day_vote(player_id, candidate_id)
+            elif self.votes:
+                self.choose_and_kill_player()
+            else:
+                # Nobody voted, nobody dies.
+                self.scheduler.schedule(functools.partial(self.end_step, phase, 'kill'))
+
+        if 'check' in self.pending_steps and self.checked_decision is None:
+            game_logger.info("check_expired game=%s phase=%s", self.id, phase)
+            self.end_step(phase, 'check')
+
+    def end_step(self, phase: int, step: str):
+        # Steps done for a phase that is over already are late, the phase ends with its last step.
+        if phase != self.phase:
+            return
+        self.pending_steps.discard(step)
+        if not self.pending_steps:
+            self.barrier.end(phase)
+            if self.on_won is not None and self.get_winner() is not None:
+                self.on_won()
+
+    def touch(self):
+        self.touched_at = time.monotonic()
+
+    def finish(self):
+        # Wakes up everybody still waiting on the game, they see it finished and leave.
+        self.finished = True
+        self.event_started.set()
+        self.barrier.end(math.inf)
+        for watcher in self.lobby_watchers:
+            watcher.put_nowait(None)
+
+    def start(self, player_id: int):
+        self.started_ids.add(player_id)
+        if len(self.started_ids) == self.required_players_cnt:
+            self.event_started.set()
 
-        logging.info(f"{player_id} -> {candidate_id} added")
+    def get_phase_name(self) -> str:
+        return 'night' if self.phase % 2 else 'day'
 
-    def add_day_vote(self, player_id: int, candidate_id: int):
-        self.add_vote(player_id, candidate_id, self.get_alive_players_ids())
+    def measure_phase(self):
+        now = time.monotonic()
+        if self.phase:
+            self.metrics.phase_duration.observe(now - self.phase_started_at, self.get_phase_name())
+        self.phase_started_at = now
 
-    def add_night_vote(self, player_id: int, candidate_id: int):
-        self.add_vote(player_id, candidate_id, self.get_alive_mafias_ids())
+    def start_night(self, phase: int):
+        if phase <= self.phase:
+            return
+        if self.metrics is not None:
+            self.measure_phase()
+        self.phase = phase
+        self.record(0, phase_started=phase)
 
-    def get_player_role(self, player_id: int, candidate_id: int) -> mafia_pb2.Role:
-        player_info = self.player_id_to_player_info[player_id]
-        if not player_info.is_detective():
-            raise Exception(f'{player_id} cannot check.')
+        self.checked_decision = None
+        self.pending_steps = {'kill', 'check'} if self.get_alive_detective_id() is not None else {'kill'}
 
-        candidate_info = self.player_id_to_player_info[candidate_id]
-        if candidate_info.is_mafia():
-            self.checked_ids.append(candidate_id)
-        return candidate_info.role
+    def start_day(self, phase: int):
+        if phase <= self.phase:
+            return
+        if self.metrics is not None:
+            self.measure_phase()
+        self.phase = phase
+        self.record(0, phase_started=phase)
+
+        self.pending_steps = {'kill'}
+
+    def restore(self, record: mafia_pb2.JournalRecord):
+        # Replays a journal record without the checks, randomness and timers of the live methods,
+        # the current phase ends up waiting exactly for the steps not done yet.
+        player_id = record.player_id
+        match record.WhichOneof('event'):
+            case 'joined':
+                self.seat(player_id)
+            case 'roles_assigned':
+                self.set_roles(record.roles_assigned.roles)
+            case 'vote_day':
+                self.count_vote(player_id, record.vote_day.player_id)
+            case 'vote_night':
+                self.count_vote(player_id, record.vote_night.player_id)
+            case 'killed':
+                self.kill(player_id)
+                self.end_step(self.phase, 'kill')
+            case 'check':
+                if self.is_mafia(record.check.player_id):
+                    self.checked_ids.append(record.check.player_id)
+            case 'publish':
+                self.checked_decision = record.publish.decision
+                self.end_step(self.phase, 'check')
+            case 'phase_started':
+                # A phase starts only after the previous one ended.
+                self.event_started.set()
+                self.barrier.end(record.phase_started - 1)
+                if record.phase_started % 2:
+                    self.start_night(record.phase_started)
+                else:
+                    self.start_day(record.phase_started)
+
+    def get_records(self) -> typing.Iterator[mafia_pb2.JournalRecord]:
+        # The shortest journal that restores the game as it is now.
+        for player_id in self.players_ids:
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=player_id, joined=True)
+        if len(self.players_ids) < self.required_players_cnt:
+            return
 
-    def check(self, player_id: int, candidate_id: int):
-        player_info = self.player_id_to_player_info[player_id]
-        if not player_info.is_detective():
-            raise Exception(f'{player_id} cannot check.')
+        yield mafia_pb2.JournalRecord(game_id=self.id, roles_assigned=mafia_pb2.JournalRecord.RolesAssigned(
+            roles=self.roles))
+        # The last kill is replayed in its phase, the next phase's events tell who it was.
+        last_killed_id = self.killed_id if self.phase else None
+        for player_id in self.players_ids:
+            if player_id != last_killed_id and not self.is_alive(player_id):
+                yield mafia_pb2.JournalRecord(game_id=self.id, player_id=player_id, killed=True)
+        detective_id = self.players_ids[self.roles.index(mafia_pb2.ROLE_DETECTIVE)]
+        for candidate_id in self.checked_ids:
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=detective_id,
+                                          check=mafia_pb2.CheckRequest(player_id=candidate_id))
+        if not self.phase:
+            return
 
-        candidate_info = self.player_id_to_player_info[candidate_id]
-        if candidate_info.is_mafia():
-            self.checked_ids.append(candidate_id)
+        if last_killed_id is not None and self.killed_phase < self.phase:
+            yield mafia_pb2.JournalRecord(game_id=self.id, phase_started=self.killed_phase)
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=last_killed_id, killed=True)
+        yield mafia_pb2.JournalRecord(game_id=self.id, phase_started=self.phase)
+        for player_id, candidate_id in self.votes.items():
+            if self.phase % 2:
+                vote = dict(vote_night=mafia_pb2.VoteNightRequest(player_id=candidate_id))
+            else:
+                vote = dict(vote_day=mafia_pb2.VoteDayRequest(player_id=candidate_id))
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=player_id, **vote)
+        if last_killed_id is not None and self.killed_phase == self.phase:
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=last_killed_id, killed=True)
+        if self.checked_decision is not None:
+            yield mafia_pb2.JournalRecord(game_id=self.id, player_id=detective_id,
+                                          publish=mafia_pb2.PublishRequest(decision=self.checked_decision))
+
+
+class PlayersBlob:
+    def __init__(self, field_number: int, players_ids: typing.Iterable[int], get_data: typing.Callable[[int], bytes]):
+        self.offsets: dict[int, tuple[int, int]] = dict()
+        entries = []
+        offset = 0
+        for player_id in players_ids:
+            entry = encode_message_field(field_number, get_data(player_id))
+            self.offsets[player_id] = (offset, offset + len(entry))
+            offset += len(entry)
+            entries.append(entry)
+        self.data = b''.join(entries)
+
+    def without(self, player_id: int) -> bytes:
+        if player_id not in self.offsets:
+            return self.data
+        start, end = self.offsets[player_id]
+        return self.data[:start] + self.data[end:]
+
+
+class PhaseEvent:
+    # A phase as the whole game saw it when it started, kept for the streams resuming after it.
+    def __init__(self, seq: int, players: PlayersBlob, mafias: PlayersBlob | None = None, shared: bytes = b''):
+        self.seq = seq
+        self.players = players
+        self.mafias = mafias
+        self.shared = shared
+
+
+class PhaseBroadcaster:
+    # Serializes the shared part of a phase message once per game,
+    # each stream only adds its own small fields and cuts itself out of the lists.
+    # The ListPlayers and Check responses are the same for every caller and are kept whole.
+    NIGHT_FIELD = 2
+    DAY_FIELD = 1
+    # Phases kept for resumed streams, a stream that missed more gets only the last ones.
+    EVENTS_CNT = 16
+
+    def __init__(self, game: Game, player_id_to_player: dict[int, mafia_pb2.Player]):
+        self.game = game
+        self.player_id_to_player = player_id_to_player
+        # A Player message never changes, so it is serialized once per game.
+        self.player_id_to_data: dict[int, bytes] = dict()
+
+        self.list_key = None
+        self.list_response = mafia_pb2.ListPlayersResponse()
+        self.checked_cnt = None
+        self.check_response = mafia_pb2.CheckResponse()
+
+        self.events: collections.deque[PhaseEvent] = collections.deque(maxlen=self.EVENTS_CNT)
+
+    def get_players(self, players_ids: typing.Iterable[int]) -> list[mafia_pb2.Player]:
+        return [self.player_id_to_player[player_id] for player_id in players_ids]
+
+    def get_data(self, player_id: int) -> bytes:
+        data = self.player_id_to_data.get(player_id)
+        if data is None:
+            data = self.player_id_to_data[player_id] = self.player_id_to_player[player_id].SerializeToString()
+        return data
+
+    # The cached responses are shared by all callers, they must not be modified.
+    def list_players(self) -> mafia_pb2.ListPlayersResponse:
+        game = self.game
+        if self.list_key != game.version:
+            self.list_response = mafia_pb2.ListPlayersResponse(required_players_cnt=game.required_players_cnt,
+                                                               players=self.get_players(game.get_players_ids()))
+            self.list_key = game.version
+        return self.list_response
+
+    def checked(self) -> mafia_pb2.CheckResponse:
+        # Checked mafias are only ever appended.
+        checked_ids = self.game.checked_ids
+        if self.checked_cnt != len(checked_ids):
+            self.check_response = mafia_pb2.CheckResponse(mafias=self.get_players(checked_ids))
+            self.checked_cnt = len(checked_ids)
+        return self.check_response
+
+    def publish(self, phase: int):
+        # Every stream publishes the phase it starts, only the first one builds it.
+        if self.events and self.events[-1].seq >= phase:
+            return
 
-    def publish(self, player_id: int, decision: bool):
-        player_info = self.player_id_to_player_info[player_id]
-        if not player_info.is_detective():
-            raise Exception(f'{player_id} cannot publish.')
+        game = self.game
+        if phase % 2:
+            event = PhaseEvent(phase, PlayersBlob(3, game.get_alive_players_ids(), self.get_data),
+                               mafias=PlayersBlob(4, game.get_alive_mafias_ids(), self.get_data))
+        else:
+            detective_id = game.get_alive_detective_id()
+            publish = bool(game.checked_decision and detective_id)
+            event = PhaseEvent(phase, PlayersBlob(2, game.get_alive_players_ids(), self.get_data),
+                               shared=mafia_pb2.GameProcessResponse.StartDay(
+                                   mafias=self.get_players(game.get_alive_mafias_ids()) if publish else [],
+                                   detective=self.player_id_to_player[detective_id] if detective_id else None
+                               ).SerializeToString())
+        self.events.append(event)
+
+    def get_events(self, last_seq: int) -> list[PhaseEvent]:
+        return [event for event in self.events if event.seq > last_seq]
+
+    def render(self, event: PhaseEvent, player_id: int) -> mafia_pb2.GameProcessResponse:
+        is_alive = player_id in event.players.offsets
+        if event.seq % 2:
+            role = self.game.get_role(player_id)
+            payload = mafia_pb2.GameProcessResponse.StartNight(is_alive=is_alive, role=role).SerializeToString()
+            payload += event.players.without(player_id)
+            if role == mafia_pb2.ROLE_MAFIA or not is_alive:
+                payload += event.mafias.without(player_id)
+            response = mafia_pb2.GameProcessResponse.FromString(encode_message_field(self.NIGHT_FIELD, payload))
+        else:
+            payload = mafia_pb2.GameProcessResponse.StartDay(is_alive=is_alive).SerializeToString()
+            payload += event.players.without(player_id) + event.shared
+            response = mafia_pb2.GameProcessResponse.FromString(encode_message_field(self.DAY_FIELD, payload))
+        response.seq = event.seq
+        return response
+
+
+class GameActor(Actor):
+    # Every change of a game after it is created goes through its actor: the actions, the phase starts and the
+    # timers. Reads are left to the handlers, they are served from the broadcaster's caches.
+    def __init__(self, game: Game, broadcaster: PhaseBroadcaster, timer_wheel: TimerWheel | None = None,
+                 vote_timeout: float = 0, vote_policy: str = 'abstain'):
+        super().__init__(f'Game {game.id}')
+        self.game = game
+        self.broadcaster = broadcaster
+        game.scheduler.dispatch = self.tell
+        self.timer_wheel = timer_wheel
+        self.vote_timeout = vote_timeout
+        self.vote_policy = vote_policy
+        self.deadline: Timer | None = None
+
+    def start_phase(self, phase: int):
+        if phase > self.game.phase:
+            self.set_deadline(phase)
+        if phase % 2:
+            self.game.start_night(phase)
+        else:
+            self.game.start_day(phase)
+        self.broadcaster.publish(phase)
+
+    def set_deadline(self, phase: int):
+        if self.timer_wheel is None or self.vote_timeout <= 0:
+            return
+        if self.deadline is not None:
+            self.timer_wheel.cancel(self.deadline)
+        self.deadline = self.timer_wheel.add(self.vote_timeout, self.tell, self.game.expire_phase, phase,
+                                             self.vote_policy)
 
-        self.checked_decision = decision
-        self.event_checked.set()
+    def stop(self):
+        super().stop()
+        if self.deadline is not None:
+            self.timer_wheel.cancel(self.deadline)
 
-    def start(self):
-        self.started_cnt += 1
-        if self.started_cnt == self.required_players_cnt:
-            self.event_started.set()
 
-    def start_night(self):
-        self.checked_decision = None
-        self.event_killed.clear()
-        if self.get_alive_detective_id() is not None:
-            self.event_checked.clear()
-
-    def start_day(self):
-        self.event_killed.clear()
-
-    def get_winner(self) -> mafia_pb2.Role:
-        players = self.get_alive_players_ids()
-        mafias = self.get_alive_mafias_ids()
-        if not mafias:
-            return mafia_pb2.ROLE_VILLAGER
-        if 2 * len(mafias) >= len(players):
-            return mafia_pb2.ROLE_MAFIA
-        return None
+class Session:
+    # Everything a token stands for, resolved with one lookup per RPC. Joining a game fills in the game part,
+    # tearing the game down clears it.
+    def __init__(self, token: str, player: mafia_pb2.Player):
+        self.token = token
+        self.player = player
+        self.game: Game | None = None
+        self.seat: int | None = None
+        self.broadcaster: PhaseBroadcaster | None = None
+        self.actor: GameActor | None = None
 
 
 def check(response):
     def wrapper(handler):
         async def wrapped(self, request, context):
-            if request.token not in self.token_to_player:
-                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-                context.set_details(f"Player {request.token} not registered")
+            session = self.find_game(request.token, context, handler.__name__)
+            if session is None:
                 return response
+            try:
+                return await handler(self, request, context, session)
+            except ActorStopped:
+                # The game was torn down while the call waited for it.
+                self.reject_without_game(session, context, handler.__name__)
+                return response
+        # SubmitActions finds the games itself and calls the handler directly.
+        wrapped.handler = handler
+        return wrapped
+    return wrapper
 
-            player = self.token_to_player[request.token]
 
-            if player.id not in self.player_id_to_game_id:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Player {player.name}({player.id}) isn't playing any game")
-                return response
+class ActionContext:
+    # Takes the place of the gRPC context for one SubmitActions entry.
+    def __init__(self):
+        self.code = grpc.StatusCode.OK
+        self.details = ''
 
-            game_id = self.player_id_to_game_id[player.id]
+    def set_code(self, code: grpc.StatusCode):
+        self.code = code
 
-            if game_id not in self.game_id_to_game:
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details(f"Game {game_id} is broken")
-                return response
+    def set_details(self, details: str):
+        self.details = details
 
-            game = self.game_id_to_game[game_id]
-            return await handler(self, request, context, player, game)
-        return wrapped
-    return wrapper
+    def to_result(self) -> mafia_pb2.ActionResult:
+        return mafia_pb2.ActionResult(code=self.code.value[0], details=self.details)
 
 
 class EService(mafia_pb2_grpc.MafiaServicer):
     player_next_id = 1
 
-    def __init__(self):
-        self.token_to_player: dict[str, mafia_pb2.Player] = dict()
+    def __init__(self, phase_delay: float = 5, shard: int = 0, shards_cnt: int = 1, game_ttl: float = 3600,
+                 token_ttl: float = 3600, sweep_interval: float = 60, journal: Journal | None = None,
+                 metrics: Metrics | None = None, vote_timeout: float = 0, vote_policy: str = 'abstain',
+                 stream_queue_size: int = STREAM_QUEUE_SIZE, stream_policy: str = 'coalesce',
+                 peers: Peers | None = None):
+        if vote_policy not in ('abstain', 'random'):
+            raise Exception(f'Unknown vote policy {vote_policy}')
+        if stream_policy not in POLICIES:
+            raise Exception(f'Unknown stream policy {stream_policy}')
+        self.phase_delay = phase_delay
+        self.shard = shard
+        self.shards_cnt = shards_cnt
+        # The other workers of a sharded server, players are moved to the worker of their game.
+        self.peers = peers
+        self.game_ttl = game_ttl
+        self.token_ttl = token_ttl
+        self.sweep_interval = sweep_interval
+        # Votes and checks not done this long after the phase start expire, 0 waits forever.
+        self.vote_timeout = vote_timeout
+        self.vote_policy = vote_policy
+        self.timer_wheel = TimerWheel()
+        self.stream_queue_size = stream_queue_size
+        self.stream_policy = stream_policy
+
+        self.token_to_session: dict[str, Session] = dict()
         self.code_to_game: dict[str, Game] = dict()
+        self.code_allocator = CodeAllocator(shard, shards_cnt)
 
         self.player_id_to_player: dict[int, mafia_pb2.Player] = dict()
+        self.player_id_to_session: dict[int, Session] = dict()
         self.game_id_to_game: dict[int, Game] = dict()
+        self.game_id_to_broadcaster: dict[int, PhaseBroadcaster] = dict()
+        self.game_id_to_actor: dict[int, GameActor] = dict()
+
+        # Tokens of players outside of any game, in the order they became idle.
+        self.token_to_idle_since: dict[str, float] = dict()
+        self.reclaimed: collections.Counter[str] = collections.Counter()
+        self.matchmaker = Matchmaker(self.form_game)
+        self.journal = journal
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.add_stats(self.get_stats, ('live_games', 'live_tokens', 'playing_players', 'idle_tokens',
+                                               'queued_players'))
+
+    def record(self, record: mafia_pb2.JournalRecord):
+        if self.journal is not None:
+            self.journal.append(record)
+
+    def reject(self, context, method: str, code: grpc.StatusCode, details: str):
+        context.set_code(code)
+        context.set_details(details)
+        if self.metrics is not None:
+            self.metrics.rpc_rejected.inc(method, code.name)
+
+    def find_session(self, token: str, context, method: str) -> Session | None:
+        session = self.token_to_session.get(token)
+        if session is None:
+            return self.reject(context, method, grpc.StatusCode.UNAUTHENTICATED, f"Player {token} not registered")
+        return session
+
+    def find_game(self, token: str, context, method: str) -> Session | None:
+        session = self.find_session(token, context, method)
+        if session is None:
+            return None
+
+        if session.game is None:
+            return self.reject_without_game(session, context, method)
+        return session
+
+    def validate_players_cnt(self, required_players_cnt: int, context, method: str) -> bool:
+        if MIN_PLAYERS_CNT <= required_players_cnt <= MAX_PLAYERS_CNT:
+            return True
+        self.reject(context, method, grpc.StatusCode.INVALID_ARGUMENT,
+                    f"From {MIN_PLAYERS_CNT} to {MAX_PLAYERS_CNT} players are required")
+        return False
+
+    def reject_without_game(self, session: Session, context, method: str):
+        player = session.player
+        self.reject(context, method, grpc.StatusCode.NOT_FOUND,
+                    f"Player {player.name}({player.id}) isn't playing any game")
+
+    def join(self, session: Session, game: Game):
+        session.game = game
+        session.seat = game.player_id_to_seat[session.player.id]
+        session.broadcaster = self.game_id_to_broadcaster[game.id]
+        session.actor = self.game_id_to_actor[game.id]
+        self.token_to_idle_since.pop(session.token, None)
+
+    def seat_player(self, session: Session, game: Game):
+        # On the game's actor, so the session joins even if the caller is gone by the time the player is seated.
+        game.add_player(session.player.id)
+        self.join(session, game)
+
+    def check_player(self, session: Session, candidate_id: int) -> mafia_pb2.CheckResponse:
+        # On the game's actor, a vote queued behind the check may finish the game and tear the session down.
+        session.game.check(session.player.id, candidate_id)
+        return session.broadcaster.checked()
+
+    def set_idle(self, token: str):
+        self.token_to_idle_since.pop(token, None)
+        self.token_to_idle_since[token] = time.monotonic()
+
+    def finish_game(self, game: Game, reason: str):
+        if game.finished:
+            return
 
-        self.player_id_to_game_id: dict[int, int] = dict()
+        game.finish()
+        self.remove_game(game)
+        self.record(mafia_pb2.JournalRecord(game_id=game.id, finished=True))
+
+        self.reclaimed[reason] += 1
+        service_logger.info("%s game=%s", reason, game.id)
+
+    def remove_game(self, game: Game):
+        if self.code_to_game.get(game.code) is game:
+            del self.code_to_game[game.code]
+            self.code_allocator.free(game.code)
+        del self.game_id_to_game[game.id]
+        del self.game_id_to_broadcaster[game.id]
+        self.game_id_to_actor.pop(game.id).stop()
+        for player_id in game.get_players_ids():
+            session = self.player_id_to_session.get(player_id)
+            if session is not None and session.game is game:
+                session.game = session.seat = session.broadcaster = session.actor = None
+                self.set_idle(session.token)
+
+    async def move(self, session: Session, shard: int, method: str, request, context, response):
+        # The player connects to the game's worker and makes the call there, then leaves this one.
+        stub = self.peers.get_stub(shard)
+        try:
+            token = (await stub.Connect(mafia_pb2.ConnectRequest(name=session.player.name))).token
+            request.token = token
+            response = await getattr(stub, method)(request)
+        except grpc.aio.AioRpcError as e:
+            self.reject(context, method, e.code(), e.details())
+            return response
+
+        response.token, response.port = token, self.peers.get_port(shard)
+        if session.token in self.token_to_idle_since:
+            self.evict(session.token)
+        service_logger.info("moved player=%s shard=%s token=%s", session.player.id, shard, token)
+        return response
+
+    def evict(self, token: str):
+        del self.token_to_idle_since[token]
+        player = self.token_to_session.pop(token).player
+        del self.player_id_to_player[player.id]
+        del self.player_id_to_session[player.id]
+        self.record(mafia_pb2.JournalRecord(player_id=player.id, evicted=True))
+
+    async def sweep(self):
+        now = time.monotonic()
+        for game in list(self.game_id_to_game.values()):
+            actor = self.game_id_to_actor.get(game.id)
+            if actor is not None and now - game.touched_at > self.game_ttl:
+                try:
+                    await actor.call(self.finish_game, game, 'abandoned_games')
+                except ActorStopped:
+                    # Torn down while the sweep waited.
+                    pass
+
+        while self.token_to_idle_since:
+            token, idle_since = next(iter(self.token_to_idle_since.items()))
+            if now - idle_since <= self.token_ttl:
+                break
+
+            self.evict(token)
+            self.reclaimed['tokens'] += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            'live_games': len(self.game_id_to_game),
+            'live_codes': len(self.code_to_game),
+            'free_codes': self.code_allocator.get_free_cnt(),
+            'live_tokens': len(self.token_to_session),
+            # A token is idle exactly while its player is neither in a game nor queued for one.
+            'playing_players': len(self.token_to_session) - len(self.token_to_idle_since) -
+                               self.matchmaker.get_queued_cnt(),
+            'idle_tokens': len(self.token_to_idle_since),
+            'queued_players': self.matchmaker.get_queued_cnt(),
+            'pending_timers': self.timer_wheel.get_timers_cnt(),
+            **{f'reclaimed_{reason}': cnt for reason, cnt in self.reclaimed.items()},
+        }
+
+    def add_game(self, game: Game):
+        self.code_to_game[game.code] = game
+        self.game_id_to_game[game.id] = game
+        broadcaster = self.game_id_to_broadcaster[game.id] = PhaseBroadcaster(game, self.player_id_to_player)
+        self.game_id_to_actor[game.id] = GameActor(game, broadcaster, self.timer_wheel, self.vote_timeout,
+                                                   self.vote_policy)
+
+    def create_game(self, required_players_cnt: int, fast_mode: bool) -> Game:
+        game = Game(required_players_cnt, phase_delay=0 if fast_mode else self.phase_delay,
+                    journal=self.journal, metrics=self.metrics)
+        # The last step of the winning phase runs on the game's actor, so does the teardown.
+        game.on_won = functools.partial(self.finish_game, game, 'finished_games')
+        game.code = self.code_allocator.allocate()
+        self.add_game(game)
+        self.record(mafia_pb2.JournalRecord(game_id=game.id, created=mafia_pb2.JournalRecord.GameCreated(
+            code=game.code, required_players_cnt=required_players_cnt, fast_mode=fast_mode)))
+        return game
+
+    def form_game(self, required_players_cnt: int, fast_mode: bool, sessions: list[Session]) -> Game:
+        game = self.create_game(required_players_cnt, fast_mode)
+        for session in sessions:
+            game.add_player(session.player.id)
+            self.join(session, game)
+
+        service_logger.info("matched game=%s code=%s players=%s", game.id, game.code, len(sessions))
+        return game
+
+    def add_player(self, player: mafia_pb2.Player, token: str):
+        session = Session(token, player)
+        self.token_to_session[token] = session
+        self.player_id_to_player[player.id] = player
+        self.player_id_to_session[player.id] = session
+        self.set_idle(token)
+
+    def restore(self, record: mafia_pb2.JournalRecord):
+        match record.WhichOneof('event'):
+            case 'connected':
+                self.add_player(mafia_pb2.Player(name=record.name, id=record.player_id), record.connected.token)
+                EService.player_next_id = max(EService.player_next_id, record.player_id + 1)
+            case 'evicted':
+                self.evict(self.player_id_to_session[record.player_id].token)
+            case 'created':
+                game = Game(record.created.required_players_cnt,
+                            phase_delay=0 if record.created.fast_mode else self.phase_delay, id=record.game_id)
+                game.code = record.created.code
+                self.code_allocator.reserve(game.code)
+                self.add_game(game)
+            case 'finished':
+                self.remove_game(self.game_id_to_game[record.game_id])
+            case 'joined':
+                game = self.game_id_to_game[record.game_id]
+                game.restore(record)
+                self.join(self.player_id_to_session[record.player_id], game)
+            case _:
+                self.game_id_to_game[record.game_id].restore(record)
+
+    def recover(self, records: typing.Iterable[mafia_pb2.JournalRecord]):
+        started = time.perf_counter()
+        journal, self.journal = self.journal, None
+        records_cnt = 0
+        for record in records:
+            self.restore(record)
+            records_cnt += 1
+        self.journal = journal
+        for game in list(self.game_id_to_game.values()):
+            game.journal = journal
+            game.metrics = self.metrics
+            game.on_won = functools.partial(self.finish_game, game, 'finished_games')
+            if game.phase and game.get_winner() is not None:
+                # Won right before the restart, the teardown didn't make it to the journal.
+                self.finish_game(game, 'finished_games')
+            elif game.phase and not game.finished:
+                # Deadlines aren't journaled, a restored phase gets a whole one again.
+                self.game_id_to_actor[game.id].set_deadline(game.phase)
+        service_logger.info("recovered records=%s seconds=%.2f stats=%s", records_cnt, time.perf_counter() - started,
+                            self.get_stats())
+
+    def get_records(self) -> list[mafia_pb2.JournalRecord]:
+        records = [mafia_pb2.JournalRecord(player_id=session.player.id, name=session.player.name,
+                                           connected=mafia_pb2.ConnectResponse(token=session.token))
+                   for session in self.token_to_session.values()]
+        for game in self.game_id_to_game.values():
+            records.append(mafia_pb2.JournalRecord(game_id=game.id, created=mafia_pb2.JournalRecord.GameCreated(
+                code=game.code, required_players_cnt=game.required_players_cnt,
+                fast_mode=game.scheduler.delay == 0)))
+            records.extend(game.get_records())
+        return records
+
+    async def sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+            service_logger.info("swept stats=%s", self.get_stats())
 
     async def Connect(self, request: mafia_pb2.ConnectRequest, context) -> mafia_pb2.ConnectResponse:
         player = mafia_pb2.Player(name=request.name, id=EService.player_next_id)
         EService.player_next_id += 1
 
-        token = str(uuid.uuid4())
-        self.token_to_player[token] = player
-        self.player_id_to_player[player.id] = player
+        # The shard in the token routes the player's calls to this worker.
+        token = f'{self.shard}.{uuid.uuid4()}' if self.shards_cnt > 1 else str(uuid.uuid4())
+        self.add_player(player, token)
+        self.record(mafia_pb2.JournalRecord(player_id=player.id, name=player.name,
+                                            connected=mafia_pb2.ConnectResponse(token=token)))
 
-        logging.info(f"{player.name}({player.id}) ~ {token}")
-        return mafia_pb2.ConnectResponse(token=token)
+        service_logger.info("connected player=%s name=%s token=%s", player.id, player.name, token)
+        return mafia_pb2.ConnectResponse(token=token, port=self.peers.get_port(self.shard) if self.peers else 0)
 
     async def CreateGame(self, request: mafia_pb2.CreateGameRequest, context) -> mafia_pb2.CreateGameResponse:
-        if request.token not in self.token_to_player:
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(f"Token {request.token} is not registered")
+        session = self.find_session(request.token, context, 'CreateGame')
+        if session is None:
             return mafia_pb2.CreateGameResponse()
 
-        player = self.token_to_player[request.token]
-
-        game = Game(request.required_players_cnt)
-
-        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
-        self.code_to_game[code] = game
-        self.game_id_to_game[game.id] = game
-
+        player = session.player
+        if self.matchmaker.is_queued(session.token):
+            self.reject(context, 'CreateGame', grpc.StatusCode.FAILED_PRECONDITION,
+                        f"Player {player.name}({player.id}) is queued for a quick match")
+            return mafia_pb2.CreateGameResponse()
+        if not self.validate_players_cnt(request.required_players_cnt, context, 'CreateGame'):
+            return mafia_pb2.CreateGameResponse()
+        game = self.create_game(request.required_players_cnt, request.fast_mode)
+        # Nobody else knows the game yet, its actor has nothing to order.
         game.add_player(player.id)
-        self.player_id_to_game_id[player.id] = game.id
+        self.join(session, game)
 
-        logging.info(f"{player.name}({player.id}) !{code}({game.id})")
-        return mafia_pb2.CreateGameResponse(code=code)
+        service_logger.info("created game=%s code=%s player=%s", game.id, game.code, player.id)
+        return mafia_pb2.CreateGameResponse(code=game.code)
 
     async def JoinGame(self, request: mafia_pb2.JoinGameRequest, context) -> mafia_pb2.JoinGameResponse:
-        if request.token not in self.token_to_player:
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(f"Player {request.token} not registered")
+        session = self.find_session(request.token, context, 'JoinGame')
+        if session is None:
             return mafia_pb2.JoinGameResponse()
 
-        player = self.token_to_player[request.token]
+        player = session.player
+        if self.matchmaker.is_queued(session.token):
+            self.reject(context, 'JoinGame', grpc.StatusCode.FAILED_PRECONDITION,
+                        f"Player {player.name}({player.id}) is queued for a quick match")
+            return mafia_pb2.JoinGameResponse()
+        shard = code_shard(request.code, self.shards_cnt)
+        if self.peers is not None and shard != self.shard:
+            return await self.move(session, shard, 'JoinGame', request, context, mafia_pb2.JoinGameResponse())
 
         if request.code not in self.code_to_game:
-            context.set_code(grpc.StatusCode.NOT_FOUND)
-            context.set_details(f"Game {request.code} not found")
+            self.reject(context, 'JoinGame', grpc.StatusCode.NOT_FOUND, f"Game {request.code} not found")
             return mafia_pb2.JoinGameResponse()
 
         game = self.code_to_game[request.code]
 
-        game.add_player(player.id)
-        self.player_id_to_game_id[player.id] = game.id
+        try:
+            await self.game_id_to_actor[game.id].call(self.seat_player, session, game)
+        except ActorStopped:
+            # Torn down while the call waited, the game is finished.
+            pass
+        if game.finished:
+            self.reject(context, 'JoinGame', grpc.StatusCode.ABORTED, f"Game {game.id} was abandoned")
+            return mafia_pb2.JoinGameResponse()
 
-        logging.info(f"{player.name}({player.id}) +{request.code}({game.id})")
+        service_logger.info("joined game=%s code=%s player=%s", game.id, request.code, player.id)
         return mafia_pb2.JoinGameResponse()
 
+    async def QuickMatch(self, request: mafia_pb2.QuickMatchRequest, context) -> mafia_pb2.QuickMatchResponse:
+        session = self.find_session(request.token, context, 'QuickMatch')
+        if session is None:
+            return mafia_pb2.QuickMatchResponse()
+
+        player = session.player
+        if not self.validate_players_cnt(request.required_players_cnt, context, 'QuickMatch'):
+            return mafia_pb2.QuickMatchResponse()
+        if session.game is not None or self.matchmaker.is_queued(session.token):
+            self.reject(context, 'QuickMatch', grpc.StatusCode.FAILED_PRECONDITION,
+                        f"Player {player.name}({player.id}) is already playing or queued")
+            return mafia_pb2.QuickMatchResponse()
+        # Everybody who wants the same game size waits in the same worker.
+        shard = request.required_players_cnt % self.shards_cnt
+        if self.peers is not None and shard != self.shard:
+            return await self.move(session, shard, 'QuickMatch', request, context, mafia_pb2.QuickMatchResponse())
+
+        # A queued token is not idle, the sweep doesn't evict it while it waits.
+        self.token_to_idle_since.pop(session.token, None)
+        future = self.matchmaker.enqueue(session.token, session, request.required_players_cnt, request.fast_mode)
+        service_logger.info("queued player=%s required_players_cnt=%s", player.id, request.required_players_cnt)
+        try:
+            game = await future
+        except asyncio.CancelledError:
+            # The caller went away before a game was formed.
+            if self.matchmaker.is_queued(session.token):
+                self.matchmaker.leave(session.token)
+                self.set_idle(session.token)
+            raise
+        except Exception as e:
+            # The game of the matched players couldn't be formed, they are out of the queue.
+            self.set_idle(session.token)
+            service_logger.error("unmatched player=%s error=%s", player.id, e)
+            self.reject(context, 'QuickMatch', grpc.StatusCode.RESOURCE_EXHAUSTED, f"Game wasn't formed: {e}")
+            return mafia_pb2.QuickMatchResponse()
+        return mafia_pb2.QuickMatchResponse(code=game.code)
+
     @check(mafia_pb2.ListPlayersResponse())
-    async def ListPlayers(self, request: mafia_pb2.ListPlayersRequest, context, player, game) -> mafia_pb2.ListPlayersResponse:
-        return mafia_pb2.ListPlayersResponse(required_players_cnt=game.required_players_cnt,
-                                             players=[self.player_id_to_player[player_id] for player_id in
-                                                      game.player_id_to_player_info.keys()])
+    async def ListPlayers(self, request: mafia_pb2.ListPlayersRequest, context,
+                          session: Session) -> mafia_pb2.ListPlayersResponse:
+        return session.broadcaster.list_players()
+
+    async def WatchLobby(self, request: mafia_pb2.WatchLobbyRequest, context) -> typing.Iterable[mafia_pb2.WatchLobbyResponse]:
+        session = self.find_game(request.token, context, 'WatchLobby')
+        if session is None:
+            yield mafia_pb2.WatchLobbyResponse()
+            return
+
+        game = session.game
+
+        watcher: asyncio.Queue[int | None] = asyncio.Queue()
+        game.lobby_watchers.append(watcher)
+        try:
+            joined_ids = list(game.get_players_ids())
+            joined_cnt = 0
+            while True:
+                joined_cnt += len(joined_ids)
+                yield mafia_pb2.WatchLobbyResponse(required_players_cnt=game.required_players_cnt,
+                                                   joined=[self.player_id_to_player[player_id] for player_id in
+                                                           joined_ids])
+                if joined_cnt >= game.required_players_cnt:
+                    return
+
+                joined_ids = [await watcher.get()]
+                while not watcher.empty():
+                    joined_ids.append(watcher.get_nowait())
+                if None in joined_ids:
+                    self.reject(context, 'WatchLobby', grpc.StatusCode.ABORTED, f"Game {game.id} was abandoned")
+                    return
+        finally:
+            game.lobby_watchers.remove(watcher)
 
     @check(mafia_pb2.GetRoleResponse())
-    async def GetRole(self, request: mafia_pb2.GetRoleRequest, context, player, game) -> mafia_pb2.GetRoleResponse:
-        role = game.player_id_to_player_info[player.id].role
+    async def GetRole(self, request: mafia_pb2.GetRoleRequest, context, session: Session) -> mafia_pb2.GetRoleResponse:
+        role = session.game.roles[session.seat]
 
-        logging.info(f"{game.id}: {player.name}({player.id}) is {role}")
+        service_logger.info("role game=%s player=%s role=%s", session.game.id, session.player.id, role)
         return mafia_pb2.GetRoleResponse(role=role)
 
     @check(mafia_pb2.VoteDayResponse())
-    async def VoteDay(self, request: mafia_pb2.VoteDayRequest, context, player, game) -> mafia_pb2.VoteDayResponse:
-        game.add_day_vote(player.id, request.player_id)
+    async def VoteDay(self, request: mafia_pb2.VoteDayRequest, context, session: Session) -> mafia_pb2.VoteDayResponse:
+        player, game = session.player, session.game
+        await session.actor.call(game.add_day_vote, player.id, request.player_id)
 
-        logging.info(f"{game.id}: {player.name}({player.id}) V {request.player_id}")
+        service_logger.info("vote_day game=%s player=%s candidate=%s", game.id, player.id, request.player_id)
         return mafia_pb2.VoteDayResponse()
 
     @check(mafia_pb2.VoteNightResponse())
-    async def VoteNight(self, request: mafia_pb2.VoteNightRequest, context, player, game) -> mafia_pb2.VoteNightResponse:
-        game.add_night_vote(player.id, request.player_id)
+    async def VoteNight(self, request: mafia_pb2.VoteNightRequest, context, session: Session) -> mafia_pb2.VoteNightResponse:
+        player, game = session.player, session.game
+        await session.actor.call(game.add_night_vote, player.id, request.player_id)
 
-        logging.info(f"{game.id}: {player.name}({player.id}) X {request.player_id}")
+        service_logger.info("vote_night game=%s player=%s candidate=%s", game.id, player.id, request.player_id)
         return mafia_pb2.VoteNightResponse()
 
     @check(mafia_pb2.CheckResponse())
-    async def Check(self, request: mafia_pb2.CheckRequest, context, player, game) -> mafia_pb2.CheckResponse:
-        game.check(player.id, request.player_id)
+    async def Check(self, request: mafia_pb2.CheckRequest, context, session: Session) -> mafia_pb2.CheckResponse:
+        player, game = session.player, session.game
+        response = await session.actor.call(self.check_player, session, request.player_id)
 
-        logging.info(f"{game.id}: {player.name}({player.id}) ? {request.player_id}")
-        return mafia_pb2.CheckResponse(mafias=[self.player_id_to_player[player_id] for player_id in game.checked_ids])
+        service_logger.info("check game=%s player=%s candidate=%s", game.id, player.id, request.player_id)
+        return response
 
     @check(mafia_pb2.PublishResponse())
-    async def Publish(self, request: mafia_pb2.PublishRequest, context, player, game) -> mafia_pb2.PublishResponse:
-        game.publish(player.id, request.decision)
+    async def Publish(self, request: mafia_pb2.PublishRequest, context, session: Session) -> mafia_pb2.PublishResponse:
+        player, game = session.player, session.game
+        await session.actor.call(game.publish, player.id, request.decision)
 
-        logging.info(f"{game.id}: {player.name}({player.id}) P {request.decision}")
+        service_logger.info("publish game=%s player=%s decision=%s", game.id, player.id, request.decision)
         return mafia_pb2.PublishResponse()
 
-    async def GameProcess(self, request: mafia_pb2.GameProcessRequest, context) -> typing.Iterable[mafia_pb2.GameProcessResponse]:
-        if request.token not in self.token_to_player:
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(f"Player {request.token} not registered")
-            yield mafia_pb2.GameProcessResponse()
+    ACTION_TO_HANDLER = dict(vote_day='VoteDay', vote_night='VoteNight', check='Check', publish='Publish')
+
+    async def SubmitActions(self, request: mafia_pb2.SubmitActionsRequest, context) -> mafia_pb2.SubmitActionsResponse:
+        results = [mafia_pb2.ActionResult() for _ in request.actions]
+
+        # Every token is looked up once, then the actions are applied game by game.
+        token_to_session: dict[str, Session] = dict()
+        game_id_to_actions: dict[int, list[tuple[int, str, typing.Any]]] = collections.defaultdict(list)
+        for i, action in enumerate(request.actions):
+            kind = action.WhichOneof('action')
+            if kind is None:
+                results[i].code = grpc.StatusCode.INVALID_ARGUMENT.value[0]
+                results[i].details = "Empty action"
+                continue
+
+            action_request = getattr(action, kind)
+            if action_request.token not in token_to_session:
+                action_context = ActionContext()
+                session = self.find_game(action_request.token, action_context, 'SubmitActions')
+                if session is None:
+                    results[i].CopyFrom(action_context.to_result())
+                    continue
+                token_to_session[action_request.token] = session
+            game_id_to_actions[token_to_session[action_request.token].game.id].append((i, kind, action_request))
+
+        for actions in game_id_to_actions.values():
+            for i, kind, action_request in actions:
+                results[i].CopyFrom(await self.apply_action(kind, action_request, token_to_session[action_request.token]))
+
+        service_logger.info("submitted actions=%s games=%s", len(request.actions), len(game_id_to_actions))
+        return mafia_pb2.SubmitActionsResponse(results=results)
+
+    async def apply_action(self, kind: str, action_request, session: Session) -> mafia_pb2.ActionResult:
+        action_context = ActionContext()
+        method = self.ACTION_TO_HANDLER[kind]
+        # The session was looked up once for the whole stream or batch, its game may be torn down since.
+        if session.game is None:
+            self.reject_without_game(session, action_context, method)
+            return action_context.to_result()
+
+        try:
+            response = await getattr(self, method).handler(self, action_request, action_context, session)
+        except RuleError as e:
+            # What a unary call reports for it.
+            action_context.set_code(grpc.StatusCode.UNKNOWN)
+            action_context.set_details(str(e))
+            response = None
+        except ActorStopped:
+            self.reject_without_game(session, action_context, method)
+            response = None
+
+        result = action_context.to_result()
+        if kind == 'check' and response is not None:
+            result.check.CopyFrom(response)
+        return result
+
+    async def Play(self, request_iterator, context) -> typing.AsyncIterator[mafia_pb2.PlayResponse]:
+        start = await anext(request_iterator, None)
+        if start is None or start.WhichOneof('request') != 'start':
+            self.reject(context, 'Play', grpc.StatusCode.INVALID_ARGUMENT, "Play must start with a GameProcessRequest")
             return
 
-        player = self.token_to_player[request.token]
-
-        if player.id not in self.player_id_to_game_id:
-            context.set_code(grpc.StatusCode.NOT_FOUND)
-            context.set_details(f"Player {player.name}({player.id}) isn't playing any game")
-            yield mafia_pb2.GameProcessResponse()
+        session = self.find_game(start.start.token, context, 'Play')
+        if session is None:
             return
 
-        game_id = self.player_id_to_game_id[player.id]
+        # Phase events and action results are both written by tasks, so neither waits for the other or for the client.
+        responses = self.open_queue('Play')
+        # Cleared while an action is in the game's actor.
+        idle = asyncio.Event()
+        idle.set()
+
+        async def send_events():
+            try:
+                async for event in self.play_phases(session, context, 'Play', start.start.last_seq):
+                    responses.put(mafia_pb2.PlayResponse(event=event), coalescing=True)
+                # The action that ended the game may be answered after the end, the stream waits for it.
+                await idle.wait()
+            finally:
+                responses.close()
+
+        async def apply_actions():
+            async for request in request_iterator:
+                kind = request.action.WhichOneof('action')
+                if kind is None:
+                    result = mafia_pb2.ActionResult(code=grpc.StatusCode.INVALID_ARGUMENT.value[0],
+                                                    details="Empty action")
+                else:
+                    idle.clear()
+                    result = await self.apply_action(kind, getattr(request.action, kind), session)
+                    idle.set()
+                responses.put(mafia_pb2.PlayResponse(result=result))
+                if responses.overflowed:
+                    # Nobody gets the results anymore, the client resends its actions after resuming.
+                    return
+
+        tasks = [asyncio.create_task(send_events()), asyncio.create_task(apply_actions())]
+        try:
+            while (response := await responses.get()) is not None:
+                yield response
+            if responses.overflowed:
+                self.end_overflowed(responses, session, context)
+        finally:
+            await self.stop_tasks(tasks, 'Play', session, context)
 
-        if game_id not in self.game_id_to_game:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Game {game_id} is broken")
+    async def GameProcess(self, request: mafia_pb2.GameProcessRequest, context) -> typing.Iterable[mafia_pb2.GameProcessResponse]:
+        session = self.find_game(request.token, context, 'GameProcess')
+        if session is None:
             yield mafia_pb2.GameProcessResponse()
             return
 
-        game = self.game_id_to_game[game_id]
-
-        logging.info(f'{game.id}: {player.name}({player.id}) process')
-
-        game.start()
-        await game.event_started.wait()
+        # The phases run ahead of the client, one that can't keep up loses the stream and not the server's memory.
+        responses = self.open_queue('GameProcess')
+
+        async def send_events():
+            try:
+                async for event in self.play_phases(session, context, 'GameProcess', request.last_seq):
+                    responses.put(event, coalescing=True)
+            finally:
+                responses.close()
+
+        tasks = [asyncio.create_task(send_events())]
+        try:
+            while (response := await responses.get()) is not None:
+                yield response
+            if responses.overflowed:
+                self.end_overflowed(responses, session, context)
+        finally:
+            await self.stop_tasks(tasks, 'GameProcess', session, context)
+
+    async def stop_tasks(self, tasks: list[asyncio.Task], method: str, session: Session, context):
+        # Nothing else awaits the tasks of a stream, one that failed ends the stream with its error.
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                stream_logger.error("failed method=%s player=%s", method, session.player.id, exc_info=result)
+                context.set_code(grpc.StatusCode.INTERNAL)
+                context.set_details(f"{method} failed: {result}")
 
-        while True:
-            game.start_night()
-
-            player_info = game.player_id_to_player_info[player.id]
-
-            yield mafia_pb2.GameProcessResponse(
-                night=mafia_pb2.GameProcessResponse.StartNight(
-                    is_alive=player_info.is_alive,
-                    role=player_info.role,
-                    players=[self.player_id_to_player[player_id] for player_id in
-                             game.get_alive_players_ids() - {player.id}],
-                    mafias=[self.player_id_to_player[player_id] for player_id in
-                            game.get_alive_mafias_ids() - {
-                                player.id}] if player_info.is_mafia() or not player_info.is_alive else []
-                )
-            )
+    def open_queue(self, method: str) -> SendQueue:
+        return SendQueue(method, self.stream_queue_size, self.stream_policy, self.metrics)
 
-            logging.info(f'{game.id}: {player.name}({player.id}) night started...')
-            await game.event_killed.wait()
-            await game.event_checked.wait()
-            logging.info(f'{game.id}: {player.name}({player.id}) night ended...')
-            await asyncio.sleep(5)
+    def end_overflowed(self, queue: SendQueue, session: Session, context):
+        stream_logger.warning("overflowed method=%s player=%s size=%s policy=%s", queue.method, session.player.id,
+                              queue.size, queue.policy)
+        self.reject(context, queue.method, grpc.StatusCode.RESOURCE_EXHAUSTED,
+                    f"The client fell {queue.size} messages behind, resume the stream with last_seq")
 
-            winner = game.get_winner()
-            if winner is not None:
-                yield mafia_pb2.GameProcessResponse(
-                    end=mafia_pb2.GameProcessResponse.EndGame(
-                        winner=winner
-                    )
-                )
+    async def play_phases(self, session: Session, context, method: str,
+                          last_seq: int = 0) -> typing.AsyncIterator[mafia_pb2.GameProcessResponse]:
+        # The game, broadcaster and actor are held for the whole stream, a teardown clears them from the session.
+        player, game, broadcaster, actor = session.player, session.game, session.broadcaster, session.actor
 
-            game.start_day()
+        stream_logger.info("opened game=%s player=%s last_seq=%s", game.id, player.id, last_seq)
 
-            detective_id = game.get_alive_detective_id()
-            yield mafia_pb2.GameProcessResponse(
-                day=mafia_pb2.GameProcessResponse.StartDay(
-                    is_alive=game.player_id_to_player_info[player.id].is_alive,
-                    players=[self.player_id_to_player[player_id] for player_id in
-                             game.get_alive_players_ids() - {player.id}],
-                    mafias=[self.player_id_to_player[player_id] for player_id in
-                            game.get_alive_mafias_ids()] if game.checked_decision and detective_id else [],
-                    detective=self.player_id_to_player[detective_id] if detective_id else None
-                )
-            )
-
-            logging.info(f'{game.id}: {player.name}({player.id}) day started...')
-            await game.event_killed.wait()
-            logging.info(f'{game.id}: {player.name}({player.id}) day ended...')
-            await asyncio.sleep(5)
+        try:
+            await actor.call(game.start, player.id)
+        except ActorStopped:
+            # Torn down already, the stream sees the game finished.
+            pass
+        await game.event_started.wait()
+        if game.finished:
+            self.reject(context, method, grpc.StatusCode.ABORTED, f"Game {game.id} was abandoned")
+            return
 
+        # A stream opened after a restart picks the game up at its current phase,
+        # a resumed one first gets the phases it missed.
+        phase = max(game.phase, 1)
+        last_seq = last_seq or phase - 1
+        while True:
+            try:
+                await actor.call(actor.start_phase, phase)
+            except ActorStopped:
+                # Torn down already, the barrier is open and the stream ends with what the game has.
+                pass
+            for event in broadcaster.get_events(last_seq):
+                yield broadcaster.render(event, player.id)
+                last_seq = event.seq
+
+            if phase % 2:
+                stream_logger.debug("night_started game=%s player=%s phase=%s", game.id, player.id, phase)
+                await game.barrier.wait(phase)
+                stream_logger.debug("night_ended game=%s player=%s phase=%s", game.id, player.id, phase)
+            else:
+                stream_logger.debug("day_started game=%s player=%s phase=%s", game.id, player.id, phase)
+                await game.barrier.wait(phase)
+                stream_logger.debug("day_ended game=%s player=%s phase=%s", game.id, player.id, phase)
+
+            # A won game is torn down by its actor as the phase ends, the stream only tells the winner.
             winner = game.get_winner()
             if winner is not None:
                 yield mafia_pb2.GameProcessResponse(
                     end=mafia_pb2.GameProcessResponse.EndGame(
                         winner=winner
-                    )
+                    ),
+                    seq=phase + 1
                 )
-
-
-async def serve(host, port):
-    server = grpc.aio.server()
-    mafia_pb2_grpc.add_MafiaServicer_to_server(EService(), server)
+                return
+            if game.finished:
+                self.reject(context, method, grpc.StatusCode.ABORTED, f"Game {game.id} was abandoned")
+                return
+            phase += 1
+
+
+async def serve(host, port, shard=0, shards_cnt=1, journal_dir=None, snapshot_interval=300, metrics_port=None,
+                peers=None, **options):
+    journal = None
+    if journal_dir:
+        journal = Journal(os.path.join(journal_dir, f'shard{shard}') if shards_cnt > 1 else journal_dir)
+    metrics = Metrics() if metrics_port else None
+    service = EService(shard=shard, shards_cnt=shards_cnt, journal=journal, metrics=metrics,
+                       peers=Peers(peers) if peers else None, **options)
+    tasks = []
+    interceptors = []
+    if metrics is not None:
+        await serve_metrics(metrics, host, int(metrics_port) + shard)
+        interceptors.append(MetricsInterceptor(metrics))
+    if journal is not None:
+        service.recover(journal.load())
+        tasks.append(asyncio.create_task(journal.flush_forever()))
+        tasks.append(asyncio.create_task(journal.compact_forever(service.get_records, snapshot_interval)))
+
+    server = grpc.aio.server(interceptors=interceptors)
+    mafia_pb2_grpc.add_MafiaServicer_to_server(service, server)
     server.add_insecure_port(f'{host}:{port}')
     await server.start()
-    await server.wait_for_termination()
+    tasks.append(asyncio.create_task(service.sweep_forever()))
+    tasks.append(asyncio.create_task(service.timer_wheel.run_forever()))
+    try:
+        await server.wait_for_termination()
+    finally:
+        for task in tasks:
+            task.cancel()
+        if journal is not None:
+            await journal.flush()
+            journal.close()
+
+
+def run_worker(host, port, shard, shards_cnt, **options):
+    setup_logging(os.environ.get("LOG_LEVEL", "INFO"))
+    asyncio.run(serve(host, port, shard, shards_cnt, **options))
 
 
 if __name__ == '__main__':
-    logging.basicConfig(level=logging.INFO,
-                        format="[%(asctime)s] [%(levelname)s] [%(name)s] [%(funcName)s():%(lineno)s] %(message)s")
+    setup_logging(os.environ.get("LOG_LEVEL", "INFO"))
     HOST = os.environ.get("HOST", "0.0.0.0")
     PORT = os.environ.get("PORT", 9000)
-    asyncio.run(serve(HOST, PORT))
+    WORKERS = int(os.environ.get("WORKERS", 1))
+    OPTIONS = dict(
+        phase_delay=float(os.environ.get("PHASE_DELAY", 5)),
+        game_ttl=float(os.environ.get("GAME_TTL", 3600)),
+        token_ttl=float(os.environ.get("TOKEN_TTL", 3600)),
+        sweep_interval=float(os.environ.get("SWEEP_INTERVAL", 60)),
+        journal_dir=os.environ.get("JOURNAL_DIR"),
+        snapshot_interval=float(os.environ.get("SNAPSHOT_INTERVAL", 300)),
+        metrics_port=os.environ.get("METRICS_PORT"),
+        vote_timeout=float(os.environ.get("VOTE_TIMEOUT", 0)),
+        vote_policy=os.environ.get("VOTE_POLICY", "abstain"),
+        stream_queue_size=int(os.environ.get("STREAM_QUEUE_SIZE", 32)),
+        stream_policy=os.environ.get("STREAM_POLICY", "coalesce"),
+    )
+    if WORKERS > 1:
+        asyncio.run(serve_sharded(HOST, PORT, WORKERS, functools.partial(run_worker, **OPTIONS)))
+    else:
+        asyncio.run(serve(HOST, PORT, **OPTIONS))
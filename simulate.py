@@ -0,0 +1,116 @@
+import argparse
+import collections
+import multiprocessing
+import random
+import time
+
+import mafia_pb2
+from rules import Rules
+
+
+class Stats:
+    def __init__(self):
+        self.winners: collections.Counter[int] = collections.Counter()
+        self.phases_cnt: collections.Counter[int] = collections.Counter()
+        # Games where the detective published the finds at least once.
+        self.published_cnt = 0
+        self.games_cnt = 0
+        self.elapsed = 0.0
+
+    def merge(self, other: 'Stats'):
+        self.winners.update(other.winners)
+        self.phases_cnt.update(other.phases_cnt)
+        self.published_cnt += other.published_cnt
+        self.games_cnt += other.games_cnt
+        self.elapsed = max(self.elapsed, other.elapsed)
+
+
+def choose_other(rnd: random.Random, players_ids: list[int], player_id: int) -> int:
+    # What the Auto bot picks from a phase event, which lists everybody alive but itself.
+    while (candidate_id := rnd.choice(players_ids)) == player_id:
+        pass
+    return candidate_id
+
+
+def simulate_game(players_cnt: int, seed: int) -> tuple[mafia_pb2.Role, int, bool]:
+    # Plays one game of Auto bots straight on the rules, the seed fixes both the roles and every choice.
+    rules = Rules(players_cnt, seed)
+    # Seeded apart from the rules, with the same seed the bots' first picks would follow the dealt roles.
+    rnd = random.Random(f'bots{seed}')
+    for player_id in range(1, players_cnt + 1):
+        rules.add_player(player_id)
+    rules.assign_roles()
+
+    phase = 1
+    published = False
+    while True:
+        alive_players_ids = sorted(rules.get_alive_players_ids())
+        if phase % 2:
+            detective_id = rules.get_alive_detective_id()
+            if detective_id is not None:
+                rules.check(detective_id, choose_other(rnd, alive_players_ids, detective_id))
+                rules.publish(detective_id, bool(rules.checked_ids) and rnd.random() < 0.5)
+                published |= rules.checked_decision
+            for player_id in sorted(rules.get_alive_mafias_ids()):
+                rules.add_night_vote(player_id, choose_other(rnd, alive_players_ids, player_id))
+        else:
+            for player_id in alive_players_ids:
+                rules.add_day_vote(player_id, choose_other(rnd, alive_players_ids, player_id))
+
+        winner = rules.get_winner()
+        if winner is not None:
+            return winner, phase, published
+        phase += 1
+
+
+def simulate_games(games_cnt: int, players_cnt: int = 4, first_seed: int = 0) -> Stats:
+    stats = Stats()
+    started = time.perf_counter()
+    for seed in range(first_seed, first_seed + games_cnt):
+        winner, phases_cnt, published = simulate_game(players_cnt, seed)
+        stats.winners[winner] += 1
+        stats.phases_cnt[phases_cnt] += 1
+        stats.published_cnt += published
+    stats.games_cnt = games_cnt
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def run_process(args: tuple) -> Stats:
+    return simulate_games(*args)
+
+
+def run_processes(games_cnt: int, players_cnt: int, processes_cnt: int, first_seed: int = 0) -> Stats:
+    # Every process plays its own range of seeds, so the outcome doesn't depend on the number of processes.
+    stats = Stats()
+    chunk = (games_cnt + processes_cnt - 1) // processes_cnt
+    chunks = [(min(chunk, games_cnt - start), players_cnt, first_seed + start) for start in range(0, games_cnt, chunk)]
+    started = time.perf_counter()
+    with multiprocessing.get_context('spawn').Pool(processes_cnt) as pool:
+        for process_stats in pool.map(run_process, chunks):
+            stats.merge(process_stats)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def report(stats: Stats):
+    print(f"Games: {stats.games_cnt} in {stats.elapsed:.2f}s, {stats.games_cnt / stats.elapsed:.0f} games/s")
+    print("Winners:", *(f"{mafia_pb2.Role.Name(role)[5:]}={cnt / stats.games_cnt:.1%}"
+                        for role, cnt in sorted(stats.winners.items())))
+    phases_cnt = sum(phases_cnt * cnt for phases_cnt, cnt in stats.phases_cnt.items())
+    print(f"Phases per game: mean {phases_cnt / stats.games_cnt:.2f}, max {max(stats.phases_cnt)}")
+    print(f"Detective published in {stats.published_cnt / stats.games_cnt:.1%} of games")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays bot games straight on the rules, without a server.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the next ones get the next seeds")
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        report(run_processes(args.games, args.players, args.processes, args.seed))
+    else:
+        report(simulate_games(args.games, args.players, args.seed))
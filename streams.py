@@ -0,0 +1,66 @@
+import asyncio
+import collections
+import typing
+
+from metrics import Metrics
+
+STREAM_QUEUE_SIZE = 32
+POLICIES = ('coalesce', 'drop')
+
+
+class SendQueue:
+    # The messages of one server stream, put by the game as they come and taken by the stream as fast as its client
+    # reads. The queue is bounded, so a slow client holds at most size messages: when it is full, 'coalesce' drops the
+    # queued messages a newer one supersedes, phase events only need the latest one, and overflows the queue if that
+    # doesn't help, while 'drop' overflows right away. An overflowed queue drops its messages, the stream ends as soon
+    # as the client takes the message being sent, and the client resumes it with last_seq.
+    def __init__(self, method: str, size: int = STREAM_QUEUE_SIZE, policy: str = 'coalesce',
+                 metrics: Metrics | None = None):
+        self.method = method
+        self.size = size
+        self.policy = policy
+        self.metrics = metrics
+        # Every message with whether a newer coalescing message supersedes it.
+        self.messages: collections.deque[tuple[typing.Any, bool]] = collections.deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.overflowed = False
+        # The most messages the stream had queued at once, observed when it closes.
+        self.peak = 0
+
+    def put(self, message, coalescing: bool = False):
+        if self.closed:
+            return
+        if len(self.messages) >= self.size:
+            if self.policy == 'coalesce' and coalescing:
+                self.messages = collections.deque(queued for queued in self.messages if not queued[1])
+                if self.metrics is not None:
+                    self.metrics.stream_overflows.inc(self.method, 'coalesced')
+            if len(self.messages) >= self.size:
+                if self.metrics is not None:
+                    self.metrics.stream_overflows.inc(self.method, 'dropped')
+                self.overflowed = True
+                self.messages.clear()
+                self.close()
+                return
+        self.messages.append((message, coalescing))
+        self.peak = max(self.peak, len(self.messages))
+        self.ready.set()
+
+    def close(self):
+        # The stream ends once the queued messages are taken.
+        if self.closed:
+            return
+        self.closed = True
+        self.ready.set()
+        if self.metrics is not None:
+            self.metrics.stream_queue_peak.observe(self.peak, self.method)
+
+    async def get(self) -> typing.Any | None:
+        # None once the queue is closed and empty.
+        while not self.messages:
+            if self.closed:
+                return None
+            self.ready.clear()
+            await self.ready.wait()
+        return self.messages.popleft()[0]
@@ -0,0 +1,142 @@
+import asyncio
+
+import grpc
+
+import mafia_pb2
+from benchmarks.soak import Context, LocalStub
+from metrics import Metrics
+from server import EService
+
+
+async def make_day(service: EService) -> dict[mafia_pb2.Role, list[str]]:
+    # A fast 4-player game at its first day: the mafia killed a villager, the detective published nothing.
+    # Returns the tokens of the players alive by role.
+    stub = LocalStub(service)
+    tokens = [(await stub.Connect(mafia_pb2.ConnectRequest(name=f'player{i}'))).token for i in range(4)]
+    code = (await stub.CreateGame(mafia_pb2.CreateGameRequest(token=tokens[0], required_players_cnt=4,
+                                                              fast_mode=True))).code
+    for token in tokens[1:]:
+        await stub.JoinGame(mafia_pb2.JoinGameRequest(token=token, code=code))
+
+    sessions = [service.token_to_session[token] for token in tokens]
+    game, actor = sessions[0].game, sessions[0].actor
+    role_to_tokens = {role: [session.token for session in sessions if game.roles[session.seat] == role]
+                      for role in (mafia_pb2.ROLE_MAFIA, mafia_pb2.ROLE_DETECTIVE, mafia_pb2.ROLE_VILLAGER)}
+
+    await actor.call(actor.start_phase, 1)
+    victim_id = service.token_to_session[role_to_tokens[mafia_pb2.ROLE_VILLAGER].pop()].player.id
+    await stub.VoteNight(mafia_pb2.VoteNightRequest(token=role_to_tokens[mafia_pb2.ROLE_MAFIA][0],
+                                                    player_id=victim_id))
+    await stub.Publish(mafia_pb2.PublishRequest(token=role_to_tokens[mafia_pb2.ROLE_DETECTIVE][0], decision=False))
+    await actor.call(actor.start_phase, 2)
+    return role_to_tokens
+
+
+def get_player_id(service: EService, token: str) -> int:
+    return service.token_to_session[token].player.id
+
+
+def test_check_answered_when_a_vote_behind_it_wins_the_game():
+    # The vote is in the mailbox right after the check, the actor finishes the game before the check's caller
+    # gets to build its response.
+    async def run():
+        service = EService(phase_delay=0)
+        role_to_tokens = await make_day(service)
+        mafia, = role_to_tokens[mafia_pb2.ROLE_MAFIA]
+        detective, = role_to_tokens[mafia_pb2.ROLE_DETECTIVE]
+        villager, = role_to_tokens[mafia_pb2.ROLE_VILLAGER]
+        mafia_id = get_player_id(service, mafia)
+
+        stub = LocalStub(service)
+        await stub.VoteDay(mafia_pb2.VoteDayRequest(token=mafia, player_id=get_player_id(service, villager)))
+        await stub.VoteDay(mafia_pb2.VoteDayRequest(token=villager, player_id=mafia_id))
+        check_context, vote_context = Context(), Context()
+        response, _ = await asyncio.gather(
+            service.Check(mafia_pb2.CheckRequest(token=detective, player_id=mafia_id), check_context),
+            service.VoteDay(mafia_pb2.VoteDayRequest(token=detective, player_id=mafia_id), vote_context))
+        return service, mafia_id, response, check_context, vote_context
+
+    service, mafia_id, response, check_context, vote_context = asyncio.run(run())
+    assert not hasattr(check_context, 'code') and not hasattr(vote_context, 'code')
+    assert [player.id for player in response.mafias] == [mafia_id]
+    assert service.get_stats()['live_games'] == 0
+    assert service.get_stats()['reclaimed_finished_games'] == 1
+
+
+def test_create_game_rejects_players_cnt_out_of_range():
+    async def run():
+        service = EService(phase_delay=0)
+        free_codes_cnt = service.code_allocator.get_free_cnt()
+        token = (await service.Connect(mafia_pb2.ConnectRequest(name='host'), Context())).token
+        contexts = []
+        for required_players_cnt in (-1, 0, 3, 2 ** 31 - 1):
+            contexts.append(Context())
+            await service.CreateGame(mafia_pb2.CreateGameRequest(token=token,
+                                                                 required_players_cnt=required_players_cnt),
+                                     contexts[-1])
+        return service, free_codes_cnt, contexts
+
+    service, free_codes_cnt, contexts = asyncio.run(run())
+    assert [context.code for context in contexts] == [grpc.StatusCode.INVALID_ARGUMENT] * 4
+    assert service.get_stats()['live_games'] == 0
+    assert service.code_allocator.get_free_cnt() == free_codes_cnt
+
+
+def test_submit_actions_after_the_game_is_won_in_the_batch():
+    # The third vote wins the first game, the check behind it finds no game. The other game's action and an
+    # unknown token are answered on their own.
+    async def run():
+        service = EService(phase_delay=0)
+        won, other = await make_day(service), await make_day(service)
+        mafia, = won[mafia_pb2.ROLE_MAFIA]
+        detective, = won[mafia_pb2.ROLE_DETECTIVE]
+        villager, = won[mafia_pb2.ROLE_VILLAGER]
+        mafia_id, villager_id = get_player_id(service, mafia), get_player_id(service, villager)
+        other_villager_id = get_player_id(service, other[mafia_pb2.ROLE_VILLAGER][0])
+
+        actions = [
+            mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(token=mafia, player_id=villager_id)),
+            mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(token=other[mafia_pb2.ROLE_MAFIA][0],
+                                                               player_id=other_villager_id)),
+            mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(token=villager, player_id=mafia_id)),
+            mafia_pb2.Action(vote_day=mafia_pb2.VoteDayRequest(token=detective, player_id=mafia_id)),
+            mafia_pb2.Action(check=mafia_pb2.CheckRequest(token=detective, player_id=mafia_id)),
+            mafia_pb2.Action(check=mafia_pb2.CheckRequest(token='unknown', player_id=mafia_id)),
+            mafia_pb2.Action(check=mafia_pb2.CheckRequest(token=other[mafia_pb2.ROLE_DETECTIVE][0],
+                                                          player_id=other_villager_id)),
+        ]
+        context = Context()
+        response = await service.SubmitActions(mafia_pb2.SubmitActionsRequest(actions=actions), context)
+        return service, response, context
+
+    service, response, context = asyncio.run(run())
+    assert not hasattr(context, 'code')
+    assert [result.code for result in response.results] == [
+        grpc.StatusCode.OK.value[0], grpc.StatusCode.OK.value[0], grpc.StatusCode.OK.value[0],
+        grpc.StatusCode.OK.value[0], grpc.StatusCode.NOT_FOUND.value[0], grpc.StatusCode.UNAUTHENTICATED.value[0],
+        grpc.StatusCode.OK.value[0]]
+    assert not response.results[6].check.mafias
+    assert service.get_stats()['live_games'] == 1
+
+
+def test_every_rejection_is_counted():
+    async def run():
+        metrics = Metrics()
+        service = EService(phase_delay=0, game_ttl=0, metrics=metrics)
+        stub = LocalStub(service)
+        host, guest = [(await stub.Connect(mafia_pb2.ConnectRequest(name=name))).token for name in ('host', 'guest')]
+        await service.JoinGame(mafia_pb2.JoinGameRequest(token=guest, code='NONE0'), Context())
+
+        code = (await stub.CreateGame(mafia_pb2.CreateGameRequest(token=host, required_players_cnt=4))).code
+        lobby = service.WatchLobby(mafia_pb2.WatchLobbyRequest(token=host), Context())
+        await anext(lobby)
+        waiting = asyncio.ensure_future(anext(lobby, None))
+        await asyncio.sleep(0.01)
+        # Abandoned with the host watching the lobby.
+        await service.sweep()
+        await waiting
+        return metrics.rpc_rejected.values
+
+    rejected = asyncio.run(run())
+    assert rejected[('JoinGame', 'NOT_FOUND')] == 1
+    assert rejected[('WatchLobby', 'ABORTED')] == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from codes import CODE_ALPHABET, CODE_LENGTH, CodeAllocator, code_shard
+
+
+def make_small_allocator(free_cnt: int, shard: int = 0, shards_cnt: int = 1) -> CodeAllocator:
+    # Only the first free_cnt codes of the shard, to use them all up.
+    allocator = CodeAllocator(shard, shards_cnt)
+    allocator.free_cnt = free_cnt
+    return allocator
+
+
+@pytest.mark.parametrize('shard, shards_cnt', [(0, 1), (0, 4), (3, 4), (6, 7)])
+def test_codes_are_unique_and_owned_by_their_shard(shard, shards_cnt):
+    allocator = CodeAllocator(shard, shards_cnt)
+    codes = [allocator.allocate() for _ in range(20000)]
+    assert len(set(codes)) == len(codes)
+    for code in codes:
+        assert len(code) == CODE_LENGTH and set(code) <= set(CODE_ALPHABET)
+        assert code_shard(code, shards_cnt) == shard
+        assert allocator.encode(allocator.decode(code)) == code
+
+
+def test_decode_rejects_other_shards_and_garbage():
+    allocator = CodeAllocator(1, 2)
+    other_code = CodeAllocator(0, 2).allocate()
+    for code in (other_code, '', 'A', 'a0000', 'B00', 'B000!'):
+        assert allocator.decode(code) is None
+    assert code_shard('', 2) == 0 and code_shard('!AAAA', 2) == 0
+
+
+def test_exhausted_shard_raises_until_a_code_is_freed():
+    allocator = make_small_allocator(300)
+    codes = {allocator.allocate() for _ in range(300)}
+    assert len(codes) == 300 and allocator.get_free_cnt() == 0
+    with pytest.raises(Exception, match='No free game codes'):
+        allocator.allocate()
+
+    freed = sorted(codes)[:10]
+    for code in freed:
+        allocator.free(code)
+    assert {allocator.allocate() for _ in range(10)} == set(freed)
+    with pytest.raises(Exception):
+        allocator.allocate()
+
+
+def test_freed_codes_come_back_every_one():
+    allocator = make_small_allocator(500)
+    codes = {allocator.allocate() for _ in range(500)}
+    for code in codes:
+        allocator.free(code)
+    assert allocator.get_free_cnt() == 500
+    assert {allocator.allocate() for _ in range(500)} == codes
+
+
+def test_reserved_codes_are_skipped():
+    allocator = make_small_allocator(200)
+    reserved = {allocator.encode(index) for index in range(0, 200, 2)}
+    for code in reserved:
+        allocator.reserve(code)
+    assert allocator.get_free_cnt() == 100
+    codes = {allocator.allocate() for _ in range(100)}
+    assert not codes & reserved and len(codes) == 100
+    with pytest.raises(Exception):
+        allocator.allocate()
+
+    # A recovered game's code is free again once its game is gone, and only once.
+    allocator = make_small_allocator(10)
+    allocator.reserve(allocator.encode(3))
+    allocator.free(allocator.encode(3))
+    assert allocator.get_free_cnt() == 10
+    assert len({allocator.allocate() for _ in range(10)}) == 10
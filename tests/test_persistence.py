@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import loadgen
+from benchmarks.soak import LocalStub
+from persistence import Journal
+from server import EService, Game
+
+
+def get_game_state(game: Game) -> tuple:
+    return (game.code, game.required_players_cnt, game.scheduler.delay, list(game.players_ids), bytes(game.roles),
+            bytes(game.alive), sorted(game.alive_players_ids), sorted(game.alive_mafias_ids),
+            game.alive_detective_id, dict(game.votes), sorted(game.leaders_ids), game.leaders_votes_cnt,
+            list(game.checked_ids), game.checked_decision, game.killed_id, game.phase, game.killed_phase,
+            game.barrier.ended_phase, sorted(game.pending_steps), game.finished)
+
+
+def get_state(service: EService) -> tuple:
+    games = {game_id: get_game_state(game) for game_id, game in service.game_id_to_game.items()}
+    sessions = {token: (session.player.id, session.player.name, session.game.id if session.game else None,
+                        session.seat) for token, session in service.token_to_session.items()}
+    codes = {code: game.id for code, game in service.code_to_game.items()}
+    return games, sessions, set(service.token_to_idle_since), codes
+
+
+async def play_and_stop(directory: str, steps_cnt: int, compact_at: int | None) -> tuple:
+    journal = Journal(directory)
+    list(journal.load())
+    service = EService(phase_delay=0, journal=journal)
+    task = asyncio.create_task(loadgen.play_games([LocalStub(service)], 200, 6, concurrency=50))
+    for step in range(steps_cnt):
+        await asyncio.sleep(0.005)
+        await journal.flush()
+        if step == compact_at:
+            await journal.compact(service.get_records())
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await journal.flush()
+    journal.close()
+    return get_state(service)
+
+
+async def recover(directory: str) -> tuple:
+    journal = Journal(directory)
+    service = EService(phase_delay=0, journal=journal)
+    service.recover(journal.load())
+    journal.close()
+    return get_state(service)
+
+
+@pytest.mark.parametrize('compact_at', [None, 2, 5])
+def test_recover_restores_every_game(tmp_path, compact_at):
+    # Games are cut off at random points of play, the journal and the snapshot must bring back exactly what was live.
+    before = asyncio.run(play_and_stop(str(tmp_path), 8, compact_at))
+    after = asyncio.run(recover(str(tmp_path)))
+
+    assert before[0], "no game was live when play stopped"
+    assert after[0].keys() == before[0].keys()
+    for game_id, state in before[0].items():
+        assert after[0][game_id] == state, f"game {game_id}"
+    assert after[1:] == before[1:]
+
+
+def test_recover_twice_after_compaction(tmp_path):
+    # A snapshot written by a recovered server restores the same state again.
+    before = asyncio.run(play_and_stop(str(tmp_path), 6, 3))
+
+    async def recover_and_compact():
+        journal = Journal(str(tmp_path))
+        service = EService(phase_delay=0, journal=journal)
+        service.recover(journal.load())
+        await journal.compact(service.get_records())
+        journal.close()
+
+    asyncio.run(recover_and_compact())
+    assert asyncio.run(recover(str(tmp_path))) == before
@@ -0,0 +1,104 @@
+import asyncio
+import random
+
+import pytest
+
+from server import Game, PhaseBarrier
+
+PHASES_CNT = 6
+
+
+def make_game(players_cnt: int) -> Game:
+    game = Game(players_cnt, seed=1)
+    for player_id in range(1, players_cnt + 1):
+        game.add_player(player_id)
+    return game
+
+
+async def play(game: Game, rng: random.Random, max_delay: float):
+    # Every seat streams all the phases: starts the phase, votes, the detective publishes on its own, and the stream
+    # is slow to get to waiting. Nobody is killed, every night waits for the check.
+    loop = asyncio.get_running_loop()
+    players_ids = list(game.players_ids)
+    voted_cnts = [0] * (PHASES_CNT + 1)
+
+    def start(phase: int):
+        if phase % 2:
+            game.start_night(phase)
+        else:
+            game.start_day(phase)
+
+    def vote(phase: int):
+        voted_cnts[phase] += 1
+        if voted_cnts[phase] == len(players_ids):
+            loop.call_later(rng.random() * max_delay, game.end_step, phase, 'kill')
+
+    async def stream(seat: int):
+        for phase in range(1, PHASES_CNT + 1):
+            start(phase)
+            loop.call_later(rng.random() * max_delay, vote, phase)
+            if seat == 0 and phase % 2:
+                loop.call_later(rng.random() * 3 * max_delay, game.end_step, phase, 'check')
+            await asyncio.sleep(rng.random() * max_delay)
+            await game.barrier.wait(phase)
+            # Let through only once the phase is over, with nothing left to wait for.
+            assert game.barrier.ended_phase >= phase
+            assert game.phase > phase or not game.pending_steps
+
+    await asyncio.gather(*(stream(seat) for seat in range(len(players_ids))))
+
+
+@pytest.mark.parametrize('players_cnt, max_delay', [(6, 0.002), (6, 0), (50, 0.002), (50, 0)])
+def test_streams_wake_only_after_their_phase_ends(players_cnt, max_delay):
+    async def run():
+        rng = random.Random(players_cnt)
+        games = [make_game(players_cnt) for _ in range(2000 // players_cnt)]
+        # A stream that slept through the end of its phase never finishes.
+        await asyncio.wait_for(asyncio.gather(*(play(game, rng, max_delay) for game in games)), 30)
+        return games
+
+    games = asyncio.run(run())
+    for game in games:
+        assert game.barrier.ended_phase == PHASES_CNT
+        assert not game.barrier.waiters
+
+
+def test_wait_after_end_returns_at_once():
+    async def run():
+        barrier = PhaseBarrier()
+        barrier.end(3)
+        await asyncio.wait_for(barrier.wait(2), 0.1)
+        await asyncio.wait_for(barrier.wait(3), 0.1)
+        return barrier
+
+    assert not asyncio.run(run()).waiters
+
+
+def test_cancelled_waiter_does_not_stop_the_others():
+    async def run():
+        barrier = PhaseBarrier()
+        waiters = [asyncio.create_task(barrier.wait(1)) for _ in range(10)]
+        await asyncio.sleep(0)
+        waiters[3].cancel()
+        await asyncio.sleep(0)
+        barrier.end(1)
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert isinstance(results[3], asyncio.CancelledError)
+    assert results[:3] + results[4:] == [None] * 9
+
+
+def test_later_phase_keeps_waiting():
+    async def run():
+        barrier = PhaseBarrier()
+        waiter = asyncio.create_task(barrier.wait(2))
+        await asyncio.sleep(0)
+        barrier.end(1)
+        await asyncio.sleep(0)
+        woken_early = waiter.done()
+        barrier.end(2)
+        await asyncio.wait_for(waiter, 0.1)
+        return woken_early
+
+    assert not asyncio.run(run())
@@ -0,0 +1,60 @@
+import asyncio
+
+import loadgen
+import mafia_pb2
+from benchmarks.soak import LocalStub
+from server import EService
+
+GAMES_CNT = 300
+PLAYERS_CNT = 4
+
+
+def get_sizes(service: EService) -> dict[str, int]:
+    return dict(token_to_session=len(service.token_to_session), code_to_game=len(service.code_to_game),
+                player_id_to_player=len(service.player_id_to_player),
+                player_id_to_session=len(service.player_id_to_session),
+                game_id_to_game=len(service.game_id_to_game),
+                game_id_to_broadcaster=len(service.game_id_to_broadcaster),
+                game_id_to_actor=len(service.game_id_to_actor), token_to_idle_since=len(service.token_to_idle_since),
+                timers=service.timer_wheel.get_timers_cnt(), queued=service.matchmaker.get_queued_cnt())
+
+
+def test_played_games_leave_nothing_behind():
+    # Finished games are gone right away and the sweep evicts their idle players, batch after batch the server
+    # holds nothing of them.
+    async def run():
+        service = EService(phase_delay=0, token_ttl=0)
+        free_codes_cnt = service.code_allocator.get_free_cnt()
+        for _ in range(3):
+            await loadgen.play_games([LocalStub(service)], GAMES_CNT, PLAYERS_CNT, concurrency=100)
+            await service.sweep()
+            assert get_sizes(service) == dict.fromkeys(get_sizes(service), 0)
+        return service, free_codes_cnt
+
+    service, free_codes_cnt = asyncio.run(run())
+    stats = service.get_stats()
+    assert stats['free_codes'] == free_codes_cnt
+    assert stats['reclaimed_finished_games'] == 3 * GAMES_CNT
+    assert stats['reclaimed_tokens'] == 3 * GAMES_CNT * PLAYERS_CNT
+    assert not stats.get('reclaimed_abandoned_games')
+
+
+def test_sweep_reclaims_abandoned_games():
+    async def run():
+        service = EService(phase_delay=0, game_ttl=0, token_ttl=0)
+        stub = LocalStub(service)
+        for _ in range(5):
+            token = (await stub.Connect(mafia_pb2.ConnectRequest(name='host'))).token
+            await stub.CreateGame(mafia_pb2.CreateGameRequest(token=token, required_players_cnt=PLAYERS_CNT))
+        assert service.get_stats()['live_games'] == 5
+        await asyncio.sleep(0.01)
+        await service.sweep()
+        # The hosts became idle with their games gone, the next sweep evicts them.
+        await asyncio.sleep(0.01)
+        await service.sweep()
+        return service
+
+    service = asyncio.run(run())
+    assert get_sizes(service) == dict.fromkeys(get_sizes(service), 0)
+    assert service.get_stats()['reclaimed_abandoned_games'] == 5
+    assert service.get_stats()['reclaimed_tokens'] == 5
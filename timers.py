@@ -0,0 +1,84 @@
+import asyncio
+import math
+import time
+import typing
+
+
+class Timer:
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline: int, callback: typing.Callable, args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerWheel:
+    # One set of timers for the whole server, driven by a single task. Time goes in ticks, level 0 has a slot per
+    # tick and a slot of every next level spans a whole turn of the level below. A timer sits at the lowest level
+    # whose current turn reaches its deadline and moves down a level when its slot comes up, so adding and
+    # cancelling are O(1) and a tick only touches the timers that are due or moving down.
+    def __init__(self, tick: float = 0.1, slots_cnt: int = 64, levels_cnt: int = 4):
+        self.tick = tick
+        self.slots_cnt = slots_cnt
+        self.levels: list[list[list[Timer]]] = [[[] for _ in range(slots_cnt)] for _ in range(levels_cnt)]
+        self.started_at = time.monotonic()
+        self.ticks = 0
+        self.timers_cnt = 0
+
+    def get_timers_cnt(self) -> int:
+        return self.timers_cnt
+
+    def add(self, delay: float, callback: typing.Callable, *args) -> Timer:
+        # Never due before the next tick, so a timer added from a callback doesn't run in the same tick.
+        deadline = max(math.ceil((time.monotonic() + delay - self.started_at) / self.tick), self.ticks + 1)
+        timer = Timer(deadline, callback, args)
+        self.place(timer)
+        self.timers_cnt += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        # The timer stays in its slot until the slot comes up.
+        if not timer.cancelled:
+            timer.cancelled = True
+            self.timers_cnt -= 1
+
+    def place(self, timer: Timer):
+        span = 1
+        for level in self.levels[:-1]:
+            if timer.deadline // (span * self.slots_cnt) == self.ticks // (span * self.slots_cnt):
+                break
+            span *= self.slots_cnt
+        else:
+            # Beyond the last level's turn the timer comes back to it at every turn until it is close enough.
+            level = self.levels[-1]
+        level[timer.deadline // span % self.slots_cnt].append(timer)
+
+    def advance(self, now: float | None = None):
+        ticks = int(((time.monotonic() if now is None else now) - self.started_at) / self.tick)
+        while self.ticks < ticks:
+            self.ticks += 1
+            # Higher levels first, a timer may move down more than one level at once.
+            span = self.slots_cnt ** (len(self.levels) - 1)
+            for level in reversed(self.levels[1:]):
+                if self.ticks % span == 0:
+                    slot = self.ticks // span % self.slots_cnt
+                    timers, level[slot] = level[slot], []
+                    for timer in timers:
+                        if not timer.cancelled:
+                            self.place(timer)
+                span //= self.slots_cnt
+
+            slot = self.ticks % self.slots_cnt
+            timers, self.levels[0][slot] = self.levels[0][slot], []
+            for timer in timers:
+                if not timer.cancelled:
+                    timer.cancelled = True
+                    self.timers_cnt -= 1
+                    timer.callback(*timer.args)
+
+    async def run_forever(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.advance()
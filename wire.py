@@ -0,0 +1,41 @@
+import typing
+
+
+def encode_varint(value: int) -> bytes:
+    result = bytearray()
+    while value > 0x7f:
+        result.append(value & 0x7f | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def decode_varint(data: bytes, offset: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def encode_message_field(field_number: int, payload: bytes) -> bytes:
+    return encode_varint(field_number << 3 | 2) + encode_varint(len(payload)) + payload
+
+
+def encode_delimited(payload: bytes) -> bytes:
+    return encode_varint(len(payload)) + payload
+
+
+def decode_delimited(data: bytes) -> typing.Iterator[bytes]:
+    offset = 0
+    while offset < len(data):
+        size, offset = decode_varint(data, offset)
+        if offset + size > len(data):
+            # A record torn by a crash in the middle of a write.
+            return
+        yield data[offset:offset + size]
+        offset += size